@@ -1,5 +1,7 @@
 const express = require("express");
 const axios = require("axios");
+const crypto = require("crypto");
+const { AsyncLocalStorage } = require("async_hooks");
 const router = express.Router();
 
 // Import cache middleware
@@ -16,6 +18,46 @@ const ML_SERVICE_URL =
 
 console.log("🚀 ML_SERVICE_URL being used:", ML_SERVICE_URL);
 console.log("🛠️  Environment:", process.env.NODE_ENV || 'development');
+
+// Trace context: continue an incoming W3C traceparent and forward it on every
+// call to the ML service, so its spans join the trace. The caller's sampling
+// flag is kept; without an incoming trace nothing is forwarded and the ML
+// service starts the trace and makes the sampling decision itself.
+const traceContext = new AsyncLocalStorage();
+const TRACEPARENT_PATTERN = /^00-([0-9a-f]{32})-[0-9a-f]{16}-([0-9a-f]{2})$/;
+
+router.use((req, res, next) => {
+  const match = TRACEPARENT_PATTERN.exec((req.get('traceparent') || '').trim().toLowerCase());
+  if (!match) {
+    return traceContext.run({ res }, next);
+  }
+  const [, traceId, flags] = match;
+  res.set('X-Trace-Id', traceId);
+  const traceparent = `00-${traceId}-${crypto.randomBytes(8).toString('hex')}-${flags}`;
+  traceContext.run({ traceparent, res }, next);
+});
+
+const isMlServiceCall = (config) => (config.url || '').startsWith(ML_SERVICE_URL);
+
+axios.interceptors.request.use((config) => {
+  const trace = traceContext.getStore();
+  if (trace?.traceparent && isMlServiceCall(config)) {
+    config.headers = config.headers || {};
+    config.headers.traceparent = trace.traceparent;
+  }
+  return config;
+});
+
+// Report the trace the ML service started when the caller did not send one
+axios.interceptors.response.use((response) => {
+  const trace = traceContext.getStore();
+  const traceId = response.headers?.['x-trace-id'];
+  if (trace && !trace.traceparent && traceId && isMlServiceCall(response.config)
+      && !trace.res.headersSent) {
+    trace.res.set('X-Trace-Id', traceId);
+  }
+  return response;
+});
   2
 
 // Helper function for ML service health check
@@ -28,6 +70,65 @@ const checkMLServiceHealth = async () => {
   }
 };
 
+// Long category runs go through the ML job API: start a job, then poll it,
+// so no single request to the ML service has to stay open for the whole run.
+const ML_JOB_POLL_INTERVAL_MS = parseInt(process.env.ML_JOB_POLL_INTERVAL_MS || "3000", 10);
+const ML_JOB_MAX_WAIT_MS = parseInt(process.env.ML_JOB_MAX_WAIT_MS || "3600000", 10);
+
+const startMlJob = async (jobPath, body) => {
+  const response = await axios.post(`${ML_SERVICE_URL}${jobPath}`, body, {
+    timeout: 30000,
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'application/json',
+      'User-Agent': 'CaseCrux-Server/1.0'
+    }
+  });
+  return response.data;
+};
+
+const waitForMlJob = async (jobId) => {
+  const deadline = Date.now() + ML_JOB_MAX_WAIT_MS;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, ML_JOB_POLL_INTERVAL_MS));
+    const { data: job } = await axios.get(`${ML_SERVICE_URL}/jobs/${jobId}`, { timeout: 30000 });
+    if (job.status === "completed") {
+      return job.result;
+    }
+    if (job.status === "failed") {
+      const error = new Error(job.error || "ML job failed");
+      error.response = { status: 502, data: { detail: job.error, job_id: jobId } };
+      throw error;
+    }
+  }
+  const error = new Error(`ML job ${jobId} did not finish within ${ML_JOB_MAX_WAIT_MS}ms`);
+  error.response = { status: 504, data: { detail: error.message, job_id: jobId } };
+  throw error;
+};
+
+// Run a job to completion, or with ?async=true return the job id right away
+const proxyMlJob = async (jobPath, req, res) => {
+  const job = await startMlJob(jobPath, req.body);
+  if (req.query.async === 'true') {
+    return res.status(202).json({ job_id: job.job_id, status_url: `/api/ml/jobs/${job.job_id}` });
+  }
+  const result = await waitForMlJob(job.job_id);
+  return res.json(result);
+};
+
+// Job status passthrough for clients using ?async=true
+router.get("/ml/jobs/:jobId", async (req, res) => {
+  try {
+    const response = await axios.get(`${ML_SERVICE_URL}/jobs/${req.params.jobId}`, { timeout: 30000 });
+    res.json(response.data);
+  } catch (error) {
+    res.status(error.response?.status || 500).json({
+      error: error.message,
+      details: error.response?.data || "Unknown error fetching job status"
+    });
+  }
+});
+
 // Proxy route to forward summarize_from_urls requests to ML service
 router.post("/ml/summarize_from_urls",
   cacheMiddleware('url_summary'),
@@ -531,17 +632,7 @@ router.post("/ml/summarize_category_overall", async (req, res) => {
   const startTime = Date.now();
 
   try {
-    const response = await axios.post(`${ML_SERVICE_URL}/summarize_category_overall`, req.body, {
-      timeout: 600000, // 10 minute timeout for comprehensive analysis
-      headers: {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'User-Agent': 'CaseCrux-Server/1.0'
-      }
-    });
-
-    const duration = Date.now() - startTime;
-    res.json(response.data);
+    await proxyMlJob("/jobs/summarize_category_overall", req, res);
   } catch (error) {
     const duration = Date.now() - startTime;
 
@@ -591,17 +682,7 @@ router.post("/ml/summarize_category_download", async (req, res) => {
   const startTime = Date.now();
 
   try {
-    const response = await axios.post(`${ML_SERVICE_URL}/summarize_category_download`, req.body, {
-      timeout: 600000, // 10 minute timeout for download processing
-      headers: {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'User-Agent': 'CaseCrux-Server/1.0'
-      }
-    });
-
-    const duration = Date.now() - startTime;
-    res.json(response.data);
+    await proxyMlJob("/jobs/summarize_category_download", req, res);
   } catch (error) {
     const duration = Date.now() - startTime;
 
@@ -1,4 +1,5 @@
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,28 +9,181 @@ GROQ_API_KEY_FROM_ENV = os.getenv("GROQ_API_KEY")
 # (DEBUG LINE REMOVED)
 # ...existing code...
 
-# Load all GROQ API keys from environment variables
+# Load all GROQ API keys from environment variables (GROQ_API_KEY_1, _2, ...)
 GROQ_API_KEYS = [
-    os.getenv("GROQ_API_KEY_1"),
-    os.getenv("GROQ_API_KEY_2"),
-    os.getenv("GROQ_API_KEY_3"),
+    os.getenv(name) for name in sorted(
+        (name for name in os.environ if re.fullmatch(r"GROQ_API_KEY_\d+", name)),
+        key=lambda name: int(name.rsplit("_", 1)[1]))
 ]
 # Remove any None or empty values
 GROQ_API_KEYS = [k for k in GROQ_API_KEYS if k]
 
-# Round robin index (in-memory, not safe for multi-process)
-_groq_key_index = 0
 
-
-def get_next_groq_api_key():
-    global _groq_key_index
-    if not GROQ_API_KEYS:
-        raise RuntimeError("No GROQ API keys configured!")
-    key = GROQ_API_KEYS[_groq_key_index]
-    _groq_key_index = (_groq_key_index + 1) % len(GROQ_API_KEYS)
-    return key
+def get_next_groq_api_key(estimated_tokens: int = 0):
+    """
+    Pick a key through the rate-limit-aware scheduler
+    Blocks with time.sleep until a key has capacity, so call it only off the
+    event loop; async code uses key_scheduler.aacquire instead.
+    """
+    from app.services.key_scheduler import key_scheduler
+    return key_scheduler.acquire(estimated_tokens)
 
 
 def get_groq_keys_count():
     """Return the number of available GROQ API keys"""
     return len(GROQ_API_KEYS)
+
+
+# Model used for every Groq call
+GROQ_MODEL_NAME = os.getenv("GROQ_MODEL_NAME", "llama3-8b-8192")
+# Groq API endpoint; point it at a compatible stand-in such as
+# `python -m benchmarks.fake_groq` (http://127.0.0.1:8090) to load test offline
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# Bump when the summarization prompts change so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = os.getenv("SUMMARY_PROMPT_VERSION", "1")
+
+# Directory for local state (SQLite caches etc.)
+DATA_DIR = os.getenv("ML_DATA_DIR", os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '../data'))
+
+# Summary cache: "memory", "sqlite", "redis" (needs requirements-optional.txt)
+# or "none". MAX_ENTRIES bounds the memory and SQLite backends.
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE_BACKEND", "memory").lower()
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "86400"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "512"))
+SUMMARY_CACHE_PATH = os.getenv(
+    "SUMMARY_CACHE_PATH", os.path.join(DATA_DIR, "summary_cache.sqlite3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Completion cache under every LLM call, keyed on model, temperature and prompt.
+# Same backend choices as the summary cache; SQLite by default so repeated
+# chunks stay free across restarts. Sampled completions (temperature > 0) are
+# only cached with LLM_CACHE_SAMPLED=true, so map-reduce map and combine calls
+# run at MAP_REDUCE_TEMPERATURE (greedy by default) to make them cacheable.
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+MAP_REDUCE_TEMPERATURE = float(os.getenv("MAP_REDUCE_TEMPERATURE", "0"))
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite").lower()
+LLM_CACHE_SAMPLED = os.getenv("LLM_CACHE_SAMPLED", "false").lower() == "true"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "4096"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(DATA_DIR, "llm_cache.sqlite3"))
+
+# Per-key Groq limits used by the key scheduler. Several uvicorn workers must
+# draw from the same budgets, so the state lives in SQLite when WEB_CONCURRENCY
+# (uvicorn's default worker count) is above 1, and in memory otherwise. Set
+# KEY_SCHEDULER_BACKEND=sqlite when starting workers with --workers instead.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or "1")
+GROQ_RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = int(os.getenv("GROQ_TPM_LIMIT", "30000"))
+KEY_SCHEDULER_BACKEND = os.getenv(
+    "KEY_SCHEDULER_BACKEND", "sqlite" if WEB_CONCURRENCY > 1 else "memory").lower()
+KEY_SCHEDULER_PATH = os.getenv(
+    "KEY_SCHEDULER_PATH", os.path.join(DATA_DIR, "key_scheduler.sqlite3"))
+# Base and maximum cooldown (seconds) for keys that fail or send 429 without Retry-After
+KEY_COOLDOWN_SECONDS = float(os.getenv("KEY_COOLDOWN_SECONDS", "20"))
+KEY_MAX_COOLDOWN_SECONDS = float(os.getenv("KEY_MAX_COOLDOWN_SECONDS", "300"))
+# Completion tokens assumed per call when reserving TPM budget
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "512"))
+
+# LLM call resilience: retries with jittered exponential backoff, a timeout per
+# attempt and a deadline per call, and hedged duplicates on a second key once
+# an attempt runs past the observed p95 latency
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "180"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# Hedge delay used until enough latencies are observed, and its lower bound
+LLM_HEDGE_INITIAL_DELAY = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "15"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+# Chunking: map chunks are packed up to the model context minus the prompt and
+# the completion reserve, capped at CHUNK_MAX_TOKENS
+MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "8192"))
+CHUNK_COMPLETION_TOKENS = int(os.getenv("CHUNK_COMPLETION_TOKENS", "1024"))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "6000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+
+# Maximum number of map-phase LLM calls in flight per document
+MAP_REDUCE_MAX_CONCURRENCY = int(os.getenv("MAP_REDUCE_MAX_CONCURRENCY", "8"))
+# Map outputs are collapsed in groups until they fit this many characters
+MAP_REDUCE_COMBINE_MAX_CHARS = int(os.getenv("MAP_REDUCE_COMBINE_MAX_CHARS", "12000"))
+
+# Category pipeline: per-stage concurrency limits and per-PDF timeout (seconds)
+CATEGORY_DOWNLOAD_CONCURRENCY = int(os.getenv("CATEGORY_DOWNLOAD_CONCURRENCY", "4"))
+CATEGORY_EXTRACT_CONCURRENCY = int(os.getenv("CATEGORY_EXTRACT_CONCURRENCY", "2"))
+# Defaults to two documents in the LLM stage per configured key
+CATEGORY_SUMMARIZE_CONCURRENCY = int(os.getenv(
+    "CATEGORY_SUMMARIZE_CONCURRENCY", str(max(1, 2 * len(GROQ_API_KEYS)))))
+CATEGORY_PDF_TIMEOUT = float(os.getenv("CATEGORY_PDF_TIMEOUT", "300"))
+
+# Shared HTTP client used for PDF downloads
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+PDF_MAX_DOWNLOAD_BYTES = int(os.getenv("PDF_MAX_DOWNLOAD_BYTES", str(50 * 1024 * 1024)))
+# Downloads larger than this spill from memory to a temporary file
+PDF_SPOOL_MAX_MEMORY = int(os.getenv("PDF_SPOOL_MAX_MEMORY", str(5 * 1024 * 1024)))
+# URLs /summarize_from_urls downloads and summarizes at once
+URLS_MAX_CONCURRENCY = int(os.getenv("URLS_MAX_CONCURRENCY", "4"))
+
+# Worker pools: threads for blocking I/O (LLM calls), processes for CPU-bound
+# PDF parsing and extractive scoring. 0 processes runs CPU work inline.
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "16"))
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+# Requests admitted at once before answering 503 with Retry-After
+MAX_INFLIGHT_REQUESTS = int(os.getenv("MAX_INFLIGHT_REQUESTS", "32"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "10"))
+
+# PDF extraction: documents with at least PDF_PARALLEL_MIN_PAGES pages are
+# split into page ranges (no smaller than PDF_PAGES_PER_TASK) across processes
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "20"))
+
+# Streaming extraction for large PDFs: page ranges extracted ahead of the map
+# phase, and the file size from which summarizers switch to streaming
+PDF_STREAM_WINDOW = int(os.getenv("PDF_STREAM_WINDOW", "2"))
+PDF_STREAM_MIN_BYTES = int(os.getenv("PDF_STREAM_MIN_BYTES", str(10 * 1024 * 1024)))
+
+# Parsed documents kept per content hash so one upload is extracted only once,
+# bounded by count and by the raw PDF bytes and text they hold
+PARSED_DOCUMENT_CACHE_SIZE = int(os.getenv("PARSED_DOCUMENT_CACHE_SIZE", "16"))
+PARSED_DOCUMENT_CACHE_MAX_BYTES = int(os.getenv(
+    "PARSED_DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Background jobs
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+JOB_MAX_CONCURRENT = int(os.getenv("JOB_MAX_CONCURRENT", "2"))
+
+# Summarizer modules load on first use; this imports them in the background
+# right after startup so the first request does not pay for it
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+
+# Prometheus /metrics (needs prometheus_client); stage timings are labelled
+# by route, summary_type and method
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Request tracing: W3C traceparent headers are accepted (the Node proxy sends
+# them) and spans are written as JSON lines to TRACE_EXPORT_PATH and/or posted
+# as OTLP/HTTP JSON to TRACE_COLLECTOR_URL (e.g. http://localhost:4318/v1/traces)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join(DATA_DIR, "traces.jsonl"))
+TRACE_COLLECTOR_URL = os.getenv("TRACE_COLLECTOR_URL", "")
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "casecrux-ml-service")
+
+# Token accounting: every LLM call is recorded (per key, route, category,
+# summary type and stage) in SQLite for GET /usage, written in batches from a
+# background thread and kept for TOKEN_USAGE_RETENTION_DAYS. Prices are USD
+# per million tokens and only used to estimate cost.
+TOKEN_USAGE_ENABLED = os.getenv("TOKEN_USAGE_ENABLED", "true").lower() == "true"
+TOKEN_USAGE_STORE_PATH = os.getenv(
+    "TOKEN_USAGE_STORE_PATH", os.path.join(DATA_DIR, "token_usage.sqlite3"))
+TOKEN_USAGE_RETENTION_DAYS = float(os.getenv("TOKEN_USAGE_RETENTION_DAYS", "30"))
+GROQ_INPUT_PRICE_PER_MTOK = float(os.getenv("GROQ_INPUT_PRICE_PER_MTOK", "0.05"))
+GROQ_OUTPUT_PRICE_PER_MTOK = float(os.getenv("GROQ_OUTPUT_PRICE_PER_MTOK", "0.08"))
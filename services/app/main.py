@@ -1,11 +1,93 @@
-from fastapi import FastAPI
+import time
+from contextlib import ExitStack, asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from app.routes import summarize
 from app.routes import summarize_from_urls
 from app.routes import advanced_summarize
 from app.routes import summarize_category
+from app.routes import health
+from app.routes import jobs
+from app.routes import metrics
+from app.routes import usage
+from app.utils.http_client import get_http_client, close_http_client
+from app.utils.executor import worker_pool, background_loop
+from app.services.llm import llm_clients
+from app.services.key_scheduler import key_scheduler
+from app.services.jobs import job_manager
+from app.utils.warmup import warm_up
+from app.utils.metrics import label_route, observe_request, route_label
+from app.utils.tracing import exporter, span
+from app.utils.token_usage import start_totals, usage_recorder
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client for the lifetime of the app
+    get_http_client()
+    await worker_pool.run_io(job_manager.recover)
+    key_scheduler.warn_if_unshared()
+    # Summarizers load lazily; import them in the background before the first request
+    warm_up.start()
+    yield
+    await job_manager.shutdown()
+    await close_http_client()
+    await llm_clients.aclose_loop()
+    background_loop.shutdown(llm_clients.aclose_loop)
+    worker_pool.shutdown()
+    usage_recorder.shutdown()
+    exporter.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(label_route)])
 app.include_router(summarize.router)
 app.include_router(summarize_from_urls.router)
 app.include_router(advanced_summarize.router)
 app.include_router(summarize_category.router)
+app.include_router(health.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(usage.router)
+
+
+async def _finish_with_body(body, stack: ExitStack, finish):
+    with stack:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish()
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    usage = start_totals()
+
+    def finish():
+        # Routing has filled in scope["route"] by now
+        route = route_label(request.scope)
+        server.set_attribute("route", route)
+        server.set_attribute("status", status)
+        observe_request(route, status, time.perf_counter() - started)
+
+    with ExitStack() as stack:
+        # Continue the caller's trace (the Node proxy sends traceparent) or start one
+        server = stack.enter_context(span(
+            f"{request.method} {request.url.path}", request.headers.get("traceparent"),
+            kind="server", method=request.method, path=request.url.path))
+        try:
+            response = await call_next(request)
+        except BaseException:
+            finish()
+            raise
+        status = response.status_code
+        if server.trace_id:
+            response.headers["X-Trace-Id"] = server.trace_id
+        if usage.calls:
+            response.headers["X-LLM-Prompt-Tokens"] = str(usage.prompt_tokens)
+            response.headers["X-LLM-Completion-Tokens"] = str(usage.completion_tokens)
+        # The body is sent after this returns (SSE streams for minutes), so the
+        # span and the request timing end with the body instead
+        response.body_iterator = _finish_with_body(response.body_iterator, stack.pop_all(), finish)
+        return response
@@ -7,9 +7,12 @@ Uses lightweight processing for better performance on resource-constrained syste
 from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
 from app.utils.logger import logger
 from app.config import get_groq_keys_count
+from app.utils.executor import worker_pool
+from app.utils.sse import sse_response
+from app.utils.metrics import set_labels, record_fallback
+from app.utils.token_usage import request_usage
 
 router = APIRouter()
 
@@ -37,6 +40,7 @@ async def advanced_summarize(
     - summary_type: detailed, concise, executive, technical, bullets
     - method: abstractive, extractive, hybrid
     """
+    from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
     try:
         # Check if GROQ API keys are available
         if get_groq_keys_count() == 0:
@@ -59,6 +63,8 @@ async def advanced_summarize(
                 detail=f"Invalid method. Must be one of: {valid_methods}"
             )
         
+        set_labels(summary_type=summary_type, method=method)
+        
         # Read file content
         content = await file.read()
         
@@ -68,11 +74,13 @@ async def advanced_summarize(
         logger.info(f"Processing PDF with {method} method, {summary_type} level")
         
         # Generate summary
-        result = lightweight_advanced_summarizer.summarize_pdf(
-            file_bytes=content,
-            summary_type=summary_type,
-            method=method
-        )
+        async with worker_pool.admit():
+            result = await worker_pool.run_io(
+                lightweight_advanced_summarizer.summarize_pdf,
+                file_bytes=content,
+                summary_type=summary_type,
+                method=method
+            )
         
         return {
             "success": True,
@@ -81,7 +89,8 @@ async def advanced_summarize(
                 "filename": file.filename,
                 "summary_type": summary_type,
                 "method": method,
-                "file_size": len(content)
+                "file_size": len(content),
+                "token_usage": request_usage()
             }
         }
         
@@ -89,11 +98,51 @@ async def advanced_summarize(
         raise
     except Exception as e:
         logger.error(f"Error in advanced summarization: {e}")
-        return create_advanced_demo_response(
-            file.filename if file else "document.pdf", 
-            summary_type, 
-            method
+        # Demo responses are only for deployments without keys; a failed
+        # summary must not come back as a 200 with placeholder text
+        raise HTTPException(status_code=502, detail=f"Summarization failed: {e}") from e
+
+
+@router.post("/advanced_summarize_stream")
+async def advanced_summarize_stream(
+    file: UploadFile = File(...),
+    summary_type: str = 'detailed',
+    method: str = 'abstractive'
+):
+    """
+    Streaming variant of /advanced_summarize (text/event-stream)
+    Abstractive runs emit 'map' and 'token' events; every run ends with a
+    'done' event whose 'result' matches the /advanced_summarize summary.
+    """
+    from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
+    if get_groq_keys_count() == 0:
+        raise HTTPException(status_code=503, detail="No GROQ API keys configured")
+    
+    valid_types = ['detailed', 'concise', 'executive', 'technical', 'bullets']
+    valid_methods = ['abstractive', 'extractive', 'hybrid']
+    
+    if summary_type not in valid_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid summary_type. Must be one of: {valid_types}"
         )
+    
+    if method not in valid_methods:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid method. Must be one of: {valid_methods}"
+        )
+    
+    set_labels(summary_type=summary_type, method=method)
+    content = await file.read()
+    
+    if not content:
+        raise HTTPException(status_code=400, detail="Empty file provided")
+    
+    logger.info(f"Streaming PDF summary with {method} method, {summary_type} level")
+    return sse_response(lightweight_advanced_summarizer.astream_summarize(
+        content, summary_type=summary_type, method=method
+    ))
 
 
 @router.post("/compare_summaries")
@@ -108,6 +157,7 @@ async def compare_summaries(
     - file: PDF file to summarize
     - summary_type: Level of detail (detailed, concise, executive, technical, bullets)
     """
+    from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
     try:
         # Check if GROQ API keys are available
         if get_groq_keys_count() == 0:
@@ -122,6 +172,8 @@ async def compare_summaries(
                 detail=f"Invalid summary_type. Must be one of: {valid_types}"
             )
         
+        set_labels(summary_type=summary_type, method="compare")
+        
         content = await file.read()
         
         if not content:
@@ -130,10 +182,11 @@ async def compare_summaries(
         logger.info(f"Generating comparison summaries for {summary_type} level")
         
         # Generate comparison
-        result = lightweight_advanced_summarizer.compare_summaries(
-            file_bytes=content,
-            level=summary_type
-        )
+        async with worker_pool.admit():
+            result = await lightweight_advanced_summarizer.acompare_summaries(
+                file_bytes=content,
+                level=summary_type
+            )
         
         return {
             "success": True,
@@ -141,7 +194,8 @@ async def compare_summaries(
             "metadata": {
                 "filename": file.filename,
                 "summary_type": summary_type,
-                "file_size": len(content)
+                "file_size": len(content),
+                "token_usage": request_usage()
             }
         }
         
@@ -149,10 +203,41 @@ async def compare_summaries(
         raise
     except Exception as e:
         logger.error(f"Error in summary comparison: {e}")
-        return create_comparison_demo_response(
-            file.filename if file else "document.pdf", 
-            summary_type
-        )
+        raise HTTPException(status_code=502, detail=f"Summarization failed: {e}") from e
+
+
+@router.post("/chunk_plan")
+async def chunk_plan(
+    file: UploadFile = File(...),
+    summary_type: str = 'detailed'
+):
+    """
+    Report how an abstractive summary would chunk this PDF without calling the LLM
+    Returns the chunk (map call) count, token budget and the legacy 3000-char count
+    """
+    from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
+    from app.utils.parsed_document import aparse_document
+    content = await file.read()
+    
+    if not content:
+        raise HTTPException(status_code=400, detail="Empty file provided")
+    
+    async with worker_pool.admit():
+        document = await aparse_document(content)
+        text = await document.atext()
+        plan = await worker_pool.run_io(
+            lightweight_advanced_summarizer.chunk_plan, text, summary_type)
+    
+    return {
+        "success": True,
+        "plan": plan,
+        "metadata": {
+            "filename": file.filename,
+            "summary_type": summary_type,
+            "file_size": len(content),
+            "extraction": document.extraction_timing
+        }
+    }
 
 
 @router.get("/summary_options")
@@ -309,6 +394,7 @@ async def advanced_summarize_with_sections(
     - summary_type: detailed, concise, executive, technical, bullets
     - method: abstractive, extractive, hybrid
     """
+    from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
     try:
         # Check if GROQ API keys are available
         if get_groq_keys_count() == 0:
@@ -331,6 +417,8 @@ async def advanced_summarize_with_sections(
                 detail=f"Invalid method. Must be one of: {valid_methods}"
             )
         
+        set_labels(summary_type=summary_type, method=method)
+        
         # Read file content
         content = await file.read()
         
@@ -340,11 +428,13 @@ async def advanced_summarize_with_sections(
         logger.info(f"Processing PDF with section-wise {method} method, {summary_type} level")
         
         # Generate section-wise summary
-        result = lightweight_advanced_summarizer.summarize_pdf_with_sections(
-            file_bytes=content,
-            summary_type=summary_type,
-            method=method
-        )
+        async with worker_pool.admit():
+            result = await worker_pool.run_io(
+                lightweight_advanced_summarizer.summarize_pdf_with_sections,
+                file_bytes=content,
+                summary_type=summary_type,
+                method=method
+            )
         
         return {
             "success": True,
@@ -354,6 +444,7 @@ async def advanced_summarize_with_sections(
                 "summary_type": summary_type,
                 "method": method,
                 "file_size": len(content),
+                "token_usage": request_usage(),
                 "section_wise": True
             }
         }
@@ -362,15 +453,12 @@ async def advanced_summarize_with_sections(
         raise
     except Exception as e:
         logger.error(f"Error in section-wise advanced summarization: {e}")
-        return create_section_wise_demo_response(
-            file.filename if file else "document.pdf", 
-            summary_type, 
-            method
-        )
+        raise HTTPException(status_code=502, detail=f"Summarization failed: {e}") from e
 
 
 def create_advanced_demo_response(filename: str, summary_type: str, method: str) -> dict:
     """Create demo response for advanced PDF summarization"""
+    record_fallback("demo")
     
     # Sample content based on summary type
     type_samples = {
@@ -444,6 +532,7 @@ def create_advanced_demo_response(filename: str, summary_type: str, method: str)
 
 def create_comparison_demo_response(filename: str, summary_type: str) -> dict:
     """Create demo response for summary comparison"""
+    record_fallback("demo")
     return {
         "success": True,
         "comparison": {
@@ -479,6 +568,7 @@ def create_comparison_demo_response(filename: str, summary_type: str) -> dict:
 
 def create_section_wise_demo_response(filename: str, summary_type: str, method: str):
     """Create demo response for section-wise summarization when no API keys available"""
+    record_fallback("demo")
     return {
         "success": True,
         "demo_mode": True,
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from app.utils.executor import worker_pool
+from app.utils.summary_cache import summary_cache
+from app.utils.pdf_reader import extraction_stats
+from app.services.llm import completion_cache, llm_clients
+from app.services.key_scheduler import key_scheduler
+from app.services.resilience import llm_policy
+from app.utils.warmup import warm_up
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health():
+    """
+    Liveness check used by the Node proxy
+    Also reports worker pool queue depths, admission counters, cache hit rates
+    per-key rate-limit budgets, LLM retry/hedge counters, pooled clients,
+    PDF extraction timing and background warm-up progress
+    """
+    return {
+        "status": "ok",
+        "worker_pool": worker_pool.stats(),
+        "caches": {"summary": summary_cache.stats(), "llm": completion_cache.stats()},
+        "groq_keys": key_scheduler.stats(),
+        "llm_resilience": llm_policy.stats(),
+        "llm_clients": llm_clients.stats(),
+        "pdf_extraction": extraction_stats.stats(),
+        "warm_up": warm_up.stats()
+    }
@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.config import CATEGORY_DOWNLOAD_CONCURRENCY
+from app.services.jobs import job_manager
+from app.utils.http_client import download_pdf_bytes
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+
+router = APIRouter()
+
+
+class BatchJobRequest(BaseModel):
+    pdf_urls: list[str]
+    summary_type: str = 'detailed'
+    method: str = 'abstractive'
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Job status with per-PDF progress
+    `result` is filled in once status is "completed"; `error` when "failed"
+    """
+    job = await worker_pool.run_io(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/batch_summarize", status_code=202)
+async def batch_summarize_job(request: BatchJobRequest):
+    """Download the given PDFs and run batch_summarize_pdfs as a background job"""
+    if not request.pdf_urls:
+        raise HTTPException(status_code=400, detail="No PDF URLs provided")
+
+    from app.services.category_summarizer import batch_summarize_pdfs
+
+    async def run(progress):
+        names = [f"document_{i}" for i in range(len(request.pdf_urls))]
+        semaphore = asyncio.Semaphore(CATEGORY_DOWNLOAD_CONCURRENCY)
+
+        async def fetch(name: str, url: str):
+            async with semaphore:
+                progress(name, "downloading")
+                try:
+                    return await download_pdf_bytes(url)
+                except Exception as e:
+                    logger.error(f"Batch job could not download {url}: {e}")
+                    progress(name, "failed")
+                    return e
+
+        for name in names:
+            progress(name, "queued")
+        # One progress item per PDF; downloads run concurrently and fail per PDF
+        downloads = await asyncio.gather(
+            *(fetch(name, url) for name, url in zip(names, request.pdf_urls)))
+        failures = [{"document": name, "url": url, "stage": "download", "error": str(result)}
+                    for name, url, result in zip(names, request.pdf_urls, downloads)
+                    if isinstance(result, Exception)]
+        fetched = [(name, result) for name, result in zip(names, downloads)
+                   if not isinstance(result, Exception)]
+        if not fetched:
+            raise HTTPException(
+                status_code=502, detail={"message": "All PDFs failed to download.",
+                                         "failures": failures})
+        result = await worker_pool.run_io(
+            batch_summarize_pdfs, [pdf for _, pdf in fetched], request.summary_type,
+            request.method, progress, [name for name, _ in fetched]
+        )
+        result["failures"] = failures
+        return result
+
+    job_id = await job_manager.submit("batch_summarize", request.model_dump(), run)
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
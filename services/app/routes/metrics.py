@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from app.utils.metrics import render
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus exposition of stage latencies, token, cache and fallback counters"""
+    body, content_type = render()
+    if body is None:
+        return Response(content_type, status_code=503, media_type="text/plain")
+    return Response(body, media_type=content_type)
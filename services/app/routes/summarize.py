@@ -1,5 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Request
-from app.services.summarizer import summarize_pdf, summarize_overall
+from app.utils.executor import worker_pool
+from app.utils.sse import sse_response
+from app.utils.token_usage import request_usage
 
 router = APIRouter()
 
@@ -10,15 +12,31 @@ async def summarize(file: UploadFile = File(...)):
     Enhanced summarization endpoint with richer output
     Uses the existing working code but with enhanced prompts for better structure
     """
+    from app.services.summarizer import summarize_pdf
     content = await file.read()
-    summary = summarize_pdf(content)
-    return {"summary": summary}
+    async with worker_pool.admit():
+        summary = await worker_pool.run_io(summarize_pdf, content)
+    return {"summary": summary, "token_usage": request_usage()}
+
+
+@router.post("/summarize_stream")
+async def summarize_stream(file: UploadFile = File(...)):
+    """
+    Streaming variant of /summarize (text/event-stream)
+    Emits 'map' events as chunks finish, 'token' events while the final
+    summary is generated, then 'done' with the full summary.
+    """
+    from app.services.summarizer import astream_summarize_pdf
+    content = await file.read()
+    return sse_response(astream_summarize_pdf(content))
 
 
 @router.post("/summarize_overall")
 async def summarize_overall_endpoint(request: Request):
+    from app.services.summarizer import summarize_overall
     data = await request.json()
     summaries = data.get("summaries", [])
-    result = summarize_overall(summaries)
-    return {"overall_summary": result}
+    async with worker_pool.admit():
+        result = await worker_pool.run_io(summarize_overall, summaries)
+    return {"overall_summary": result, "token_usage": request_usage()}
 
@@ -7,11 +7,13 @@ except ImportError:
     CLOUDINARY_AVAILABLE = False
     print("Warning: Cloudinary not available. Category summarization will use demo mode.")
 
-import requests
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.services.summarizer import summarize_pdf, summarize_overall
-from app.services.category_summarizer import summarize_category_pdfs, batch_summarize_pdfs
+from app.utils.executor import worker_pool
+from app.services.jobs import job_manager
+from app.utils.metrics import record_fallback
+from app.utils.tracing import span
+from app.utils.token_usage import request_usage, set_category
 import tempfile
 import os
 from datetime import datetime
@@ -26,11 +28,27 @@ class CategoryRequest(BaseModel):
     category: str
 
 
+async def _list_category_resources(folder_path: str) -> dict:
+    """List uploads under a Cloudinary folder on the I/O pool"""
+    with span("cloudinary.list", prefix=folder_path) as listing:
+        resources = await worker_pool.run_io(
+            cloudinary.api.resources,
+            type="upload",
+            prefix=folder_path,
+            resource_type="auto",
+            max_results=100
+        )
+        listing.set_attribute("resources", len(resources.get('resources', [])))
+        return resources
+
+
 @router.post("/summarize_category")
 async def summarize_category(request: CategoryRequest):
     """
     Enhanced category summarization with structured output
     """
+    from app.services.category_summarizer import summarize_category_pdfs
+    set_category(request.category)
     try:
         # Use the enhanced category summarizer
         result = summarize_category_pdfs(request.category)
@@ -44,11 +62,13 @@ async def summarize_category(request: CategoryRequest):
             },
             "category": request.category,
             "analysis_type": "enhanced_category_analysis",
+            "token_usage": request_usage(),
             "success": True
         }
         
     except Exception as e:
         print(f"Error in category summarization: {str(e)}")
+        record_fallback("demo")
         # Return enhanced demo response on error
         demo_summary = f"""
 # {request.category} - Demo Legal Analysis
@@ -118,6 +138,7 @@ High precedential value with clear implications for future litigation strategy
 
 def create_demo_category_response(category: str):
     """Create demo response when Cloudinary is not available"""
+    record_fallback("demo")
     return {
         "overall_summary": {
             "category_explanation": f"[DEMO MODE] This would analyze all PDF documents in the '{category}' category. The system would process each document using advanced AI models to provide comprehensive legal analysis.",
@@ -215,8 +236,14 @@ def create_demo_category_response(category: str):
 
 @router.post("/summarize_category_overall")
 async def summarize_category_overall(request: CategoryRequest):
-    category = request.category
-    
+    async with worker_pool.admit():
+        return await _summarize_category_overall(request.category)
+
+
+async def _summarize_category_overall(category: str, on_progress=None):
+    from app.services.summarizer import summarize_overall
+    from app.services.category_pipeline import summarize_category_documents
+    set_category(category)
     # Check if Cloudinary is available
     if not CLOUDINARY_AVAILABLE:
         return create_demo_category_response(category)
@@ -230,34 +257,28 @@ async def summarize_category_overall(request: CategoryRequest):
     folder_path = f"pdfs/{category}"
     try:
         # List all PDFs in the folder
-        resources = cloudinary.api.resources(
-            type="upload",
-            prefix=folder_path,
-            resource_type="auto",
-            max_results=100
-        )
+        resources = await _list_category_resources(folder_path)
         print("[Cloudinary Debug] resources:", resources)
         pdf_urls = [res['secure_url'] for res in resources.get(
             'resources', []) if res.get('format') == 'pdf']
         if not pdf_urls:
             raise HTTPException(
                 status_code=404, detail="No PDFs found in this category.")
-        summaries = []
-        for url in pdf_urls:
-            # Download PDF
-            response = requests.get(url)
-            if response.status_code != 200:
-                continue
-            pdf_bytes = response.content
-            # Summarize PDF
-            summary = summarize_pdf(pdf_bytes)
-            summaries.append({
-                'pdfName': url.split('/')[-1],
-                'summary': summary
-            })
+        # Download, extract and summarize PDFs concurrently
+        result = await summarize_category_documents(
+            [{'name': url.split('/')[-1], 'url': url} for url in pdf_urls], on_progress)
+        summaries = result['summaries']
+        if not summaries:
+            raise HTTPException(
+                status_code=502, detail={"message": "All PDFs failed to summarize.",
+                                         "failures": result['failures']})
         # Get overall summary
-        overall = summarize_overall(summaries)
-        return {"overall_summary": overall}
+        with span("summarize_overall", summaries=len(summaries)):
+            overall = await worker_pool.run_io(summarize_overall, summaries)
+        return {"overall_summary": overall, "failures": result['failures'],
+                "token_usage": request_usage()}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -281,12 +302,7 @@ async def list_pdfs_in_category(request: CategoryRequest):
     )
     folder_path = f"pdfs/{category}"
     try:
-        resources = cloudinary.api.resources(
-            type="upload",
-            prefix=folder_path,
-            resource_type="auto",
-            max_results=100
-        )
+        resources = await _list_category_resources(folder_path)
         pdfs = [
             {
                 'public_id': res.get('public_id'),
@@ -305,8 +321,13 @@ async def list_pdfs_in_category(request: CategoryRequest):
 
 @router.post("/summarize_category_download")
 async def summarize_category_download(request: CategoryRequest):
-    category = request.category
-    
+    async with worker_pool.admit():
+        return await _summarize_category_download(request.category)
+
+
+async def _summarize_category_download(category: str, on_progress=None):
+    from app.services.category_pipeline import summarize_category_documents
+    set_category(category)
     # Check if Cloudinary is available
     if not CLOUDINARY_AVAILABLE:
         return {
@@ -322,12 +343,7 @@ async def summarize_category_download(request: CategoryRequest):
     )
     folder_path = f"pdfs/{category}"
     try:
-        resources = cloudinary.api.resources(
-            type="upload",
-            prefix=folder_path,
-            resource_type="auto",
-            max_results=100
-        )
+        resources = await _list_category_resources(folder_path)
         pdfs = [
             {
                 'public_id': res.get('public_id'),
@@ -342,19 +358,32 @@ async def summarize_category_download(request: CategoryRequest):
         if not pdfs:
             raise HTTPException(
                 status_code=404, detail="No PDFs found in this category.")
-        # Download and summarize each PDF
-        summaries = []
-        for pdf in pdfs:
-            url = pdf['secure_url']
-            response = requests.get(url)
-            if response.status_code != 200:
-                continue
-            pdf_bytes = response.content
-            summary = summarize_pdf(pdf_bytes)
-            summaries.append({
-                'pdfName': pdf['filename'],
-                'summary': summary
-            })
-        return {"summaries": summaries}
+        # Download and summarize PDFs concurrently
+        result = await summarize_category_documents(
+            [{'name': pdf['filename'], 'url': pdf['secure_url']} for pdf in pdfs], on_progress)
+        return {"summaries": result['summaries'], "failures": result['failures'],
+                "token_usage": request_usage()}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs/summarize_category_overall", status_code=202)
+async def summarize_category_overall_job(request: CategoryRequest):
+    """Run /summarize_category_overall as a background job; poll GET /jobs/{job_id}"""
+    job_id = await job_manager.submit(
+        "summarize_category_overall", {"category": request.category},
+        lambda progress: _summarize_category_overall(request.category, progress)
+    )
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+
+@router.post("/jobs/summarize_category_download", status_code=202)
+async def summarize_category_download_job(request: CategoryRequest):
+    """Run /summarize_category_download as a background job; poll GET /jobs/{job_id}"""
+    job_id = await job_manager.submit(
+        "summarize_category_download", {"category": request.category},
+        lambda progress: _summarize_category_download(request.category, progress)
+    )
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
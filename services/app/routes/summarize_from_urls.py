@@ -1,9 +1,13 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import requests
-from app.services.summarizer import summarize_pdf
+from app.config import URLS_MAX_CONCURRENCY
 from app.utils.logger import logger
-from app.services.general_overall_summarizer import summarize_general_overall
+from app.utils.http_client import download_pdf, DownloadError
+from app.utils.parsed_document import ParsedDocument
+from app.utils.executor import worker_pool
+from app.utils.token_usage import request_usage
 
 router = APIRouter()
 
@@ -14,32 +18,53 @@ class UrlsRequest(BaseModel):
 
 @router.post("/summarize_from_urls")
 async def summarize_from_urls(request: UrlsRequest):
-    summaries = []
-    for url in request.urls:
+    async with worker_pool.admit():
+        return await _summarize_from_urls(request)
+
+
+async def _summarize_url(url: str) -> dict:
+    from app.services.summarizer import summarize_document
+    try:
+        logger.info(f"Downloading PDF from URL: {url}")
         try:
-            logger.info(f"Downloading PDF from URL: {url}")
-            response = requests.get(url)
-            if response.status_code != 200:
-                logger.error(
-                    f"Failed to download PDF: {url} (status {response.status_code})")
-                summaries.append(
-                    {"url": url, "error": f"Failed to download PDF: {response.status_code}"})
-                continue
-            pdf_bytes = response.content
+            download = await download_pdf(url)
+        except DownloadError as download_err:
+            logger.error(f"Failed to download PDF: {url} ({download_err})")
+            return {"url": url, "error": str(download_err)}
+        # Large downloads stay in a temp file that extraction reads directly
+        with download:
             try:
-                summary = summarize_pdf(pdf_bytes)
-                summaries.append({"url": url, "summary": summary})
-                logger.info(f"Successfully summarized PDF from URL: {url}")
+                document = ParsedDocument(download.source, download.digest)
+                summary = await worker_pool.run_io(summarize_document, document)
             except Exception as summarize_err:
-                logger.error(
-                    f"Summarization failed for {url}: {summarize_err}")
-                summaries.append(
-                    {"url": url, "error": f"Summarization failed: {summarize_err}"})
-        except Exception as e:
-            logger.error(f"Error processing URL {url}: {e}")
-            summaries.append({"url": url, "error": str(e)})
+                logger.error(f"Summarization failed for {url}: {summarize_err}")
+                return {"url": url, "error": f"Summarization failed: {summarize_err}"}
+        logger.info(f"Successfully summarized PDF from URL: {url}")
+        return {"url": url, "summary": summary}
+    except Exception as e:
+        logger.error(f"Error processing URL {url}: {e}")
+        return {"url": url, "error": str(e)}
+
+
+async def _summarize_from_urls(request: UrlsRequest):
+    from app.services.general_overall_summarizer import summarize_general_overall
+    semaphore = asyncio.Semaphore(URLS_MAX_CONCURRENCY)
+
+    async def bounded(url: str) -> dict:
+        async with semaphore:
+            return await _summarize_url(url)
+
+    # URLs are processed concurrently; results keep the request order
+    results = await asyncio.gather(*(bounded(url) for url in request.urls))
+    summaries = [r for r in results if "error" not in r]
+    failures = [r for r in results if "error" in r]
     logger.info(
-        f"Batch summarize_from_urls completed. Total: {len(request.urls)}")
+        f"Batch summarize_from_urls completed. Total: {len(request.urls)}, "
+        f"failed: {len(failures)}")
+    if not summaries:
+        raise HTTPException(
+            status_code=502, detail={"message": "All PDFs failed to summarize.",
+                                     "failures": failures})
     # Use new general overall summarizer for a single, simple summary
-    overall = summarize_general_overall(summaries)
-    return {"overall_summary": overall}
+    overall = await worker_pool.run_io(summarize_general_overall, summaries)
+    return {"overall_summary": overall, "failures": failures, "token_usage": request_usage()}
@@ -0,0 +1,49 @@
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from app.config import GROQ_TPM_LIMIT
+from app.utils.executor import worker_pool
+from app.utils.token_usage import usage_recorder
+
+router = APIRouter()
+
+
+@router.get("/usage")
+async def usage(group_by: str = "key", window_minutes: float = 60,
+                key: Optional[str] = None, route: Optional[str] = None,
+                category: Optional[str] = None, summary_type: Optional[str] = None):
+    """
+    LLM token consumption over the last `window_minutes`
+    `group_by` is a comma-separated list of key, route, category, summary_type,
+    method, stage and model; the other parameters filter. Grouping by key adds
+    each key's peak tokens per minute as a share of GROQ_TPM_LIMIT.
+    """
+    if not usage_recorder.enabled:
+        raise HTTPException(status_code=503, detail="Token usage is disabled (TOKEN_USAGE_ENABLED=false)")
+    columns = [column.strip() for column in group_by.split(",") if column.strip()]
+    filters = {name: value for name, value in (
+        ("key", key), ("route", route), ("category", category), ("summary_type", summary_type)
+    ) if value is not None}
+    since = time.time() - window_minutes * 60
+
+    def read():
+        usage_recorder.flush()
+        return (usage_recorder.store.summary(columns, since=since, filters=filters),
+                usage_recorder.store.summary([], since=since, filters=filters))
+
+    try:
+        rows, totals = await worker_pool.run_io(read)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if "key" in columns:
+        for row in rows:
+            row["peak_tpm_share"] = round(row["peak_tpm"] / GROQ_TPM_LIMIT, 3)
+    return {
+        "window_minutes": window_minutes,
+        "group_by": columns,
+        "filters": filters,
+        "tpm_limit_per_key": GROQ_TPM_LIMIT,
+        "totals": totals[0] if totals else None,
+        "rows": rows
+    }
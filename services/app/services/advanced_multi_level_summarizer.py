@@ -4,16 +4,16 @@ Uses the existing summarizer.py functions but adds multi-level processing
 Does NOT alter any existing working code
 """
 
-from app.services.summarizer import summarize_pdf  # Use existing working function
-from app.utils.pdf_reader import extract_text_from_pdf  # Use existing utility
+from app.services.summarizer import summarize_document  # Use existing working function
+from app.utils.parsed_document import parse_document
 from app.utils.logger import logger
-from app.config import get_next_groq_api_key  # Use existing config
+from app.services.llm import invoke_llm  # Shared, cached Groq entry point
+from app.utils.token_usage import usage_stage
+from app.utils.metrics import record_fallback
 
 # Use existing working LangChain components
 from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
-from langchain.chains.llm import LLMChain
-from langchain_groq import ChatGroq
 
 
 def create_advanced_summary(file_bytes: bytes, summary_type: str = "detailed", method: str = "abstractive", filename: str = "document.pdf") -> dict:
@@ -32,12 +32,15 @@ def create_advanced_summary(file_bytes: bytes, summary_type: str = "detailed", m
     try:
         logger.info(f"Creating advanced summary: {summary_type} via {method}")
         
+        # The PDF is parsed once and shared by both steps
+        document = parse_document(file_bytes)
+        
         # Step 1: Use existing working summarize_pdf function to get base summary
-        base_summary = summarize_pdf(file_bytes)
+        base_summary = summarize_document(document)
         logger.info("Base summary generated using existing code")
         
-        # Step 2: Extract text using existing utility for additional processing
-        full_text = extract_text_from_pdf(file_bytes)
+        # Step 2: Reuse the extracted text for additional processing
+        full_text = document.text
         text_length = len(full_text)
         
         # Step 3: Create advanced multi-level summary based on parameters
@@ -55,9 +58,6 @@ def create_advanced_summary(file_bytes: bytes, summary_type: str = "detailed", m
 def create_abstractive_summary(base_summary: str, full_text: str, summary_type: str, filename: str) -> dict:
     """Create abstractive (AI-generated) advanced summary"""
     try:
-        # Use existing GROQ configuration
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        
         # Create different prompts based on summary type
         if summary_type == "executive":
             prompt_template = create_executive_prompt_template()
@@ -66,9 +66,6 @@ def create_abstractive_summary(base_summary: str, full_text: str, summary_type:
         else:  # detailed (default)
             prompt_template = create_detailed_prompt_template()
         
-        # Use existing LangChain pattern from working code
-        chain = LLMChain(llm=llm, prompt=prompt_template)
-        
         # Create input with base summary and sample of full text
         text_sample = full_text[:2000] if len(full_text) > 2000 else full_text
         input_data = {
@@ -79,7 +76,8 @@ def create_abstractive_summary(base_summary: str, full_text: str, summary_type:
         }
         
         # Generate advanced summary
-        result = chain.run(input_data)
+        with usage_stage("advanced_call"):
+            result = invoke_llm(prompt_template.format(**input_data))
         
         # Parse and structure the result
         return parse_advanced_summary_result(result, summary_type, method, filename)
@@ -252,6 +250,7 @@ def parse_advanced_summary_result(result: str, summary_type: str, method: str, f
 
 def create_fallback_advanced_summary(summary_type: str, method: str, filename: str) -> dict:
     """Create fallback advanced summary when processing fails"""
+    record_fallback("fallback")
     return {
         "executive_summary": f"Advanced {summary_type} analysis of {filename} completed in fallback mode. This legal document contains structured content suitable for professional review.",
         
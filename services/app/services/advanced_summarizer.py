@@ -1,10 +1,12 @@
-from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain_groq import ChatGroq
-from app.utils.pdf_reader import extract_text_from_pdf
-from app.config import get_next_groq_api_key
+from app.utils.parsed_document import parse_document
+from app.utils.chunker import chunk_for_prompt
+from app.utils.extractive import extractive_engine
+from app.services.llm import invoke_llm
+from app.utils.token_usage import usage_stage
+from app.services.map_reduce import map_reduce
 from app.utils.logger import logger
+from app.utils.metrics import record_fallback
 
 
 # Enhanced prompts with focus on final judgments and structured outputs
@@ -196,13 +198,20 @@ PROMPTS = {
     }
 }
 
+# Map/combine templates, parsed once and shared by every request
+TEMPLATES = {
+    level: (PromptTemplate.from_template(prompts['map']),
+            PromptTemplate.from_template(prompts['combine']))
+    for level, prompts in PROMPTS.items()
+}
+
 
 def advanced_summarize_pdf(file_bytes: bytes, summary_type: str = 'detailed', method: str = 'abstractive') -> dict:
     """
     Advanced PDF summarization with multiple levels and methods
     """
     try:
-        text = extract_text_from_pdf(file_bytes)
+        text = parse_document(file_bytes).text
         logger.info(f"Starting {method} summarization with {summary_type} level")
         
         if method == 'abstractive':
@@ -222,7 +231,7 @@ def compare_summarize_pdf(file_bytes: bytes, summary_type: str = 'detailed') ->
     Generate all three summary methods for comparison
     """
     try:
-        text = extract_text_from_pdf(file_bytes)
+        text = parse_document(file_bytes).text
         
         abstractive = _abstractive_summarize(text, summary_type)
         extractive = _extractive_summarize(text, summary_type)
@@ -250,20 +259,10 @@ def compare_summarize_pdf(file_bytes: bytes, summary_type: str = 'detailed') ->
 def _abstractive_summarize(text: str, level: str) -> dict:
     """Generate abstractive summary using Groq API"""
     try:
-        chunks = [Document(page_content=text[i:i+3000]) for i in range(0, len(text), 3000)]
-        
-        prompts = PROMPTS.get(level, PROMPTS['detailed'])
-        map_prompt = PromptTemplate.from_template(prompts['map'])
-        combine_prompt = PromptTemplate.from_template(prompts['combine'])
+        map_prompt, combine_prompt = TEMPLATES.get(level, TEMPLATES['detailed'])
+        chunks = chunk_for_prompt(text, map_prompt)
         
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        chain = load_summarize_chain(
-            llm, chain_type="map_reduce", 
-            map_prompt=map_prompt, 
-            combine_prompt=combine_prompt
-        )
-        
-        result = chain.invoke(chunks)
+        result = map_reduce(chunks, map_prompt, combine_prompt)
         summary_text = result['output_text'] if isinstance(result, dict) else str(result)
         
         return {
@@ -282,28 +281,6 @@ def _abstractive_summarize(text: str, level: str) -> dict:
 def _extractive_summarize(text: str, level: str) -> dict:
     """Generate extractive summary using sentence scoring"""
     try:
-        sentences = text.split('.')
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-        
-        # Simple scoring based on word frequency
-        words = text.lower().split()
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Score sentences
-        sentence_scores = []
-        for i, sentence in enumerate(sentences):
-            score = 0
-            words_in_sentence = sentence.lower().split()
-            for word in words_in_sentence:
-                if word in word_freq:
-                    score += word_freq[word]
-            if len(words_in_sentence) > 0:
-                score = score / len(words_in_sentence)
-            sentence_scores.append((score, i, sentence))
-        
         # Select top sentences based on level
         num_sentences = {
             'detailed': 10,
@@ -313,10 +290,11 @@ def _extractive_summarize(text: str, level: str) -> dict:
             'bullets': 7
         }.get(level, 10)
         
-        top_sentences = sorted(sentence_scores, key=lambda x: x[0], reverse=True)[:num_sentences]
-        top_sentences = sorted(top_sentences, key=lambda x: x[1])  # Restore order
+        # Shared vectorized scoring; selected sentences keep document order
+        document = extractive_engine.tokenize(text)
+        top_sentences = extractive_engine.top_sentences(document, num_sentences, document_order=True)
         
-        summary = '. '.join([s[2] for s in top_sentences])
+        summary = '. '.join(top_sentences)
         
         return {
             'summary': summary,
@@ -346,8 +324,8 @@ def _hybrid_summarize(text: str, level: str) -> dict:
         Make it a {level} level summary with proper flow and structure.
         """
         
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        refined_summary = llm.invoke(refined_prompt).content
+        with usage_stage("refine"):
+            refined_summary = invoke_llm(refined_prompt)
         
         return {
             'summary': refined_summary,
@@ -364,6 +342,7 @@ def _hybrid_summarize(text: str, level: str) -> dict:
 
 def _create_demo_response(level: str, method: str) -> dict:
     """Create demo response when processing fails"""
+    record_fallback("demo")
     return {
         'summary': f"[DEMO MODE] This would be a {level} {method} summary of the legal document. Advanced AI processing would analyze the content and provide structured insights based on the selected level and method.",
         'method': method,
@@ -0,0 +1,136 @@
+"""
+Pipelined category summarization
+Each PDF moves through download -> extraction -> LLM summarization. Every stage
+has its own concurrency limit, so downloads and extraction for later PDFs
+overlap with LLM calls for earlier ones. Failures are reported per PDF instead
+of aborting the whole category. Downloads go through the shared HTTP client.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from app.config import (
+    CATEGORY_DOWNLOAD_CONCURRENCY,
+    CATEGORY_EXTRACT_CONCURRENCY,
+    CATEGORY_SUMMARIZE_CONCURRENCY,
+    CATEGORY_PDF_TIMEOUT,
+)
+from app.services.summarizer import asummarize_text, summary_cache_key
+from app.utils.pdf_reader import aextract_text_from_pdf
+from app.utils.http_client import download_pdf
+from app.utils.summary_cache import summary_cache
+from app.utils.logger import logger
+from app.utils.tracing import current_span, span
+
+
+class PipelineStageError(Exception):
+    """Raised when a PDF fails in a specific pipeline stage"""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+class CategoryPipeline:
+    """Bounded-concurrency download/extract/summarize pipeline"""
+
+    def __init__(self,
+                 download_concurrency: int = CATEGORY_DOWNLOAD_CONCURRENCY,
+                 extract_concurrency: int = CATEGORY_EXTRACT_CONCURRENCY,
+                 summarize_concurrency: int = CATEGORY_SUMMARIZE_CONCURRENCY,
+                 pdf_timeout: float = CATEGORY_PDF_TIMEOUT):
+        self.download_concurrency = download_concurrency
+        self.extract_concurrency = extract_concurrency
+        self.summarize_concurrency = summarize_concurrency
+        self.pdf_timeout = pdf_timeout
+
+    async def run(self, pdfs: List[Dict], on_progress=None) -> Dict:
+        """
+        Summarize every PDF in `pdfs` (dicts with 'name' and 'url')
+
+        Returns {'summaries': [...], 'failures': [...]}, both in input order.
+        `on_progress(name, status)` is called as each PDF changes stage.
+        """
+        loop = asyncio.get_running_loop()
+        download_sem = asyncio.Semaphore(self.download_concurrency)
+        extract_sem = asyncio.Semaphore(self.extract_concurrency)
+        summarize_sem = asyncio.Semaphore(self.summarize_concurrency)
+
+        def report(name: str, status: str):
+            if on_progress:
+                on_progress(name, status)
+
+        async def process(pdf: Dict) -> Dict:
+            name = pdf['name']
+            # The timeout budget only covers time spent working in a stage,
+            # not time spent queued behind other PDFs.
+            budget = [self.pdf_timeout]
+
+            async def timed(stage: str, coro):
+                started = loop.time()
+                try:
+                    with span(f"category.{stage}", pdf=name):
+                        return await asyncio.wait_for(coro, timeout=max(budget[0], 0.001))
+                except asyncio.TimeoutError:
+                    raise PipelineStageError(
+                        "timeout", f"Timed out after {self.pdf_timeout}s during {stage}")
+                except PipelineStageError:
+                    raise
+                except Exception as e:
+                    raise PipelineStageError(stage, str(e)) from e
+                finally:
+                    budget[0] -= loop.time() - started
+
+            async with download_sem:
+                report(name, "downloading")
+                download = await timed("download", download_pdf(pdf['url']))
+
+            # Large downloads stay in a temp file that extraction reads directly
+            with download:
+                cache_key = summary_cache_key(download.digest)
+                cached = await summary_cache.aget(cache_key)
+                current_span().set_attribute("cache_hit", cached is not None)
+                if cached is not None:
+                    report(name, "done")
+                    return {'pdfName': name, 'summary': cached}
+
+                async with extract_sem:
+                    report(name, "extracting")
+                    text = await timed("extract", aextract_text_from_pdf(download.source))
+
+            async with summarize_sem:
+                report(name, "summarizing")
+                summary = await timed("summarize", asummarize_text(text))
+
+            await summary_cache.aset(cache_key, summary)
+            report(name, "done")
+            return {'pdfName': name, 'summary': summary}
+
+        async def guarded(pdf: Dict) -> Dict:
+            try:
+                with span("category.pdf", pdf=pdf['name'], url=pdf['url']):
+                    return await process(pdf)
+            except PipelineStageError as e:
+                error = {'stage': e.stage, 'error': str(e)}
+            except Exception as e:
+                error = {'stage': 'unknown', 'error': str(e)}
+            logger.error(f"Category pipeline failed for {pdf['name']}: {error['error']}")
+            report(pdf['name'], "failed")
+            return {'pdfName': pdf['name'], 'url': pdf['url'], **error, 'failed': True}
+
+        for pdf in pdfs:
+            report(pdf['name'], "queued")
+        results = await asyncio.gather(*(guarded(pdf) for pdf in pdfs))
+
+        summaries = [r for r in results if not r.get('failed')]
+        failures = [{k: v for k, v in r.items() if k != 'failed'}
+                    for r in results if r.get('failed')]
+        logger.info(
+            f"Category pipeline finished: {len(summaries)} succeeded, {len(failures)} failed")
+        return {'summaries': summaries, 'failures': failures}
+
+
+async def summarize_category_documents(pdfs: List[Dict], on_progress=None,
+                                       pipeline: Optional[CategoryPipeline] = None) -> Dict:
+    """Run the default pipeline over a list of {'name', 'url'} dicts"""
+    return await (pipeline or CategoryPipeline()).run(pdfs, on_progress)
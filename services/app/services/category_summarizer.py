@@ -96,7 +96,8 @@ The {category} category demonstrates consistent application of legal principles
         raise e
 
 
-def batch_summarize_pdfs(pdf_list, summary_type="detailed", method="abstractive"):
+def batch_summarize_pdfs(pdf_list, summary_type="detailed", method="abstractive", on_progress=None,
+                         names=None):
     """
     Batch summarize multiple PDFs with different outputs based on type
     
@@ -104,28 +105,43 @@ def batch_summarize_pdfs(pdf_list, summary_type="detailed", method="abstractive"
         pdf_list: List of PDF file contents or paths
         summary_type: detailed (comprehensive), concise (key points), executive (strategic)
         method: Summarization method (abstractive, extractive, hybrid)
+        on_progress: Optional callback(document_name, status) for job progress
+        names: Optional document names for progress and results (default document_<index>)
     """
     try:
         logger.info(f"Starting batch summarization of {len(pdf_list)} PDFs with {summary_type} type")
         
         summaries = []
+        names = names or [f"document_{i}" for i in range(len(pdf_list))]
+        
+        def report(index, status):
+            if on_progress:
+                on_progress(names[index], status)
+        
+        for i in range(len(pdf_list)):
+            report(i, "queued")
         
         for i, pdf_content in enumerate(pdf_list):
             try:
+                report(i, "summarizing")
                 # Use the advanced summarizer for each PDF
                 summary = advanced_summarize_pdf(pdf_content, summary_type, method)
                 summaries.append({
                     "document_index": i,
+                    "document": names[i],
                     "summary": summary,
                     "status": "success"
                 })
+                report(i, "done")
                 logger.info(f"Successfully summarized document {i+1}/{len(pdf_list)}")
             except Exception as e:
                 summaries.append({
                     "document_index": i,
+                    "document": names[i],
                     "summary": f"Error processing document: {str(e)}",
                     "status": "error"
                 })
+                report(i, "failed")
                 logger.error(f"Error summarizing document {i+1}: {str(e)}")
         
         # Create different batch results based on summary type
@@ -9,34 +9,39 @@ from typing import Dict, List, Union, Tuple
 import re
 import json
 from collections import Counter
-from langchain.docstore.document import Document
+from functools import lru_cache
 from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain.chains.llm import LLMChain
-from langchain_groq import ChatGroq
-from app.utils.pdf_reader import extract_text_from_pdf
-from app.config import get_next_groq_api_key
+from app.utils.parsed_document import parse_document
+from app.utils.chunker import chunk_for_prompt
+from app.services.llm import invoke_llm
+from app.utils.token_usage import usage_stage
 from app.utils.logger import logger
+from app.services.map_reduce import map_reduce
 
-# Text processing libraries for extractive summarization
-import nltk
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+@lru_cache(maxsize=None)
+def _nltk():
+    """
+    Import nltk on first use and fetch its tokenizer and stopword data if missing
+    nltk, sklearn and numpy are only needed for extractive summaries, so they
+    are not loaded (or downloaded) when the module is imported.
+    """
+    import nltk.corpus
+    import nltk.tokenize
+    for resource, package in (('tokenizers/punkt', 'punkt'), ('corpora/stopwords', 'stopwords')):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package)
+    return nltk
+
+
+def sent_tokenize(text: str) -> List[str]:
+    return _nltk().tokenize.sent_tokenize(text)
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
 
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
+def word_tokenize(text: str) -> List[str]:
+    return _nltk().tokenize.word_tokenize(text)
 
 
 class SummaryLevelManager:
@@ -168,12 +173,26 @@ class SummaryLevelManager:
         }
         return prompts.get(level, prompts['detailed'])
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_templates(level: str) -> Tuple[PromptTemplate, PromptTemplate]:
+        """(map, combine) templates, built once per level and shared by every request"""
+        prompts = SummaryLevelManager.get_prompts(level)
+        return (PromptTemplate.from_template(prompts['map']),
+                PromptTemplate.from_template(prompts['combine']))
+
 
 class ExtractiveSummarizer:
     """Handles extractive summarization using sentence ranking algorithms"""
     
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+        self._stop_words = None
+    
+    @property
+    def stop_words(self) -> set:
+        if self._stop_words is None:
+            self._stop_words = set(_nltk().corpus.stopwords.words('english'))
+        return self._stop_words
         
     def extract_sentences(self, text: str, num_sentences: int = 5) -> List[str]:
         """Extract top sentences using TF-IDF scoring"""
@@ -181,6 +200,9 @@ class ExtractiveSummarizer:
         if len(sentences) <= num_sentences:
             return sentences
             
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         # Calculate TF-IDF scores for sentences
         vectorizer = TfidfVectorizer(stop_words='english', lowercase=True)
         
@@ -253,7 +275,7 @@ class AdvancedSummarizer:
             method: 'abstractive', 'extractive', 'hybrid'
         """
         try:
-            text = extract_text_from_pdf(file_bytes)
+            text = parse_document(file_bytes).text
             logger.info(f"Starting {method} summarization with {summary_type} level")
             
             if method == 'abstractive':
@@ -269,21 +291,10 @@ class AdvancedSummarizer:
     
     def _abstractive_summarize(self, text: str, level: str) -> Dict:
         """Generate abstractive summary using LLM"""
-        chunks = [Document(page_content=text[i:i+3000]) 
-                 for i in range(0, len(text), 3000)]
-        
-        prompts = self.level_manager.get_prompts(level)
-        map_prompt = PromptTemplate.from_template(prompts['map'])
-        combine_prompt = PromptTemplate.from_template(prompts['combine'])
+        map_prompt, combine_prompt = self.level_manager.get_templates(level)
+        chunks = chunk_for_prompt(text, map_prompt)
         
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        chain = load_summarize_chain(
-            llm, chain_type="map_reduce", 
-            map_prompt=map_prompt, 
-            combine_prompt=combine_prompt
-        )
-        
-        result = chain.invoke(chunks)
+        result = map_reduce(chunks, map_prompt, combine_prompt)
         
         return {
             'summary': result['output_text'] if isinstance(result, dict) else str(result),
@@ -334,10 +345,8 @@ class AdvancedSummarizer:
         {prompts['map'].replace('{text}', 'Based on the extracted context above')}
         """
         
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template("{prompt}"))
-        
-        abstractive_result = chain.run({"prompt": hybrid_prompt})
+        with usage_stage("hybrid"):
+            abstractive_result = invoke_llm(hybrid_prompt)
         
         return {
             'summary': abstractive_result,
@@ -356,7 +365,7 @@ class AdvancedSummarizer:
     def compare_summaries(self, file_bytes: bytes, level: str = 'detailed') -> Dict:
         """Generate all three summary methods for comparison"""
         try:
-            text = extract_text_from_pdf(file_bytes)
+            text = parse_document(file_bytes).text
             
             abstractive = self._abstractive_summarize(text, level)
             extractive = self._extractive_summarize(text, level)
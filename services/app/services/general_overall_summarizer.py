@@ -1,8 +1,6 @@
-from langchain.docstore.document import Document
-from langchain.prompts import PromptTemplate
-from langchain.chains.llm import LLMChain
-from langchain_groq import ChatGroq
-from app.config import get_next_groq_api_key
+from app.services.llm import invoke_llm
+from app.utils.token_usage import usage_stage
+from app.utils.metrics import observe_stage, record_fallback
 
 
 def summarize_general_overall(summaries: list) -> dict:
@@ -33,31 +31,31 @@ Provide a TRUE overall summary - not individual case pros/cons, but synthesized
 Summaries:
 {joined}
 '''
-    llm = ChatGroq(groq_api_key=get_next_groq_api_key(),
-                   model_name="llama3-8b-8192")
-    chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template("{text}"))
     import json
     import re
-    result = chain.run({"text": prompt})
-    # Try to parse as JSON, else return structured fallback
-    try:
-        return json.loads(result)
-    except Exception:
-        # Try to extract a JSON object from the result
-        match = re.search(r'\{.*\}', result, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except Exception:
-                pass
-        # Return structured fallback response
-        return {
-            "category_overview": "Analysis failed - unable to parse response",
-            "overall_pros": ["Analysis could not be completed"],
-            "overall_cons": ["Please try again or contact support"],
-            "final_judgment": "Overall analysis could not be completed due to parsing error.",
-            "legal_insights": ["Please retry the request"],
-            "case_count": "Unknown",
-            "dominant_themes": ["Analysis incomplete"],
-            "raw": result
-        }
+    with usage_stage("overall"):
+        result = invoke_llm(prompt)
+    with observe_stage("json_parse"):
+        # Try to parse as JSON, else return structured fallback
+        try:
+            return json.loads(result)
+        except Exception:
+            # Try to extract a JSON object from the result
+            match = re.search(r'\{.*\}', result, re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group(0))
+                except Exception:
+                    pass
+            # Return structured fallback response
+            record_fallback("parse_error")
+            return {
+                "category_overview": "Analysis failed - unable to parse response",
+                "overall_pros": ["Analysis could not be completed"],
+                "overall_cons": ["Please try again or contact support"],
+                "final_judgment": "Overall analysis could not be completed due to parsing error.",
+                "legal_insights": ["Please retry the request"],
+                "case_count": "Unknown",
+                "dominant_themes": ["Analysis incomplete"],
+                "raw": result
+            }
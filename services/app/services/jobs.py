@@ -0,0 +1,232 @@
+"""
+Background job subsystem for long-running summaries
+A POST creates a job and returns its id immediately; the work runs as an
+asyncio task and records per-PDF progress. Job state and results persist in
+SQLite so clients can poll GET /jobs/{id} and survive a dropped connection.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import JOB_STORE_PATH, JOB_MAX_CONCURRENT
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+from app.utils.sqlite import connect
+from app.utils.tracing import span
+from app.utils.token_usage import start_totals
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobStore:
+    """SQLite persistence for job status, progress and results"""
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                "params TEXT, progress TEXT, result TEXT, error TEXT, owner_pid INTEGER, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return connect(self.path)
+
+    def create(self, kind: str, params: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, progress, owner_pid, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params),
+                 json.dumps({"total": 0, "completed": 0, "failed": 0, "items": {}}),
+                 os.getpid(), now, now)
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        columns = []
+        values = []
+        for name, value in fields.items():
+            if name in ("params", "progress", "result"):
+                value = json.dumps(value)
+            columns.append(f"{name} = ?")
+            values.append(value)
+        columns.append("updated_at = ?")
+        values.extend([time.time(), job_id])
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(columns)} WHERE id = ?", values)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, params, progress, result, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "params": json.loads(row[3]) if row[3] else {},
+            "progress": json.loads(row[4]) if row[4] else {},
+            "result": json.loads(row[5]) if row[5] else None,
+            "error": row[6],
+            "created_at": row[7],
+            "updated_at": row[8]
+        }
+
+    def fail_orphaned(self, reason: str):
+        """Mark queued/running jobs whose owning worker process is gone as failed"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchall()
+            orphaned = [job_id for job_id, pid in rows if not _process_alive(pid)]
+            conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                [(FAILED, reason, time.time(), job_id) for job_id in orphaned]
+            )
+        return len(orphaned)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid or pid == os.getpid():
+        # Our own pid means a previous process reused it; nothing of ours runs yet
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobProgress:
+    """
+    Per-item progress tracker handed to job functions
+    Safe to call from the event loop and from worker threads. The SQLite write
+    runs on the I/O thread pool, and updates arriving while one is queued are
+    folded into it.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.items = {}
+        self._lock = threading.Lock()
+        # Serializes writes so an older snapshot never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._scheduled = False
+
+    def __call__(self, item: str, status: str):
+        with self._lock:
+            self.items[item] = status
+            if self._scheduled:
+                return
+            self._scheduled = True
+        worker_pool.thread_pool.submit(self.flush)
+
+    def flush(self):
+        """Write the latest progress to the store"""
+        with self._write_lock:
+            with self._lock:
+                self._scheduled = False
+                statuses = list(self.items.values())
+                progress = {
+                    "total": len(statuses),
+                    "completed": statuses.count("done"),
+                    "failed": statuses.count("failed"),
+                    "items": dict(self.items)
+                }
+            try:
+                self.store.update(self.job_id, progress=progress)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save progress for job {self.job_id}: {e}")
+
+
+JobFunction = Callable[[JobProgress], Awaitable[Any]]
+
+
+class JobManager:
+    """Schedules job functions as asyncio tasks with a concurrency cap"""
+
+    def __init__(self, store: Optional[JobStore] = None, max_concurrent: int = JOB_MAX_CONCURRENT):
+        self._store = store
+        self.max_concurrent = max_concurrent
+        self._semaphore = None
+        self._tasks = set()
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    def recover(self):
+        """Called on startup: jobs owned by dead worker processes cannot resume"""
+        count = self.store.fail_orphaned("Interrupted by service restart")
+        if count:
+            logger.warning(f"Marked {count} interrupted jobs as failed")
+
+    async def submit(self, kind: str, params: Dict, func: JobFunction) -> str:
+        """Create a job and start running func(progress) in the background"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        # The first access also opens the store and creates its table
+        job_id = await worker_pool.run_io(lambda: self.store.create(kind, params))
+        task = asyncio.create_task(self._run(job_id, kind, func))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"Queued {kind} job {job_id}")
+        return job_id
+
+    async def _run(self, job_id: str, kind: str, func: JobFunction):
+        async with self._semaphore:
+            await worker_pool.run_io(self.store.update, job_id, status=RUNNING)
+            progress = JobProgress(self.store, job_id)
+            try:
+                # Continues the trace of the request that submitted the job
+                with span(f"job.{kind}", job_id=job_id):
+                    # Tokens are counted per job, not against the submitting request
+                    usage = start_totals()
+                    result = await func(progress)
+                if isinstance(result, dict):
+                    result["token_usage"] = usage.as_dict()
+                await worker_pool.run_io(progress.flush)
+                await worker_pool.run_io(self.store.update, job_id, status=COMPLETED, result=result)
+                logger.info(f"Job {job_id} completed")
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                await worker_pool.run_io(progress.flush)
+                await worker_pool.run_io(
+                    self.store.update, job_id, status=FAILED,
+                    error=detail if isinstance(detail, str) else json.dumps(detail))
+                logger.error(f"Job {job_id} failed: {detail}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# Create global instance
+job_manager = JobManager()
@@ -0,0 +1,326 @@
+"""
+Rate-limit-aware scheduler for the configured GROQ API keys
+Each key has a request bucket (RPM) and a token bucket (TPM) fed by estimated
+prompt tokens. A request goes to the key that can serve it soonest; keys that
+answer 429 are parked until their Retry-After, and keys that keep failing
+cool down with exponential backoff. A single worker keeps budgets in memory;
+with the SQLite backend (the default when WEB_CONCURRENCY is above 1) they
+live in one file under DATA_DIR, so every uvicorn worker sees the same
+budgets at the cost of a locked write per call, which async callers make
+from the I/O thread pool.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    GROQ_API_KEYS,
+    GROQ_RPM_LIMIT,
+    GROQ_TPM_LIMIT,
+    KEY_SCHEDULER_BACKEND,
+    KEY_SCHEDULER_PATH,
+    KEY_COOLDOWN_SECONDS,
+    KEY_MAX_COOLDOWN_SECONDS,
+)
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+
+_STATE_FIELDS = ("rpm_level", "tpm_level", "updated_at", "cooldown_until", "failures")
+
+
+def _key_id(api_key: str) -> str:
+    # Raw keys never leave the process; state is stored under a digest
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+class MemoryKeyStateStore:
+    """Per-process key state, for single-worker deployments and tests"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def transaction(self, key_ids: List[str], update):
+        with self._lock:
+            states = {key_id: dict(self._states.get(key_id) or {}) for key_id in key_ids}
+            result = update(states)
+            self._states.update(states)
+            return result
+
+    def read(self, key_ids: List[str]) -> Dict[str, Dict]:
+        with self._lock:
+            return {key_id: dict(self._states.get(key_id) or {}) for key_id in key_ids}
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+class SQLiteKeyStateStore:
+    """Key state shared by every worker process on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection per thread, reused across calls
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS key_state ("
+            "key_id TEXT PRIMARY KEY, rpm_level REAL, tpm_level REAL, updated_at REAL, "
+            "cooldown_until REAL, failures INTEGER)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return conn
+
+    def _select(self, conn, key_ids: List[str]) -> Dict[str, Dict]:
+        states = {key_id: {} for key_id in key_ids}
+        placeholders = ", ".join("?" for _ in key_ids)
+        rows = conn.execute(
+            f"SELECT key_id, {', '.join(_STATE_FIELDS)} FROM key_state "
+            f"WHERE key_id IN ({placeholders})", key_ids
+        ).fetchall()
+        for row in rows:
+            states[row[0]] = dict(zip(_STATE_FIELDS, row[1:]))
+        return states
+
+    def transaction(self, key_ids: List[str], update):
+        conn = self._connection()
+        try:
+            # IMMEDIATE takes the write lock up front so reservations never interleave
+            conn.execute("BEGIN IMMEDIATE")
+            states = self._select(conn, key_ids)
+            result = update(states)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO key_state (key_id, {', '.join(_STATE_FIELDS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?)",
+                [(key_id, *(state[f] for f in _STATE_FIELDS)) for key_id, state in states.items()]
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def read(self, key_ids: List[str]) -> Dict[str, Dict]:
+        """Current state without taking the write lock"""
+        return self._select(self._connection(), key_ids)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM key_state")
+
+
+class KeyScheduler:
+    """Picks the API key that can serve a request soonest and reserves its budget"""
+
+    def __init__(self, keys: List[str], store=None, rpm: int = GROQ_RPM_LIMIT,
+                 tpm: int = GROQ_TPM_LIMIT):
+        self.keys = list(keys)
+        self.store = store or MemoryKeyStateStore()
+        self.rpm = rpm
+        self.tpm = tpm
+        self._ids = {key: _key_id(key) for key in self.keys}
+
+    def _refill(self, state: Dict, now: float) -> Dict:
+        if not state:
+            state.update(rpm_level=float(self.rpm), tpm_level=float(self.tpm),
+                         updated_at=now, cooldown_until=0.0, failures=0)
+        elapsed = max(0.0, now - state["updated_at"])
+        state["rpm_level"] = min(float(self.rpm), state["rpm_level"] + elapsed * self.rpm / 60.0)
+        state["tpm_level"] = min(float(self.tpm), state["tpm_level"] + elapsed * self.tpm / 60.0)
+        state["updated_at"] = now
+        return state
+
+    def _ready_at(self, state: Dict, tokens: int, now: float) -> float:
+        """Earliest time both buckets can cover this request"""
+        tokens = min(tokens, self.tpm)
+        rpm_wait = max(0.0, 1.0 - state["rpm_level"]) * 60.0 / self.rpm
+        tpm_wait = max(0.0, tokens - state["tpm_level"]) * 60.0 / self.tpm
+        return max(now + rpm_wait, now + tpm_wait, state["cooldown_until"])
+
+    def reserve(self, tokens: int = 0, exclude=()) -> Tuple[str, float]:
+        """
+        Reserve capacity on the best key; returns (key, seconds to wait before using it)
+        Keys in exclude (e.g. one already serving a hedged request) are skipped
+        unless no other key exists.
+        """
+        if not self.keys:
+            raise RuntimeError("No GROQ API keys configured!")
+        candidates = [key for key in self.keys if key not in exclude] or self.keys
+        key_ids = [self._ids[key] for key in candidates]
+
+        def update(states):
+            now = time.time()
+            best = None
+            for key in candidates:
+                state = self._refill(states[self._ids[key]], now)
+                ready_at = self._ready_at(state, tokens, now)
+                if best is None or ready_at < best[1]:
+                    best = (key, ready_at)
+            key, ready_at = best
+            state = states[self._ids[key]]
+            # Levels may go negative: that debt is what makes later callers wait
+            state["rpm_level"] -= 1
+            state["tpm_level"] -= min(tokens, self.tpm)
+            return key, max(0.0, ready_at - now)
+
+        return self.store.transaction(key_ids, update)
+
+    def has_capacity(self, tokens: int = 0, exclude=()) -> bool:
+        """True if a key outside exclude could serve this request right now (reads only)"""
+        candidates = [key for key in self.keys if key not in exclude]
+        if not candidates:
+            return False
+        states = self.store.read([self._ids[key] for key in candidates])
+        now = time.time()
+        return any(self._ready_at(self._refill(states[self._ids[key]], now), tokens, now) <= now
+                   for key in candidates)
+
+    @property
+    def blocking(self) -> bool:
+        """True when key state lives on disk"""
+        return isinstance(self.store, SQLiteKeyStateStore)
+
+    def warn_if_unshared(self):
+        """Called on startup: per-process budgets in a uvicorn worker overrun every key"""
+        # uvicorn starts its workers with multiprocessing; a single worker has no parent
+        if not self.blocking and multiprocessing.parent_process() is not None:
+            logger.warning(
+                "Key state is per process but this is one of several uvicorn workers; each "
+                "spends the full RPM/TPM budget of every key. Set KEY_SCHEDULER_BACKEND=sqlite "
+                "(or WEB_CONCURRENCY) to share it.")
+
+    async def _off_loop(self, func, *args):
+        # In-memory updates are cheap enough to make on the event loop
+        if not self.blocking:
+            return func(*args)
+        return await worker_pool.run_io(func, *args)
+
+    def acquire(self, tokens: int = 0, exclude=()) -> str:
+        """Blocking reserve for code running off the event loop; sleeps until capacity"""
+        key, wait = self.reserve(tokens, exclude)
+        if wait > 0:
+            logger.info(f"All GROQ keys busy, waiting {wait:.1f}s for capacity")
+            time.sleep(wait)
+        return key
+
+    async def aacquire(self, tokens: int = 0, exclude=()) -> str:
+        """Async variant of acquire"""
+        key, wait = await self._off_loop(self.reserve, tokens, exclude)
+        if wait > 0:
+            logger.info(f"All GROQ keys busy, waiting {wait:.1f}s for capacity")
+            await asyncio.sleep(wait)
+        return key
+
+    def _update_key(self, api_key: str, change):
+        key_id = self._ids.get(api_key) or _key_id(api_key)
+
+        def update(states):
+            change(self._refill(states[key_id], time.time()))
+
+        self.store.transaction([key_id], update)
+
+    def key_label(self, api_key: str) -> str:
+        """Short, non-secret key identifier used in logs, stats and metrics"""
+        return (self._ids.get(api_key) or _key_id(api_key))[:6]
+
+    def report_success(self, api_key: str, reserved_tokens: int = 0,
+                       used_tokens: Optional[int] = None):
+        """Clear failure state and settle the token estimate against actual usage"""
+        def change(state):
+            state["failures"] = 0
+            if used_tokens is not None:
+                state["tpm_level"] -= used_tokens - min(reserved_tokens, self.tpm)
+
+        self._update_key(api_key, change)
+
+    def report_error(self, api_key: str, error: Exception) -> bool:
+        """Park or cool down a key after a failed call; True if it was rate limited"""
+        status = error_status_code(error)
+        now = time.time()
+        if status == 429:
+            delay = _retry_after(error) or KEY_COOLDOWN_SECONDS
+            logger.warning(f"GROQ key {self._ids.get(api_key, '?')[:6]} rate limited for {delay:.0f}s")
+
+            def change(state):
+                state["cooldown_until"] = max(state["cooldown_until"], now + delay)
+
+            self._update_key(api_key, change)
+            return True
+        if status is not None and status < 500 and status not in (401, 403):
+            # Request errors (bad prompt etc.) say nothing about the key
+            return False
+
+        def change(state):
+            state["failures"] += 1
+            delay = min(KEY_MAX_COOLDOWN_SECONDS,
+                        KEY_COOLDOWN_SECONDS * 2 ** (state["failures"] - 1))
+            state["cooldown_until"] = max(state["cooldown_until"], now + delay)
+
+        self._update_key(api_key, change)
+        return False
+
+    async def areport_success(self, api_key: str, reserved_tokens: int = 0,
+                              used_tokens: Optional[int] = None):
+        """Async variant of report_success"""
+        await self._off_loop(self.report_success, api_key, reserved_tokens, used_tokens)
+
+    async def areport_error(self, api_key: str, error: Exception) -> bool:
+        """Async variant of report_error"""
+        return await self._off_loop(self.report_error, api_key, error)
+
+    def stats(self) -> List[Dict]:
+        """Budgets as of now; refilled on a copy, so nothing is written"""
+        key_ids = [self._ids[key] for key in self.keys]
+        if not key_ids:
+            return []
+        states = self.store.read(key_ids)
+        now = time.time()
+        rows = []
+        for key in self.keys:
+            state = self._refill(states[self._ids[key]], now)
+            rows.append({
+                "key": self._ids[key][:6],
+                "requests_available": round(state["rpm_level"], 2),
+                "tokens_available": round(state["tpm_level"]),
+                "cooldown_seconds": round(max(0.0, state["cooldown_until"] - now), 1),
+                "failures": state["failures"]
+            })
+        return rows
+
+
+def create_key_state_store(name: str = KEY_SCHEDULER_BACKEND):
+    if name == "sqlite":
+        return SQLiteKeyStateStore(KEY_SCHEDULER_PATH)
+    return MemoryKeyStateStore()
+
+
+# Create global instance
+key_scheduler = KeyScheduler(GROQ_API_KEYS, create_key_state_store())
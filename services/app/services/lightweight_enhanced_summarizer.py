@@ -5,18 +5,32 @@ Works on resource-constrained environments while providing advanced features
 
 import re
 import json
-from collections import Counter
-from typing import Dict, List, Union
-from app.utils.pdf_reader import extract_text_from_pdf
+import asyncio
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+from app.utils.parsed_document import ParsedDocument, aparse_document, parse_document
 from app.utils.logger import logger
+from app.utils.summary_cache import summary_cache, make_summary_key
+from app.utils.executor import worker_pool
+from app.utils.extractive import ExtractiveEngine, extractive_engine
+from app.utils.sections import Section, SectionDetector, section_texts
 
 # Import only the existing working components
-from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain.chains.llm import LLMChain
-from langchain_groq import ChatGroq
-from app.config import get_next_groq_api_key
+from app.config import GROQ_MODEL_NAME
+from app.services.map_reduce import (
+    map_reduce,
+    astream_map_reduce,
+    amap_chunks,
+    acollapse,
+    run_sync,
+    timed_llm,
+)
+from app.services.llm import invoke_llm
+from app.utils.token_usage import usage_stage
+from app.services.page_pipeline import astream_map_reduce_pdf
+from app.utils.pdf_reader import PdfSource
+from app.utils.chunker import achunk_for_prompt, chunk_for_prompt, chunk_budget, estimate_tokens, plan_chunks
 
 
 class LightweightSummaryLevelManager:
@@ -148,60 +162,31 @@ class LightweightSummaryLevelManager:
         }
         return prompts.get(level, prompts['detailed'])
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_templates(level: str) -> Tuple[PromptTemplate, PromptTemplate]:
+        """(map, combine) templates, built once per level and shared by every request"""
+        prompts = LightweightSummaryLevelManager.get_prompts(level)
+        return (PromptTemplate.from_template(prompts['map']),
+                PromptTemplate.from_template(prompts['combine']))
+
 
 class LightweightExtractiveSummarizer:
     """Lightweight extractive summarization using basic text processing"""
     
-    def __init__(self):
-        self.stop_words = set([
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'been', 'be', 'have', 
-            'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-            'this', 'that', 'these', 'those', 'it', 'its', 'he', 'she', 'they',
-            'them', 'their', 'there', 'where', 'when', 'who', 'what', 'which', 'why'
-        ])
-        
-        self.legal_terms = {
-            'court': 4, 'judge': 4, 'ruling': 5, 'decision': 5, 'verdict': 5,
-            'plaintiff': 4, 'defendant': 4, 'evidence': 4, 'testimony': 3,
-            'appeal': 4, 'statute': 4, 'law': 3, 'legal': 3, 'case': 3,
-            'held': 5, 'ruled': 5, 'decided': 5, 'found': 4, 'concluded': 4,
-            'jurisdiction': 3, 'precedent': 4, 'contract': 3, 'liability': 4,
-            'damages': 4, 'injunction': 3, 'motion': 3, 'order': 3, 'judgment': 5
-        }
+    def __init__(self, engine: ExtractiveEngine = extractive_engine):
+        # Scoring is vectorized in the shared engine; the document is tokenized once
+        self.engine = engine
+        self.stop_words = engine.stop_words
+        self.legal_terms = engine.legal_terms
         
     def extract_sentences(self, text: str, num_sentences: int = 5) -> List[str]:
         """Extract top sentences using frequency-based scoring"""
-        sentences = self._split_sentences(text)
-        
-        if len(sentences) <= num_sentences:
-            return sentences
-            
-        # Score sentences
-        sentence_scores = []
-        word_freq = self._get_word_frequencies(text)
-        
-        for sentence in sentences:
-            score = self._score_sentence(sentence, word_freq)
-            sentence_scores.append((sentence, score))
-        
-        # Sort by score and return top sentences
-        top_sentences = sorted(sentence_scores, key=lambda x: x[1], reverse=True)
-        return [sentence for sentence, score in top_sentences[:num_sentences]]
+        return self.engine.top_sentences(self.engine.tokenize(text), num_sentences)
     
     def extract_key_phrases(self, text: str, num_phrases: int = 10) -> List[str]:
         """Extract key phrases using frequency analysis"""
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        words = [w for w in words if w not in self.stop_words and len(w) > 3]
-        
-        word_freq = Counter(words)
-        
-        # Boost legal terms
-        for word, count in word_freq.items():
-            if word in self.legal_terms:
-                word_freq[word] = count + self.legal_terms[word]
-        
-        return [word for word, count in word_freq.most_common(num_phrases)]
+        return self.engine.key_phrases(self.engine.tokenize(text), num_phrases)
     
     def create_extractive_summary(self, text: str, level: str) -> Dict[str, Union[str, List[str]]]:
         """Create extractive summary based on level"""
@@ -215,8 +200,9 @@ class LightweightExtractiveSummarizer:
         
         config = level_configs.get(level, level_configs['detailed'])
         
-        key_sentences = self.extract_sentences(text, config['sentences'])
-        key_phrases = self.extract_key_phrases(text, config['phrases'])
+        document = self.engine.tokenize(text)
+        key_sentences = self.engine.top_sentences(document, config['sentences'])
+        key_phrases = self.engine.key_phrases(document, config['phrases'])
         
         # Format based on level
         if level == 'bullets':
@@ -230,42 +216,6 @@ class LightweightExtractiveSummarizer:
             'key_phrases': key_phrases,
             'extraction_method': 'frequency_legal_weighted'
         }
-    
-    def _split_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-        return sentences
-    
-    def _get_word_frequencies(self, text: str) -> Dict[str, int]:
-        """Get word frequencies"""
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        words = [w for w in words if w not in self.stop_words and len(w) > 3]
-        return Counter(words)
-    
-    def _score_sentence(self, sentence: str, word_freq: Dict[str, int]) -> float:
-        """Score a sentence based on word frequencies and legal terms"""
-        words = sentence.lower().split()
-        score = 0.0
-        word_count = 0
-        
-        for word in words:
-            if word not in self.stop_words and len(word) > 3:
-                # Base frequency score
-                score += word_freq.get(word, 0)
-                # Bonus for legal terms
-                if word in self.legal_terms:
-                    score += self.legal_terms[word] * 2
-                word_count += 1
-        
-        # Normalize by sentence length (prefer medium-length sentences)
-        if word_count > 0:
-            score = score / word_count
-            # Penalty for very short or very long sentences
-            if word_count < 5 or word_count > 50:
-                score *= 0.7
-                
-        return score
 
 
 class LightweightAdvancedSummarizer:
@@ -282,54 +232,113 @@ class LightweightAdvancedSummarizer:
         Advanced PDF summarization with multiple levels and methods
         Uses lightweight processing for extractive, Groq API for abstractive
         """
+        return self.summarize_document(parse_document(file_bytes), summary_type, method)
+    
+    def summarize_document(self, document: ParsedDocument, summary_type: str = 'detailed',
+                           method: str = 'abstractive') -> Dict:
+        """summarize_pdf for a document that may already be extracted"""
         try:
-            text = extract_text_from_pdf(file_bytes)
+            cache_key = make_summary_key(document.digest, summary_type, method)
+            cached = summary_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached {method} summary with {summary_type} level")
+                return cached
+            
             logger.info(f"Starting {method} summarization with {summary_type} level")
             
-            if method == 'abstractive':
-                return self._abstractive_summarize(text, summary_type)
+            stream_source = document.stream_source() if method == 'abstractive' else None
+            if stream_source is not None:
+                result = self._abstractive_summarize_stream(stream_source, summary_type)
+            elif method == 'abstractive':
+                result = self._abstractive_summarize(document.text, summary_type)
             elif method == 'extractive':
-                return self._extractive_summarize(text, summary_type)
+                result = self._extractive_summarize(document.text, summary_type)
             else:  # hybrid
-                return self._hybrid_summarize(text, summary_type)
+                result = self._hybrid_summarize(document.text, summary_type)
+            
+            summary_cache.set(cache_key, result)
+            return result
                 
         except Exception as e:
             logger.error(f"Error in lightweight PDF summarization: {e}")
             raise
     
-    def _abstractive_summarize(self, text: str, level: str) -> Dict:
-        """Generate abstractive summary using Groq API (existing working method)"""
-        chunks = [Document(page_content=text[i:i+3000]) 
-                 for i in range(0, len(text), 3000)]
-        
-        prompts = self.level_manager.get_prompts(level)
-        map_prompt = PromptTemplate.from_template(prompts['map'])
-        combine_prompt = PromptTemplate.from_template(prompts['combine'])
+    async def astream_summarize(self, file_bytes: bytes, summary_type: str = 'detailed',
+                                method: str = 'abstractive'):
+        """
+        Streaming variant of summarize_pdf
+        Abstractive runs emit 'map' and 'token' events as they happen; every run
+        ends with a 'done' event carrying the same result dict summarize_pdf returns.
+        """
+        document = await aparse_document(file_bytes)
+        cache_key = make_summary_key(document.digest, summary_type, method)
+        cached = await summary_cache.aget(cache_key)
+        if cached is not None:
+            yield {'event': 'done', 'result': cached, 'cached': True}
+            return
         
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        chain = load_summarize_chain(
-            llm, chain_type="map_reduce", 
-            map_prompt=map_prompt, 
-            combine_prompt=combine_prompt
-        )
+        text = await document.atext()
+        logger.info(f"Starting streamed {method} summarization with {summary_type} level")
         
-        result = chain.invoke(chunks)
+        if method == 'abstractive':
+            map_prompt, combine_prompt = self._abstractive_prompts(summary_type)
+            chunks = await achunk_for_prompt(text, map_prompt)
+            async for event in astream_map_reduce(chunks, map_prompt, combine_prompt):
+                if event['event'] != 'done':
+                    yield event
+                    continue
+                result = self._abstractive_result(event['output_text'], summary_type, len(chunks))
+        elif method == 'extractive':
+            result = await worker_pool.run_io(self._extractive_summarize, text, summary_type)
+        else:  # hybrid
+            result = await worker_pool.run_io(self._hybrid_summarize, text, summary_type)
         
+        await summary_cache.aset(cache_key, result)
+        yield {'event': 'done', 'result': result, 'cached': False}
+    
+    def chunk_plan(self, text: str, level: str = 'detailed') -> Dict:
+        """Chunk count and token budget an abstractive summary would use"""
+        map_prompt, _ = self._abstractive_prompts(level)
+        return plan_chunks(text, map_prompt)
+    
+    def _abstractive_prompts(self, level: str):
+        return self.level_manager.get_templates(level)
+    
+    @staticmethod
+    def _abstractive_result(summary: str, level: str, chunk_count: int) -> Dict:
         return {
-            'summary': result['output_text'] if isinstance(result, dict) else str(result),
+            'summary': summary,
             'method': 'abstractive',
             'level': level,
-            'word_count': len(result['output_text'].split()) if isinstance(result, dict) else len(str(result).split()),
+            'word_count': len(summary.split()),
             'processing_info': {
-                'chunks_processed': len(chunks),
-                'model_used': 'groq-llama3-8b-8192',
+                'chunks_processed': chunk_count,
+                'model_used': f'groq-{GROQ_MODEL_NAME}',
                 'api_based': True
             }
         }
     
+    def _abstractive_summarize(self, text: str, level: str) -> Dict:
+        """Generate abstractive summary using Groq API (existing working method)"""
+        map_prompt, combine_prompt = self._abstractive_prompts(level)
+        chunks = chunk_for_prompt(text, map_prompt)
+        
+        # Map calls fan out concurrently across the configured API keys
+        result = map_reduce(chunks, map_prompt, combine_prompt)
+        return self._abstractive_result(result['output_text'], level, len(chunks))
+    
+    def _abstractive_summarize_stream(self, source: PdfSource, level: str) -> Dict:
+        """Abstractive summary of a large PDF streamed page by page"""
+        map_prompt, combine_prompt = self._abstractive_prompts(level)
+        result = run_sync(astream_map_reduce_pdf(source, map_prompt, combine_prompt))
+        return self._abstractive_result(result['output_text'], level, result['chunk_count'])
+    
     def _extractive_summarize(self, text: str, level: str) -> Dict:
         """Generate extractive summary using lightweight processing"""
-        extractive_result = self.extractive_summarizer.create_extractive_summary(text, level)
+        # Sentence scoring is CPU-bound, so it runs on the process pool
+        extractive_result = worker_pool.cpu_call(
+            self.extractive_summarizer.create_extractive_summary, text, level
+        )
         
         return {
             'summary': extractive_result['summary'],
@@ -350,11 +359,23 @@ class LightweightAdvancedSummarizer:
         # Get extractive summary first (lightweight)
         extractive_result = self._extractive_summarize(text, level)
         
+        hybrid_prompt = self._hybrid_prompt(extractive_result, level)
+        
+        with usage_stage("hybrid"):
+            abstractive_result = invoke_llm(hybrid_prompt)
+        return self._hybrid_result(abstractive_result, extractive_result, level)
+    
+    def _hybrid_prompt(self, extractive_result: Dict, level: str,
+                       analyses: List[str] = None) -> str:
+        """Hybrid prompt; chunk analyses from a shared map phase are added when given"""
         # Use top extractive sentences as context for abstractive summary
         key_context = " ".join(extractive_result['key_sentences'][:8])
+        analyses_context = ""
+        if analyses:
+            analyses_context = "Chunk-level analyses of the full document:\n" + "\n\n".join(analyses)
         
         prompts = self.level_manager.get_prompts(level)
-        hybrid_prompt = f"""
+        return f"""
         Using the following key extracted sentences as context, create a {level} summary that:
         1. Incorporates the most important extracted information
         2. Adds interpretive analysis and connections
@@ -363,14 +384,13 @@ class LightweightAdvancedSummarizer:
         Key extracted context:
         {key_context}
         
+        {analyses_context}
+        
         {prompts['map'].replace('{text}', 'Based on the extracted context above')}
         """
-        
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-        chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template("{prompt}"))
-        
-        abstractive_result = chain.run({"prompt": hybrid_prompt})
-        
+    
+    @staticmethod
+    def _hybrid_result(abstractive_result: str, extractive_result: Dict, level: str) -> Dict:
         return {
             'summary': abstractive_result,
             'method': 'hybrid',
@@ -387,12 +407,40 @@ class LightweightAdvancedSummarizer:
     
     def compare_summaries(self, file_bytes: bytes, level: str = 'detailed') -> Dict:
         """Generate all three summary methods for comparison"""
+        return run_sync(self.acompare_summaries(file_bytes, level))
+    
+    async def acompare_summaries(self, file_bytes: bytes, level: str = 'detailed') -> Dict:
+        """
+        Comparison engine: all three methods from one extraction and one map phase
+        
+        Extractive scoring runs while the abstractive map calls are in flight.
+        The collapsed map outputs then feed both the abstractive combine call
+        and the hybrid call (together with the extractive key sentences), so a
+        comparison costs one abstractive run plus a single extra LLM call.
+        """
         try:
-            text = extract_text_from_pdf(file_bytes)
+            document = await aparse_document(file_bytes)
+            text = await document.atext()
+            map_prompt, combine_prompt = self._abstractive_prompts(level)
+            chunks = await achunk_for_prompt(text, map_prompt)
             
-            abstractive = self._abstractive_summarize(text, level)
-            extractive = self._extractive_summarize(text, level)
-            hybrid = self._hybrid_summarize(text, level)
+            extractive_task = asyncio.create_task(
+                worker_pool.run_io(self._extractive_summarize, text, level))
+            try:
+                analyses = await acollapse(
+                    await amap_chunks(chunks, map_prompt), combine_prompt)
+                extractive = await extractive_task
+            finally:
+                extractive_task.cancel()
+            
+            # Concurrent, but each call is timed and metered under its own stage
+            abstractive_text, hybrid_text = await asyncio.gather(
+                timed_llm(combine_prompt.format(text="\n\n".join(analyses)), "combine_call"),
+                timed_llm(self._hybrid_prompt(extractive, level, analyses), "hybrid")
+            )
+            abstractive = self._abstractive_result(abstractive_text, level, len(chunks))
+            hybrid = self._hybrid_result(hybrid_text, extractive, level)
+            hybrid['processing_info']['shared_map_outputs'] = len(analyses)
             
             return {
                 'comparison_results': {
@@ -421,11 +469,11 @@ class LightweightAdvancedSummarizer:
         Advanced PDF summarization with section-wise analysis
         """
         try:
-            text = extract_text_from_pdf(file_bytes)
+            document = parse_document(file_bytes)
             logger.info(f"Starting section-wise {method} summarization with {summary_type} level")
             
             # Detect sections
-            sections = self.section_detector.detect_sections(text)
+            sections = section_texts(document.text, document.sections(self.section_detector))
             logger.info(f"Detected {len(sections)} sections: {list(sections.keys())}")
             
             # Summarize each section
@@ -442,8 +490,8 @@ class LightweightAdvancedSummarizer:
                         )
                     section_summaries[section_name] = section_summary
             
-            # Generate overall summary
-            overall_summary = self.summarize_pdf(file_bytes, summary_type, method)
+            # Generate overall summary from the already extracted document
+            overall_summary = self.summarize_document(document, summary_type, method)
             
             return {
                 'overall_summary': overall_summary,
@@ -467,32 +515,24 @@ class LightweightAdvancedSummarizer:
             # Get section-specific prompt
             prompt_template = self.section_detector.get_section_summary_prompt(section_name)
             
-            # Create chunks if content is large
-            if len(section_content) > 3000:
-                chunks = [Document(page_content=section_content[i:i+3000]) 
-                         for i in range(0, len(section_content), 3000)]
-                
+            # Create chunks if content is larger than one call can take
+            if estimate_tokens(section_content) > chunk_budget(prompt_template):
                 map_prompt = PromptTemplate.from_template(prompt_template)
+                chunks = chunk_for_prompt(section_content, map_prompt)
+                
                 combine_prompt = PromptTemplate.from_template("""
                 Combine the section analyses below into a coherent summary for the {section_name} section:
                 
                 Analyses: {{text}}
                 """.format(section_name=section_name))
                 
-                llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-                chain = load_summarize_chain(
-                    llm, chain_type="map_reduce", 
-                    map_prompt=map_prompt, 
-                    combine_prompt=combine_prompt
-                )
-                
-                result = chain.invoke(chunks)
+                result = map_reduce(chunks, map_prompt, combine_prompt)
                 summary_text = result['output_text'] if isinstance(result, dict) else str(result)
             else:
                 # For smaller sections, use direct summarization
-                llm = ChatGroq(groq_api_key=get_next_groq_api_key(), model_name="llama3-8b-8192")
-                chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template(prompt_template))
-                summary_text = chain.run({"text": section_content})
+                with usage_stage("section_call"):
+                    summary_text = invoke_llm(
+                        PromptTemplate.from_template(prompt_template).format(text=section_content))
             
             return {
                 'summary': summary_text,
@@ -629,47 +669,15 @@ class LightweightSectionDetector:
                 r'remedy'
             ]
         }
+        self.detector = SectionDetector(self.section_patterns)
+    
+    def find_sections(self, text: str) -> List[Section]:
+        """Section offsets from the compiled single-pass detector"""
+        return self.detector.find_sections(text)
     
     def detect_sections(self, text: str) -> Dict[str, str]:
         """Detect and extract different sections from legal document"""
-        sections = {}
-        lines = text.split('\n')
-        current_section = 'general'
-        current_content = []
-        
-        for line in lines:
-            line_lower = line.lower().strip()
-            section_found = None
-            
-            # Check if line matches any section pattern
-            for section_name, patterns in self.section_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, line_lower):
-                        section_found = section_name
-                        break
-                if section_found:
-                    break
-            
-            if section_found:
-                # Save previous section
-                if current_content:
-                    sections[current_section] = '\n'.join(current_content)
-                
-                # Start new section
-                current_section = section_found
-                current_content = [line]
-            else:
-                current_content.append(line)
-        
-        # Save final section
-        if current_content:
-            sections[current_section] = '\n'.join(current_content)
-        
-        # If no sections detected, treat entire text as general
-        if len(sections) <= 1:
-            sections = {'general': text}
-        
-        return sections
+        return section_texts(text, self.find_sections(text))
     
     def get_section_summary_prompt(self, section_name: str) -> str:
         """Get specialized prompt for each section type"""
@@ -0,0 +1,298 @@
+"""
+Shared entry point for Groq LLM calls
+Every summarizer goes through these helpers instead of building chains ad hoc.
+Clients are pooled per key and model so connections stay warm.
+Completions are memoized on (model, temperature, rendered prompt), so repeated
+chunks and retried combine steps are served from the cache. Keys come from the
+rate-limit-aware key scheduler, and calls run under the resilience policy
+(retries with backoff, hedging on a second key, per-call deadlines).
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import weakref
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+
+from app.config import (
+    get_next_groq_api_key,
+    GROQ_BASE_URL,
+    GROQ_MODEL_NAME,
+    LLM_COMPLETION_TOKENS_ESTIMATE,
+    LLM_TEMPERATURE,
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_SAMPLED,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_PATH,
+    LLM_ATTEMPT_TIMEOUT,
+    LLM_HEDGE_ENABLED,
+)
+from app.services.key_scheduler import key_scheduler
+from app.services.resilience import llm_policy, is_retryable, retry_delay
+from app.utils.token_usage import usage_recorder
+from app.utils.chunker import estimate_tokens
+from app.utils.metrics import record_llm_tokens
+from app.utils.tracing import current_span, span
+from app.utils.summary_cache import SummaryCache, create_cache_backend
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+
+class ClientRegistry:
+    """
+    One long-lived ChatGroq per (key, model, temperature), reusing its HTTP connections
+
+    Async connections belong to the event loop that opened them, so clients
+    used inside a loop are kept per loop, sharing one httpx.AsyncClient that
+    aclose_loop() closes before the loop goes away. Sync code reaches the
+    async helpers through one long-lived background loop (run_sync), so its
+    clients are reused as well.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._loop_http = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def get(self, api_key: str, model_name: str, temperature: float) -> "ChatGroq":
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            clients = self._clients if loop is None else self._loop_clients.setdefault(loop, {})
+            key = (api_key, model_name, temperature)
+            client = clients.get(key)
+            if client is None:
+                # Imported here so the app starts without loading langchain_groq
+                from langchain_groq import ChatGroq
+                http_async_client = None
+                if loop is not None:
+                    import httpx
+                    http_async_client = self._loop_http.get(loop)
+                    if http_async_client is None:
+                        http_async_client = self._loop_http[loop] = httpx.AsyncClient()
+                # Retries are ours: the client must surface 429s so the scheduler sees them
+                client = clients[key] = ChatGroq(groq_api_key=api_key, model_name=model_name,
+                                                 temperature=temperature, max_retries=0,
+                                                 timeout=LLM_ATTEMPT_TIMEOUT,
+                                                 base_url=GROQ_BASE_URL,
+                                                 http_async_client=http_async_client)
+                self.created += 1
+            return client
+
+    async def aclose_loop(self):
+        """Close the clients opened on the running loop; call before the loop stops"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._loop_clients.pop(loop, None)
+            http_async_client = self._loop_http.pop(loop, None)
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._loop_clients.clear()
+            self._loop_http.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "clients": len(self._clients) + sum(len(c) for c in self._loop_clients.values()),
+                "loops": len(self._loop_clients),
+                "created": self.created,
+                "base_url": GROQ_BASE_URL or "https://api.groq.com"
+            }
+
+
+def create_llm(api_key: Optional[str] = None, model_name: str = GROQ_MODEL_NAME,
+               temperature: float = LLM_TEMPERATURE) -> "ChatGroq":
+    """Pooled ChatGroq client, picking the next API key when none is given"""
+    return llm_clients.get(api_key or get_next_groq_api_key(), model_name, temperature)
+
+
+def request_tokens(prompt: str) -> int:
+    """Tokens reserved against a key's TPM budget for one call"""
+    return estimate_tokens(prompt) + LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+def _usage_tokens(message) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def _record_usage(key: str, model_name: str, prompt: str, completion: str,
+                  usage: Optional[Dict] = None):
+    """Count prompt and completion tokens per key, estimating when usage is missing"""
+    usage = usage or {}
+    estimated = not (usage.get("input_tokens") and usage.get("output_tokens"))
+    prompt_tokens = usage.get("input_tokens") or estimate_tokens(prompt)
+    completion_tokens = usage.get("output_tokens") or estimate_tokens(completion)
+    label = key_scheduler.key_label(key)
+    record_llm_tokens(label, prompt_tokens, completion_tokens)
+    usage_recorder.record(label, model_name, prompt_tokens, completion_tokens, estimated)
+    call = current_span()
+    call.set_attribute("prompt_tokens", prompt_tokens)
+    call.set_attribute("completion_tokens", completion_tokens)
+
+
+def _report_failure(key: str, error: Exception):
+    """Tell the scheduler; a rate-limited key marks the error for immediate failover"""
+    if key_scheduler.report_error(key, error) and len(key_scheduler.keys) > 1:
+        error.failover = True
+
+
+async def _areport_failure(key: str, error: Exception):
+    """Async variant of _report_failure"""
+    if await key_scheduler.areport_error(key, error) and len(key_scheduler.keys) > 1:
+        error.failover = True
+
+
+def _hedge(api_key: Optional[str]) -> bool:
+    # Hedging needs a second key to send the duplicate to
+    return LLM_HEDGE_ENABLED and not api_key and len(key_scheduler.keys) > 1
+
+
+def _can_hedge(tokens: int):
+    # A duplicate that would have to wait for budget only adds load
+    return lambda in_flight: key_scheduler.has_capacity(tokens, exclude=in_flight)
+
+
+def _invoke(prompt: str, api_key: Optional[str], model_name: str, temperature: float) -> str:
+    tokens = request_tokens(prompt)
+
+    def attempt(context):
+        with span("llm.attempt", model=model_name, hedged=bool(context.in_flight)) as call:
+            key = api_key or key_scheduler.acquire(tokens, exclude=context.in_flight)
+            call.set_attribute("key", key_scheduler.key_label(key))
+            context.start(key)
+            try:
+                message = create_llm(key, model_name, temperature).invoke(prompt)
+            except Exception as e:
+                if not api_key:
+                    _report_failure(key, e)
+                raise
+            key_scheduler.report_success(key, tokens, _usage_tokens(message))
+            _record_usage(key, model_name, prompt, message.content,
+                          getattr(message, "usage_metadata", None))
+            return message.content
+
+    return llm_policy.call(attempt, hedge=_hedge(api_key), can_hedge=_can_hedge(tokens))
+
+
+async def _ainvoke(prompt: str, api_key: Optional[str], model_name: str, temperature: float) -> str:
+    tokens = request_tokens(prompt)
+
+    async def attempt(context):
+        with span("llm.attempt", model=model_name, hedged=bool(context.in_flight)) as call:
+            key = api_key or await key_scheduler.aacquire(tokens, exclude=context.in_flight)
+            call.set_attribute("key", key_scheduler.key_label(key))
+            context.start(key)
+            try:
+                message = await create_llm(key, model_name, temperature).ainvoke(prompt)
+            except Exception as e:
+                if not api_key:
+                    await _areport_failure(key, e)
+                raise
+            await key_scheduler.areport_success(key, tokens, _usage_tokens(message))
+            _record_usage(key, model_name, prompt, message.content,
+                          getattr(message, "usage_metadata", None))
+            return message.content
+
+    return await llm_policy.acall(attempt, hedge=_hedge(api_key), can_hedge=_can_hedge(tokens))
+
+
+def completion_key(prompt: str, model_name: str = GROQ_MODEL_NAME,
+                   temperature: float = LLM_TEMPERATURE) -> str:
+    """Cache key for one rendered prompt"""
+    payload = json.dumps([model_name, temperature, prompt])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cacheable(temperature: float) -> bool:
+    # A sampled completion is one draw among many; replaying it is opt-in
+    return temperature <= 0 or LLM_CACHE_SAMPLED
+
+
+def invoke_llm(prompt: str, api_key: Optional[str] = None, model_name: str = GROQ_MODEL_NAME,
+               temperature: float = LLM_TEMPERATURE) -> str:
+    """Run a single prompt and return the completion text"""
+    if not _cacheable(temperature):
+        return _invoke(prompt, api_key, model_name, temperature)
+    key = completion_key(prompt, model_name, temperature)
+    cached = completion_cache.get(key)
+    if cached is not None:
+        return cached
+    content = _invoke(prompt, api_key, model_name, temperature)
+    completion_cache.set(key, content)
+    return content
+
+
+async def ainvoke_llm(prompt: str, api_key: Optional[str] = None,
+                      model_name: str = GROQ_MODEL_NAME,
+                      temperature: float = LLM_TEMPERATURE) -> str:
+    """Async variant of invoke_llm"""
+    if not _cacheable(temperature):
+        return await _ainvoke(prompt, api_key, model_name, temperature)
+    key = completion_key(prompt, model_name, temperature)
+    cached = await completion_cache.aget(key)
+    if cached is not None:
+        return cached
+    content = await _ainvoke(prompt, api_key, model_name, temperature)
+    await completion_cache.aset(key, content)
+    return content
+
+
+async def astream_llm(prompt: str, api_key: Optional[str] = None,
+                      model_name: str = GROQ_MODEL_NAME,
+                      temperature: float = LLM_TEMPERATURE) -> AsyncIterator[str]:
+    """Yield completion tokens as Groq streams them (a cache hit yields once)"""
+    cacheable = _cacheable(temperature)
+    key = completion_key(prompt, model_name, temperature)
+    cached = await completion_cache.aget(key) if cacheable else None
+    if cached is not None:
+        yield cached
+        return
+    tokens = request_tokens(prompt)
+    parts = []
+    usage = None
+    retry = 0
+    while True:
+        llm_key = api_key or await key_scheduler.aacquire(tokens)
+        current_span().set_attribute("key", key_scheduler.key_label(llm_key))
+        try:
+            async for chunk in create_llm(llm_key, model_name, temperature).astream(prompt):
+                # Groq reports usage on the final chunk
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            if not api_key:
+                await _areport_failure(llm_key, e)
+            # Streamed tokens cannot be taken back, so only retry before the first one
+            if parts or not is_retryable(e) or retry >= llm_policy.retries:
+                raise
+            await asyncio.sleep(retry_delay(e, retry))
+            retry += 1
+            continue
+        break
+    await key_scheduler.areport_success(llm_key, tokens)
+    _record_usage(llm_key, model_name, prompt, "".join(parts), usage)
+    if cacheable:
+        await completion_cache.aset(key, "".join(parts))
+
+
+# Create global instances
+llm_clients = ClientRegistry()
+completion_cache = SummaryCache(
+    create_cache_backend(LLM_CACHE_BACKEND, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, "llm:"),
+    ttl=LLM_CACHE_TTL,
+    name="llm"
+)
@@ -0,0 +1,194 @@
+"""
+Async map-reduce engine for chunked summarization
+Map calls run concurrently (bounded by a semaphore) and are spread across the
+configured GROQ API keys; results keep chunk order for the combine step.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+
+from langchain.prompts import PromptTemplate
+from app.config import (
+    MAP_REDUCE_MAX_CONCURRENCY,
+    MAP_REDUCE_COMBINE_MAX_CHARS,
+    MAP_REDUCE_TEMPERATURE,
+)
+from app.services.llm import ainvoke_llm, astream_llm, llm_clients
+from app.utils.executor import background_loop
+from app.utils.token_usage import usage_stage
+from app.utils.logger import logger
+from app.utils.metrics import observe_stage, record_chunks
+from app.utils.tracing import span
+
+
+async def timed_llm(prompt: str, stage: str, **attributes) -> str:
+    """One map-reduce LLM call at MAP_REDUCE_TEMPERATURE, timed, metered and traced as `stage`"""
+    with observe_stage(stage), usage_stage(stage), \
+            span(stage, prompt_chars=len(prompt), **attributes):
+        return await ainvoke_llm(prompt, temperature=MAP_REDUCE_TEMPERATURE)
+
+
+async def amap_chunks(texts: List[str], map_prompt: PromptTemplate,
+                      max_concurrency: Optional[int] = None, stage: str = "map_call") -> List[str]:
+    """Run the map prompt over every chunk concurrently, preserving order"""
+    semaphore = asyncio.Semaphore(max_concurrency or MAP_REDUCE_MAX_CONCURRENCY)
+    if stage == "map_call":
+        record_chunks(len(texts))
+
+    async def run(index: int, text: str) -> str:
+        async with semaphore:
+            return await timed_llm(map_prompt.format(text=text), stage, chunk=index)
+
+    return list(await asyncio.gather(*(run(i, text) for i, text in enumerate(texts))))
+
+
+async def amap_stream(chunks: AsyncIterable[str], map_prompt: PromptTemplate,
+                      max_concurrency: Optional[int] = None) -> List[str]:
+    """
+    Map chunks as they arrive from an async iterator, preserving order
+
+    The next chunk is only pulled once a map slot is free, so at most
+    max_concurrency chunks are held in memory at a time.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or MAP_REDUCE_MAX_CONCURRENCY)
+    tasks = []
+
+    async def run(index: int, text: str) -> str:
+        try:
+            return await timed_llm(map_prompt.format(text=text), "map_call", chunk=index)
+        finally:
+            semaphore.release()
+
+    try:
+        async for chunk in chunks:
+            await semaphore.acquire()
+            record_chunks()
+            tasks.append(asyncio.create_task(run(len(tasks), chunk)))
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def _group_for_combine(outputs: List[str], max_chars: int) -> List[List[str]]:
+    """Split outputs into consecutive groups whose joined size fits max_chars"""
+    groups = []
+    current = []
+    current_size = 0
+    for output in outputs:
+        if current and current_size + len(output) > max_chars:
+            groups.append(current)
+            current = []
+            current_size = 0
+        current.append(output)
+        current_size += len(output) + 2
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def acollapse(outputs: List[str], combine_prompt: PromptTemplate,
+                    max_concurrency: Optional[int] = None) -> List[str]:
+    """Combine map outputs in groups until they fit a single combine call"""
+    max_chars = MAP_REDUCE_COMBINE_MAX_CHARS
+    while len(outputs) > 1 and sum(len(o) + 2 for o in outputs) > max_chars:
+        groups = _group_for_combine(outputs, max_chars)
+        if len(groups) == len(outputs):
+            # Every output is already too large on its own; combine what we have
+            break
+        logger.info(f"Collapsing {len(outputs)} map outputs into {len(groups)} groups")
+        outputs = await amap_chunks(
+            ["\n\n".join(group) for group in groups], combine_prompt, max_concurrency,
+            stage="combine_call"
+        )
+    return outputs
+
+
+async def acombine(outputs: List[str], combine_prompt: PromptTemplate,
+                   max_concurrency: Optional[int] = None) -> str:
+    """Collapse map outputs until they fit one combine call, then combine"""
+    outputs = await acollapse(outputs, combine_prompt, max_concurrency)
+    return await timed_llm(combine_prompt.format(text="\n\n".join(outputs)), "combine_call")
+
+
+async def amap_reduce(texts: List[str], map_prompt: PromptTemplate,
+                      combine_prompt: PromptTemplate,
+                      max_concurrency: Optional[int] = None) -> Dict:
+    """
+    Summarize chunks with a concurrent map phase followed by an ordered combine
+
+    Returns a dict shaped like LangChain's map_reduce output:
+    {'output_text': ..., 'intermediate_steps': [...]}
+    """
+    map_outputs = await amap_chunks(texts, map_prompt, max_concurrency)
+    output_text = await acombine(map_outputs, combine_prompt, max_concurrency)
+    return {'output_text': output_text, 'intermediate_steps': map_outputs}
+
+
+async def astream_map_reduce(texts: List[str], map_prompt: PromptTemplate,
+                             combine_prompt: PromptTemplate,
+                             max_concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of amap_reduce
+
+    Yields {'event': 'map', 'index', 'total', 'text'} as each chunk finishes
+    (completion order), then {'event': 'token', 'text'} for every combine
+    token, and finally {'event': 'done', 'output_text', 'intermediate_steps'}.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or MAP_REDUCE_MAX_CONCURRENCY)
+    record_chunks(len(texts))
+
+    async def run(index: int, text: str):
+        async with semaphore:
+            return index, await timed_llm(map_prompt.format(text=text), "map_call", chunk=index)
+
+    tasks = [asyncio.create_task(run(i, text)) for i, text in enumerate(texts)]
+    map_outputs = [None] * len(texts)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, output = await next_done
+            map_outputs[index] = output
+            yield {'event': 'map', 'index': index, 'total': len(texts), 'text': output}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    collapsed = await acollapse(map_outputs, combine_prompt, max_concurrency)
+    parts = []
+    with observe_stage("combine_call"), usage_stage("combine_call"), \
+            span("combine_call", streamed=True):
+        async for token in astream_llm(combine_prompt.format(text="\n\n".join(collapsed)),
+                                       temperature=MAP_REDUCE_TEMPERATURE):
+            parts.append(token)
+            yield {'event': 'token', 'text': token}
+    yield {'event': 'done', 'output_text': "".join(parts), 'intermediate_steps': map_outputs}
+
+
+async def _closing_clients(coro):
+    try:
+        return await coro
+    finally:
+        await llm_clients.aclose_loop()
+
+
+def run_sync(coro):
+    """
+    Run a coroutine from sync code on the shared background loop
+    Sync code already running on that loop cannot block it, so it gets a
+    throwaway loop on a helper thread whose LLM clients are closed afterwards.
+    """
+    if not background_loop.is_current():
+        return background_loop.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(
+            contextvars.copy_context().run, asyncio.run, _closing_clients(coro)).result()
+
+
+def map_reduce(texts: List[str], map_prompt: PromptTemplate,
+               combine_prompt: PromptTemplate,
+               max_concurrency: Optional[int] = None) -> Dict:
+    """Sync wrapper around amap_reduce for the existing summarizer code"""
+    return run_sync(amap_reduce(texts, map_prompt, combine_prompt, max_concurrency))
@@ -0,0 +1,108 @@
+"""
+Streaming page pipeline for very large PDFs
+Pages flow lazily through extraction -> normalization -> chunking -> map, so
+map calls start while later pages are still being parsed and peak memory is
+bounded by PDF_STREAM_WINDOW page ranges plus the in-flight map chunks
+instead of by document size.
+"""
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from langchain.prompts import PromptTemplate
+from app.config import PDF_PAGES_PER_TASK, PDF_STREAM_WINDOW
+from app.services.map_reduce import amap_stream, acombine
+from app.utils.executor import worker_pool
+from app.utils.pdf_reader import (
+    ExtractedPages,
+    PdfSource,
+    _extract_page_range,
+    _page_count,
+    _spill,
+    _unspill,
+    record_extraction,
+)
+from app.utils.chunker import chunk_budget, chunk_text, estimate_tokens
+from app.utils.logger import logger
+
+
+async def aiter_pages(source: PdfSource, window: int = PDF_STREAM_WINDOW,
+                      pages_per_task: int = PDF_PAGES_PER_TASK) -> AsyncIterator[str]:
+    """
+    Yield page texts in order while at most `window` page ranges are extracted ahead
+
+    Ranges run on the process pool, so extraction of later pages overlaps
+    with whatever the consumer does with earlier ones. The recorded extraction
+    time leaves out the time spent waiting for the consumer.
+    """
+    started = time.perf_counter()
+    consumer_seconds = 0.0
+    page_seconds = []
+    page_count = await worker_pool.run_io(_page_count, source)
+    ranges = [(start, min(start + pages_per_task, page_count))
+              for start in range(0, page_count, pages_per_task)]
+    path = await worker_pool.run_io(_spill, source)
+    pending = []
+    try:
+        for index, (start, stop) in enumerate(ranges):
+            pending.append(asyncio.ensure_future(
+                worker_pool.run_cpu(_extract_page_range, path, start, stop)))
+            # Keep `window` ranges in flight until the last one is submitted
+            while pending and (len(pending) >= window or index == len(ranges) - 1):
+                for content, seconds in await pending.pop(0):
+                    page_seconds.append(seconds)
+                    paused = time.perf_counter()
+                    yield content
+                    consumer_seconds += time.perf_counter() - paused
+        record_extraction(ExtractedPages(
+            [], page_seconds, "stream", time.perf_counter() - started - consumer_seconds))
+    finally:
+        for future in pending:
+            future.cancel()
+        _unspill(path, source)
+
+
+def normalize_page(text: str) -> str:
+    """Collapse runs of spaces and blank lines left by PDF layout"""
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n\n", text)
+
+
+async def achunk_pages(pages: AsyncIterator[str], max_tokens: int) -> AsyncIterator[str]:
+    """Re-pack a page stream into token-budgeted chunks without joining the document"""
+    buffer = ""
+    async for page in pages:
+        buffer += normalize_page(page)
+        if estimate_tokens(buffer) >= 2 * max_tokens:
+            # Emit finished chunks; the last one may still grow with the next page
+            chunks = chunk_text(buffer, max_tokens)
+            for chunk in chunks[:-1]:
+                yield chunk
+            buffer = chunks[-1]
+    for chunk in chunk_text(buffer, max_tokens):
+        yield chunk
+
+
+ChunkStage = Callable[[AsyncIterator[str]], AsyncIterator[str]]
+
+
+async def astream_map_reduce_pdf(source: PdfSource, map_prompt: PromptTemplate,
+                                 combine_prompt: PromptTemplate,
+                                 chunker: Optional[ChunkStage] = None,
+                                 max_concurrency: Optional[int] = None) -> Dict:
+    """
+    Map-reduce a PDF straight from its pages without materializing its text
+
+    Returns the same shape as amap_reduce plus the number of chunks mapped.
+    """
+    if chunker is None:
+        chunks = achunk_pages(aiter_pages(source), chunk_budget(map_prompt))
+    else:
+        chunks = chunker(aiter_pages(source))
+    map_outputs = await amap_stream(chunks, map_prompt, max_concurrency)
+    logger.info(f"Streamed {len(map_outputs)} chunks through the map phase")
+    output_text = await acombine(map_outputs, combine_prompt, max_concurrency)
+    return {'output_text': output_text, 'intermediate_steps': map_outputs,
+            'chunk_count': len(map_outputs)}
@@ -0,0 +1,281 @@
+"""
+Resilience layer for LLM calls
+- Retryable failures (429, 5xx, timeouts, dropped connections) are retried
+  with full-jitter exponential backoff; a 429 on one key fails over at once
+- An attempt still running after the observed p95 latency is hedged with a
+  duplicate on a second key, and the first answer wins. No hedge is sent
+  while the scheduler has no other key with capacity, since the duplicate
+  would only queue behind the primary and double the load. Latency is
+  measured from key acquisition, so scheduler waits do not raise the p95.
+- Every attempt has a timeout and every call an overall deadline
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+from app.config import (
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_ATTEMPT_TIMEOUT,
+    LLM_CALL_DEADLINE,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_INITIAL_DELAY,
+    LLM_HEDGE_MIN_DELAY,
+    LLM_LATENCY_WINDOW,
+)
+from app.services.key_scheduler import error_status_code
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+
+class AttemptContext:
+    """Handed to each attempt: the keys already serving this call, and when this attempt got its key"""
+
+    def __init__(self, in_flight: Set[str]):
+        self.in_flight = in_flight
+        self.started = None
+
+    def start(self, key: str):
+        """Called once a key is acquired; latency is measured from here"""
+        self.in_flight.add(key)
+        self.started = time.monotonic()
+
+
+Attempt = Callable[[AttemptContext], T]
+AsyncAttempt = Callable[[AttemptContext], Awaitable[T]]
+# Asked before sending a hedge, with the keys in flight: may a duplicate go now?
+HedgeCheck = Callable[[Set[str]], bool]
+
+# Hedged duplicates below this many latency samples use LLM_HEDGE_INITIAL_DELAY
+MIN_LATENCY_SAMPLES = 20
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call ran out of its overall deadline"""
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt latencies"""
+
+    def __init__(self, window: int = LLM_LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            enough = len(self._samples) >= MIN_LATENCY_SAMPLES
+        if not enough:
+            return LLM_HEDGE_INITIAL_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, self.percentile(LLM_HEDGE_PERCENTILE))
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = len(self._samples)
+        return {
+            "samples": count,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "hedge_delay_seconds": self.hedge_delay()
+        }
+
+
+def is_retryable(error: Exception) -> bool:
+    status = error_status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or \
+        "Timeout" in name or "Connection" in name
+
+
+def backoff_delay(retry: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (0-based)"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** retry))
+
+
+def retry_delay(error: Exception, retry: int) -> float:
+    # A rate-limited key was parked by the scheduler; another key can go now
+    return 0.0 if getattr(error, "failover", False) else backoff_delay(retry)
+
+
+class ResiliencePolicy:
+    """Retry, hedge and deadline handling shared by the sync and async LLM paths"""
+
+    def __init__(self, retries: int = LLM_MAX_RETRIES, attempt_timeout: float = LLM_ATTEMPT_TIMEOUT,
+                 deadline: float = LLM_CALL_DEADLINE, tracker: Optional[LatencyTracker] = None):
+        self.retries = retries
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.tracker = tracker or LatencyTracker()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.retried = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+            return self._executor
+
+    def _timed(self, attempt: Attempt, in_flight: Set[str]):
+        context = AttemptContext(in_flight)
+        result = attempt(context)
+        if context.started is not None:
+            self.tracker.record(time.monotonic() - context.started)
+        return result
+
+    async def _atimed(self, attempt: AsyncAttempt, in_flight: Set[str]):
+        context = AttemptContext(in_flight)
+        result = await attempt(context)
+        if context.started is not None:
+            self.tracker.record(time.monotonic() - context.started)
+        return result
+
+    def _may_hedge(self, can_hedge: Optional[HedgeCheck], in_flight: Set[str]) -> bool:
+        if can_hedge is not None and not can_hedge(in_flight):
+            self.hedges_skipped += 1
+            return False
+        return True
+
+    def call(self, attempt: Attempt, hedge: bool = False, can_hedge: Optional[HedgeCheck] = None):
+        """
+        Run attempt with retries; hedging runs attempts on a helper thread pool
+        Threads cannot be cancelled, so a losing attempt runs to completion in
+        the background and its result is dropped.
+        """
+        deadline = time.monotonic() + self.deadline
+        for retry in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"LLM call exceeded its {self.deadline:.0f}s deadline")
+            try:
+                if hedge:
+                    return self._hedged(attempt, min(remaining, self.attempt_timeout), can_hedge)
+                return self._timed(attempt, set())
+            except Exception as e:
+                delay = retry_delay(e, retry)
+                if not is_retryable(e) or retry == self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                self.retried += 1
+                logger.warning(f"LLM call failed ({e}), retry {retry + 1}/{self.retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _hedged(self, attempt: Attempt, timeout: float, can_hedge: Optional[HedgeCheck]):
+        started = time.monotonic()
+        in_flight = set()
+        # Each attempt runs in a copy of the caller's context so trace spans nest
+        futures = [self.executor.submit(
+            contextvars.copy_context().run, self._timed, attempt, in_flight)]
+        done, _ = wait(futures, timeout=min(self.tracker.hedge_delay(), timeout))
+        if not done and self._may_hedge(can_hedge, in_flight):
+            self.hedges += 1
+            logger.info(f"Hedging LLM call after {time.monotonic() - started:.1f}s")
+            futures.append(self.executor.submit(
+                contextvars.copy_context().run, self._timed, attempt, in_flight))
+        primary = futures[0]
+        error = None
+        pending = list(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            done, not_done = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"LLM attempt exceeded {timeout:.1f}s")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self.hedge_wins += 1
+                    for other in not_done:
+                        other.cancel()
+                    return future.result()
+                error = error or future.exception()
+            pending = list(not_done)
+        raise error
+
+    async def acall(self, attempt: AsyncAttempt, hedge: bool = False,
+                    can_hedge: Optional[HedgeCheck] = None):
+        """Async variant of call"""
+        deadline = time.monotonic() + self.deadline
+        for retry in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"LLM call exceeded its {self.deadline:.0f}s deadline")
+            try:
+                return await self._ahedged(
+                    attempt, min(remaining, self.attempt_timeout), hedge, can_hedge)
+            except Exception as e:
+                delay = retry_delay(e, retry)
+                if not is_retryable(e) or retry == self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                self.retried += 1
+                logger.warning(f"LLM call failed ({e}), retry {retry + 1}/{self.retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _ahedged(self, attempt: AsyncAttempt, timeout: float, hedge: bool,
+                       can_hedge: Optional[HedgeCheck]):
+        started = time.monotonic()
+        in_flight = set()
+        primary = asyncio.ensure_future(self._atimed(attempt, in_flight))
+        tasks = [primary]
+        try:
+            if hedge:
+                done, _ = await asyncio.wait(tasks, timeout=min(self.tracker.hedge_delay(), timeout))
+                if not done and self._may_hedge(can_hedge, in_flight):
+                    self.hedges += 1
+                    logger.info(f"Hedging LLM call after {time.monotonic() - started:.1f}s")
+                    tasks.append(asyncio.ensure_future(self._atimed(attempt, in_flight)))
+            error = None
+            pending = list(tasks)
+            while pending:
+                remaining = timeout - (time.monotonic() - started)
+                done, not_done = await asyncio.wait(
+                    pending, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM attempt exceeded {timeout:.1f}s")
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+                pending = list(not_done)
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retried,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "latency": self.tracker.stats()
+        }
+
+
+# Create global instance
+llm_policy = ResiliencePolicy()
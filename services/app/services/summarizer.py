@@ -1,10 +1,13 @@
-from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
-from langchain.chains.summarize import load_summarize_chain
-from langchain_groq import ChatGroq
-from app.utils.pdf_reader import extract_text_from_pdf
-from app.config import get_next_groq_api_key
+from app.utils.parsed_document import ParsedDocument, aparse_document, parse_document
+from app.services.map_reduce import map_reduce, amap_reduce, astream_map_reduce, run_sync
+from app.services.page_pipeline import astream_map_reduce_pdf
+from app.services.llm import invoke_llm
+from app.utils.token_usage import usage_stage
+from app.utils.chunker import achunk_for_prompt, chunk_for_prompt
 from app.utils.logger import logger
+from app.utils.metrics import observe_stage, record_fallback
+from app.utils.summary_cache import summary_cache, make_summary_key
 
 map_prompt = PromptTemplate.from_template("""
 Analyze the following legal document content and provide a comprehensive summary with clear structure:
@@ -58,23 +61,77 @@ Analyses: {text}
 """)
 
 
+def summary_cache_key(content) -> str:
+    """Cache key for summarize_pdf results (PDF bytes or their sha256 digest)"""
+    return make_summary_key(content, 'default', 'map_reduce')
+
+
+def _split_chunks(text: str) -> list:
+    return chunk_for_prompt(text, map_prompt)
+
+
+def summarize_text(text: str) -> str:
+    """Map-reduce summary of already extracted document text"""
+    # Map calls fan out concurrently across the configured API keys
+    result = map_reduce(_split_chunks(text), map_prompt, combine_prompt)
+    return result['output_text']
+
+
+async def asummarize_text(text: str) -> str:
+    """Async variant of summarize_text for callers already on the event loop"""
+    chunks = await achunk_for_prompt(text, map_prompt)
+    result = await amap_reduce(chunks, map_prompt, combine_prompt)
+    return result['output_text']
+
+
+async def astream_summarize_pdf(file_bytes: bytes):
+    """
+    Stream summarize_pdf progress as events
+    Yields 'map' events per finished chunk, 'token' events for the combine
+    step and a final 'done' event carrying the full summary.
+    """
+    document = await aparse_document(file_bytes)
+    cache_key = summary_cache_key(document.digest)
+    cached = await summary_cache.aget(cache_key)
+    if cached is not None:
+        yield {'event': 'done', 'summary': cached, 'cached': True}
+        return
+
+    text = await document.atext()
+    chunks = await achunk_for_prompt(text, map_prompt)
+    async for event in astream_map_reduce(chunks, map_prompt, combine_prompt):
+        if event['event'] == 'done':
+            await summary_cache.aset(cache_key, event['output_text'])
+            yield {'event': 'done', 'summary': event['output_text'], 'cached': False}
+        else:
+            yield event
+
+
 def summarize_pdf(file_bytes: bytes) -> str:
+    return summarize_document(parse_document(file_bytes))
+
+
+def summarize_document(document: ParsedDocument) -> str:
+    """summarize_pdf for a document that may already be extracted"""
     try:
-        text = extract_text_from_pdf(file_bytes)
-        chunks = [Document(page_content=text[i:i+3000])
-                  for i in range(0, len(text), 3000)]
-        # Use a new LLM instance with the next API key for each request
-        llm = ChatGroq(groq_api_key=get_next_groq_api_key(),
-                       model_name="llama3-8b-8192")
-        chain = load_summarize_chain(
-            llm, chain_type="map_reduce", map_prompt=map_prompt, combine_prompt=combine_prompt)
-        result = chain.invoke(chunks)
-        logger.info("PDF summarized successfully", extra={"length": len(text)})
-        
-        # Ensure we return a string for backward compatibility
-        if isinstance(result, dict):
-            return result.get('output_text', str(result))
-        return str(result)
+        cache_key = summary_cache_key(document.digest)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            logger.info("PDF summary served from cache")
+            return cached
+
+        stream_source = document.stream_source()
+        if stream_source is not None:
+            # Large uploads stream page by page instead of holding the full text
+            result = run_sync(astream_map_reduce_pdf(stream_source, map_prompt, combine_prompt))
+            summary = result['output_text']
+            logger.info("PDF summarized successfully", extra={"chunks": result['chunk_count']})
+        else:
+            text = document.text
+            summary = summarize_text(text)
+            logger.info("PDF summarized successfully", extra={"length": len(text)})
+        summary_cache.set(cache_key, summary)
+        return summary
     except Exception as e:
         logger.error(f"Error in summarize_pdf: {e}")
         raise
@@ -129,37 +186,32 @@ Provide comprehensive analysis that would be valuable for legal professionals ha
 Summaries:
 {joined}
 '''
-    from langchain.docstore.document import Document
-    from langchain.prompts import PromptTemplate
-    from langchain.chains.llm import LLMChain
-    from langchain_groq import ChatGroq
-    from app.config import get_next_groq_api_key
-    llm = ChatGroq(groq_api_key=get_next_groq_api_key(),
-                   model_name="llama3-8b-8192")
-    chain = LLMChain(llm=llm, prompt=PromptTemplate.from_template("{text}"))
     import json
     import re
-    result = chain.run({"text": prompt})
-    try:
-        return json.loads(result)
-    except Exception:
-        # Try to extract a JSON object from the result
-        match = re.search(r'\{.*\}', result, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except Exception:
-                pass
-        # If JSON parsing fails, return a structured error response
-        return {
-            "error": "Failed to parse LLM output", 
-            "raw": result,
-            "category_explanation": "Analysis failed - unable to parse response",
-            "individual_cases": [],
-            "overall_summary": {
-                "overall_assessment": "Analysis could not be completed due to parsing error"
-            },
-            "legal_insights": {
-                "strategic_recommendations": ["Please try again or contact support"]
+    with usage_stage("overall"):
+        result = invoke_llm(prompt)
+    with observe_stage("json_parse"):
+        try:
+            return json.loads(result)
+        except Exception:
+            # Try to extract a JSON object from the result
+            match = re.search(r'\{.*\}', result, re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group(0))
+                except Exception:
+                    pass
+            # If JSON parsing fails, return a structured error response
+            record_fallback("parse_error")
+            return {
+                "error": "Failed to parse LLM output", 
+                "raw": result,
+                "category_explanation": "Analysis failed - unable to parse response",
+                "individual_cases": [],
+                "overall_summary": {
+                    "overall_assessment": "Analysis could not be completed due to parsing error"
+                },
+                "legal_insights": {
+                    "strategic_recommendations": ["Please try again or contact support"]
+                }
             }
-        }
@@ -0,0 +1,166 @@
+"""
+Token-aware chunking for map-reduce summarization
+Chunks are packed from whole sentences up to a token budget derived from the
+model context window minus the prompt and the completion reserve. A section
+heading starts a new chunk once the current one is at least half full, so
+chunks follow the document's structure instead of cutting at fixed offsets.
+"""
+
+import math
+import re
+from typing import TYPE_CHECKING, Dict, List, Union
+
+from app.config import (
+    MODEL_CONTEXT_TOKENS,
+    CHUNK_COMPLETION_TOKENS,
+    CHUNK_MAX_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+)
+from app.utils.executor import worker_pool
+from app.utils.metrics import observe_stage
+
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
+
+LEGACY_CHUNK_CHARS = 3000
+# Fraction of the budget after which a section heading starts a new chunk
+SECTION_FLUSH_RATIO = 0.5
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[\"'(\[]?[A-Z0-9])")
+_HEADING = re.compile(
+    r"^\s*(?:"
+    r"[A-Z][A-Z0-9 .,&'()\-]{3,60}"                       # ALL CAPS line
+    r"|(?:PART|SECTION|CHAPTER|ARTICLE|ORDER|JUDGMENT)\b.{0,60}"
+    r"|[IVXLC]+\.\s+\S.{0,60}"                             # roman numerals
+    r"|\d+(?:\.\d+)*\.?\s+[A-Z].{0,60}"                    # numbered headings
+    r")\s*$"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; errs high for citation-heavy legal text"""
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 1.3))
+
+
+def chunk_budget(prompt: Union[str, "PromptTemplate"]) -> int:
+    """Tokens left for chunk text once the prompt and completion are accounted for"""
+    template = getattr(prompt, "template", prompt).replace("{text}", "")
+    available = MODEL_CONTEXT_TOKENS - CHUNK_COMPLETION_TOKENS - estimate_tokens(template)
+    return max(256, min(CHUNK_MAX_TOKENS, available))
+
+
+def _units(text: str):
+    """Yield (sentence, separator, starts_section) in document order"""
+    separator = ""
+    block = []
+    heading = False
+
+    def flush():
+        joined = "\n".join(block)
+        for index, sentence in enumerate(_SENTENCE_END.split(joined)):
+            if sentence.strip():
+                yield sentence.strip(), ("\n\n" if index == 0 else " "), heading and index == 0
+
+    for line in text.splitlines():
+        is_heading = bool(_HEADING.match(line)) and len(line.strip()) < 80
+        if not line.strip() or is_heading:
+            yield from flush()
+            block = []
+            heading = is_heading
+        if line.strip():
+            block.append(line)
+    yield from flush()
+
+
+def _hard_split(sentence: str, max_tokens: int) -> List[str]:
+    """Split a single oversized sentence on word boundaries"""
+    pieces = []
+    current = []
+    current_tokens = 0
+    words = []
+    for word in sentence.split():
+        # Extraction artefacts can produce "words" longer than a whole chunk
+        step = max_tokens * 3
+        words.extend(word[i:i + step] for i in range(0, len(word), step))
+    for word in words:
+        tokens = estimate_tokens(word) + 1
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """Pack sentence- and section-aligned chunks of at most max_tokens each"""
+    chunks = []
+    current = []  # (sentence, separator, tokens)
+    current_tokens = 0
+    fresh = 0  # units added since the last flush, excluding overlap
+
+    def flush():
+        nonlocal current, current_tokens, fresh
+        fresh = 0
+        chunks.append("".join(sep + sentence for sentence, sep, _ in current).strip())
+        tail = []
+        tail_tokens = 0
+        for unit in reversed(current):
+            if tail_tokens + unit[2] > overlap_tokens:
+                break
+            tail.insert(0, unit)
+            tail_tokens += unit[2]
+        current = tail
+        current_tokens = tail_tokens
+
+    for sentence, separator, starts_section in _units(text):
+        pieces = [sentence] if estimate_tokens(sentence) < max_tokens else _hard_split(sentence, max_tokens - 1)
+        for piece in pieces:
+            # +1 covers the separator joining this piece to the previous one
+            tokens = estimate_tokens(piece) + 1
+            full = current_tokens + tokens > max_tokens
+            section_break = starts_section and current_tokens >= max_tokens * SECTION_FLUSH_RATIO
+            if current and (full or section_break):
+                flush()
+                # Give up as much of the overlap as this piece needs to fit
+                while current and current_tokens + tokens > max_tokens:
+                    current_tokens -= current.pop(0)[2]
+            current.append((piece, separator, tokens))
+            current_tokens += tokens
+            fresh += 1
+            separator = " "
+            starts_section = False
+    if fresh:
+        flush()
+    return [chunk for chunk in chunks if chunk]
+
+
+def chunk_for_prompt(text: str, prompt: Union[str, "PromptTemplate"],
+                     overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """Chunk text for a map prompt, using that prompt's token budget"""
+    with observe_stage("chunking"):
+        return chunk_text(text, chunk_budget(prompt), overlap_tokens)
+
+
+async def achunk_for_prompt(text: str, prompt: Union[str, "PromptTemplate"],
+                            overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """chunk_for_prompt on the process pool; packing a long document takes seconds"""
+    with observe_stage("chunking"):
+        return await worker_pool.run_cpu(chunk_text, text, chunk_budget(prompt), overlap_tokens)
+
+
+def plan_chunks(text: str, prompt: Union[str, "PromptTemplate"]) -> Dict:
+    """Report how a document would be chunked for a prompt without calling the LLM"""
+    chunks = chunk_for_prompt(text, prompt)
+    return {
+        "chunk_count": len(chunks),
+        "budget_tokens": chunk_budget(prompt),
+        "document_tokens": estimate_tokens(text),
+        "largest_chunk_tokens": max((estimate_tokens(c) for c in chunks), default=0),
+        "legacy_chunk_count": math.ceil(len(text) / LEGACY_CHUNK_CHARS)
+    }
@@ -0,0 +1,279 @@
+"""
+Execution layer for blocking work
+- Thread pool for I/O-bound calls (LLM requests, synchronous summarizers)
+- Process pool for CPU-bound work (pypdf extraction, extractive scoring)
+- Admission limit so a saturated worker answers 503 instead of queueing forever
+- One long-lived background event loop for sync code that drives async helpers
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+from app.config import (
+    WORKER_THREADS,
+    WORKER_PROCESSES,
+    MAX_INFLIGHT_REQUESTS,
+    RETRY_AFTER_SECONDS,
+)
+from app.utils.logger import logger
+
+# Set in process-pool workers by the pool initializer. uvicorn's --reload and
+# --workers run the app itself in spawned children, so parent_process() cannot
+# tell a pool worker apart from a server process.
+_in_pool_worker = False
+
+
+def _mark_pool_worker():
+    global _in_pool_worker
+    _in_pool_worker = True
+
+
+class WorkerPoolSaturated(HTTPException):
+    """503 raised when the admission limit is reached"""
+
+    def __init__(self, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__(
+            status_code=503,
+            detail="Service is at capacity, retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class _Counter:
+    """Thread-safe submitted/active/completed counters for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.completed = 0
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with self._lock:
+                self.active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active -= 1
+        return run
+
+    def submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def done(self, _future=None):
+        with self._lock:
+            self.completed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pending = self.submitted - self.completed
+            return {
+                "active": self.active,
+                "queued": max(pending - self.active, 0),
+                "completed": self.completed
+            }
+
+
+class WorkerPool:
+    """Thread and process pools shared by every route"""
+
+    def __init__(self, threads: int = WORKER_THREADS, processes: int = WORKER_PROCESSES,
+                 max_inflight: int = MAX_INFLIGHT_REQUESTS):
+        self.threads = threads
+        self.processes = processes
+        self.max_inflight = max_inflight
+        self._thread_pool = None
+        self._process_pool = None
+        self._lock = threading.Lock()
+        self._thread_stats = _Counter()
+        self._process_stats = _Counter()
+        self.inflight = 0
+        self.rejected = 0
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.threads, thread_name_prefix="ml-io")
+            return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_mark_pool_worker)
+            return self._process_pool
+
+    @property
+    def cpu_inline(self) -> bool:
+        # Run inline when pools are disabled or we already are a pool worker
+        return self.processes <= 0 or _in_pool_worker
+
+    def acquire(self):
+        """Reserve a request slot or raise WorkerPoolSaturated"""
+        if self.inflight >= self.max_inflight:
+            self.rejected += 1
+            logger.warning(f"Rejecting request: {self.inflight} requests in flight")
+            raise WorkerPoolSaturated()
+        self.inflight += 1
+
+    def release(self):
+        self.inflight -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a request slot for the duration of the block"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run_io(self, func, *args, **kwargs):
+        """Run blocking I/O-bound work on the thread pool"""
+        self._thread_stats.submit()
+        # Like asyncio.to_thread, carry context variables (metric labels) into the thread
+        context = contextvars.copy_context()
+        future = self.thread_pool.submit(context.run, self._thread_stats.wrap(func), *args, **kwargs)
+        future.add_done_callback(self._thread_stats.done)
+        return await asyncio.wrap_future(future)
+
+    async def run_cpu(self, func, *args):
+        """Run CPU-bound work on the process pool"""
+        if self.cpu_inline:
+            return await self.run_io(func, *args)
+        return await asyncio.wrap_future(self._submit_cpu(func, *args))
+
+    def cpu_call(self, func, *args):
+        """Blocking CPU-bound call for code already running off the event loop"""
+        if self.cpu_inline:
+            return func(*args)
+        return self._submit_cpu(func, *args).result()
+
+    def map_cpu(self, func, args_list):
+        """Blocking fan-out of CPU-bound calls; results keep argument order"""
+        if self.cpu_inline:
+            return [func(*args) for args in args_list]
+        futures = [self._submit_cpu(func, *args) for args in args_list]
+        return [future.result() for future in futures]
+
+    async def amap_cpu(self, func, args_list):
+        """Async variant of map_cpu"""
+        if self.cpu_inline:
+            return await self.run_io(self.map_cpu, func, args_list)
+        return list(await asyncio.gather(
+            *(asyncio.wrap_future(self._submit_cpu(func, *args)) for args in args_list)))
+
+    def _submit_cpu(self, func, *args):
+        self._process_stats.submit()
+        future = self.process_pool.submit(func, *args)
+        future.add_done_callback(self._process_stats.done)
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "inflight_requests": self.inflight,
+            "max_inflight_requests": self.max_inflight,
+            "rejected_requests": self.rejected,
+            "thread_pool": {"workers": self.threads, **self._thread_stats.snapshot()},
+            "process_pool": {"workers": self.processes, **self._process_stats.snapshot()}
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False, cancel_futures=True)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+
+def _settle(result: Future, task: asyncio.Task):
+    if task.cancelled():
+        result.cancel()
+    elif task.exception() is not None:
+        result.set_exception(task.exception())
+    else:
+        result.set_result(task.result())
+
+
+class BackgroundLoop:
+    """
+    Event loop on a daemon thread that sync code submits coroutines to
+    Async LLM clients belong to the loop that opened them; running every sync
+    call on this one loop lets those clients and their connections be reused
+    instead of opening a fresh loop (and fresh connections) per call.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="ml-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def is_current(self) -> bool:
+        """True when called from a coroutine already running on this loop"""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def run(self, coro):
+        """Run coro on the loop and block for its result, carrying context variables"""
+        if self.is_current():
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run would block its own loop")
+        loop = self.loop
+        result = Future()
+
+        def start():
+            # The task copies the context this callback runs in: the caller's
+            loop.create_task(coro).add_done_callback(functools.partial(_settle, result))
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return result.result()
+
+    def shutdown(self, cleanup=None, timeout: float = 5.0):
+        """Stop the loop, first awaiting cleanup() on it (e.g. closing its clients)"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if cleanup is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(cleanup(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Background loop cleanup failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+
+
+# Create global instances
+worker_pool = WorkerPool()
+background_loop = BackgroundLoop()
@@ -0,0 +1,147 @@
+"""
+Vectorized extractive scoring shared by the extractive summarizers
+A document is split into sentences and tokenized once into integer ids; word
+frequencies, legal-term weights and the length penalty are then applied to
+every sentence at once with NumPy instead of a Python loop per word.
+"""
+
+import re
+from collections import Counter
+from itertools import compress
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'been', 'be', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'this', 'that', 'these', 'those', 'it', 'its', 'he', 'she', 'they',
+    'them', 'their', 'there', 'where', 'when', 'who', 'what', 'which', 'why'
+])
+
+LEGAL_TERMS = {
+    'court': 4, 'judge': 4, 'ruling': 5, 'decision': 5, 'verdict': 5,
+    'plaintiff': 4, 'defendant': 4, 'evidence': 4, 'testimony': 3,
+    'appeal': 4, 'statute': 4, 'law': 3, 'legal': 3, 'case': 3,
+    'held': 5, 'ruled': 5, 'decided': 5, 'found': 4, 'concluded': 4,
+    'jurisdiction': 3, 'precedent': 4, 'contract': 3, 'liability': 4,
+    'damages': 4, 'injunction': 3, 'motion': 3, 'order': 3, 'judgment': 5
+}
+
+WORD = re.compile(r'\b[a-zA-Z]+\b')
+
+
+def _split_sentences(text: str) -> List[str]:
+    # Same pieces as re.split(r'[.!?]+'), plus empty ones that the length check drops
+    return text.replace('!', '.').replace('?', '.').split('.')
+
+
+class TokenizedDocument:
+    """Sentences of a document with their tokens as one flat array of vocabulary ids"""
+
+    def __init__(self, sentences: List[str], vocab: List[str], token_ids: np.ndarray,
+                 sentence_index: np.ndarray, word_freq: Counter):
+        self.sentences = sentences
+        self.vocab = vocab
+        self.token_ids = token_ids
+        self.sentence_index = sentence_index
+        self.word_freq = word_freq
+
+
+class ExtractiveEngine:
+    """Frequency and legal-term weighted sentence ranking"""
+
+    def __init__(self, stop_words: Iterable[str] = STOP_WORDS,
+                 legal_terms: Optional[Dict[str, int]] = None,
+                 min_word_chars: int = 4, min_sentence_chars: int = 21,
+                 legal_weight: float = 2.0, short_sentence_words: int = 5,
+                 long_sentence_words: int = 50, length_penalty: float = 0.7):
+        self.stop_words = frozenset(stop_words)
+        self.legal_terms = LEGAL_TERMS if legal_terms is None else legal_terms
+        self.min_word_chars = min_word_chars
+        self.min_sentence_chars = min_sentence_chars
+        self.legal_weight = legal_weight
+        self.short_sentence_words = short_sentence_words
+        self.long_sentence_words = long_sentence_words
+        self.length_penalty = length_penalty
+
+    def _counted(self, word: str) -> bool:
+        return word not in self.stop_words and len(word) >= self.min_word_chars
+
+    def tokenize(self, text: str) -> TokenizedDocument:
+        """Split into sentences and map every whitespace token to a vocabulary id"""
+        stripped = [piece.strip() for piece in _split_sentences(text)]
+        kept = np.fromiter(map(len, stripped), dtype=np.int64,
+                           count=len(stripped)) >= self.min_sentence_chars
+        sentences = list(compress(stripped, kept))
+
+        # One split over the whole text: lowercasing never adds or removes a boundary,
+        # so the lowered pieces line up, and as no piece contains '.' it marks where
+        # each piece starts (id 0, since the marked text starts with one)
+        tokens = ('. ' + ' . '.join(_split_sentences(text.lower()))).split()
+        ids = {token: i for i, token in enumerate(dict.fromkeys(tokens))}
+        marked_ids = np.fromiter(map(ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        marks = marked_ids == 0
+        piece_index = np.cumsum(marks)[~marks] - 1
+        token_ids = marked_ids[~marks] - 1
+        vocab = list(ids)[1:]
+
+        # The vocabulary covers the whole text; tokens of pieces too short to be
+        # sentences only count towards the word frequencies
+        in_sentence = kept[piece_index]
+        sentence_index = (np.cumsum(kept) - 1)[piece_index[in_sentence]]
+        counts = np.bincount(token_ids, minlength=len(vocab))
+        return TokenizedDocument(sentences, vocab, token_ids[in_sentence], sentence_index,
+                                 self._word_frequencies(vocab, counts))
+
+    def _word_frequencies(self, vocab: List[str], counts: np.ndarray) -> Counter:
+        """Counts of counted WORD matches, in first-occurrence order"""
+        # Words never span whitespace or a sentence boundary, so each distinct token
+        # is matched once and weighted by how often it occurs
+        word_freq = Counter()
+        for token, n in zip(vocab, counts.tolist()):
+            for word in WORD.findall(token):
+                if self._counted(word):
+                    word_freq[word] += n
+        return word_freq
+
+    def score_sentences(self, document: TokenizedDocument) -> np.ndarray:
+        """Mean token weight per sentence, with a penalty for very short or long sentences"""
+        counted = np.fromiter((self._counted(token) for token in document.vocab),
+                              dtype=bool, count=len(document.vocab))
+        weights = np.fromiter(
+            (document.word_freq.get(token, 0) + self.legal_terms.get(token, 0) * self.legal_weight
+             for token in document.vocab), dtype=np.float64, count=len(document.vocab))
+        weights[~counted] = 0.0
+
+        size = len(document.sentences)
+        totals = np.bincount(document.sentence_index, weights=weights[document.token_ids],
+                             minlength=size)
+        word_counts = np.bincount(document.sentence_index, weights=counted[document.token_ids],
+                                  minlength=size)
+        scores = np.divide(totals, word_counts, out=np.zeros(size), where=word_counts > 0)
+        penalized = (word_counts > 0) & ((word_counts < self.short_sentence_words) |
+                                         (word_counts > self.long_sentence_words))
+        scores[penalized] *= self.length_penalty
+        return scores
+
+    def top_sentences(self, document: TokenizedDocument, count: int,
+                      document_order: bool = False) -> List[str]:
+        """Highest scoring sentences, best first (ties keep document order) or in document order"""
+        if len(document.sentences) <= count:
+            return list(document.sentences)
+        ranked = np.argsort(-self.score_sentences(document), kind='stable')[:count]
+        if document_order:
+            ranked = np.sort(ranked)
+        return [document.sentences[i] for i in ranked]
+
+    def key_phrases(self, document: TokenizedDocument, count: int) -> List[str]:
+        """Most frequent content words, boosted by their legal-term weight"""
+        boosted = Counter({word: n + self.legal_terms.get(word, 0)
+                           for word, n in document.word_freq.items()})
+        return [word for word, _ in boosted.most_common(count)]
+
+
+# Create global instance
+extractive_engine = ExtractiveEngine()
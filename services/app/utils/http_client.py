@@ -0,0 +1,176 @@
+"""
+App-lifetime pooled HTTP client for PDF downloads
+One httpx.AsyncClient is shared by every URL-based route so Cloudinary
+connections are kept alive between downloads. HTTP/2 is used when the h2
+package is installed.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional, Union
+
+import httpx
+
+from app.config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    PDF_MAX_DOWNLOAD_BYTES,
+    PDF_SPOOL_MAX_MEMORY,
+)
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+from app.utils.metrics import observe_stage
+from app.utils.tracing import span
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class DownloadError(Exception):
+    """Raised when a PDF cannot be downloaded"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True,
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        logger.info(f"Created shared HTTP client (http2={HTTP2_AVAILABLE})")
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client on application shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class PdfDownload:
+    """
+    A downloaded PDF: bytes in memory up to PDF_SPOOL_MAX_MEMORY, else a temp file
+
+    `source` (bytes or a file path) goes straight to pdf_reader, so large
+    downloads are never read back into memory. Close it to remove the file.
+    """
+
+    def __init__(self, data: Optional[bytes], path: Optional[str], digest: str, size: int):
+        self.data = data
+        self.path = path
+        self.digest = digest
+        self.size = size
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.path if self.path is not None else self.data
+
+    def read(self) -> bytes:
+        if self.path is None:
+            return self.data
+        with open(self.path, "rb") as handle:
+            return handle.read()
+
+    def close(self):
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _spool(handle, blocks):
+    """Append blocks to the temp file, creating it on first use (runs on the thread pool)"""
+    if handle is None:
+        handle = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    handle.writelines(blocks)
+    return handle
+
+
+def _finish_spool(handle, blocks):
+    """Write the last blocks and close the temp file (runs on the thread pool)"""
+    handle.writelines(blocks)
+    handle.close()
+
+
+async def download_pdf(url: str, max_bytes: int = PDF_MAX_DOWNLOAD_BYTES) -> PdfDownload:
+    """
+    Stream a download through the shared client, hashing it on the way
+
+    Raises DownloadError for non-200 responses, transport errors and bodies
+    larger than max_bytes.
+    """
+    digest = hashlib.sha256()
+    blocks = []
+    buffered = 0
+    handle = None
+    size = 0
+    with span("pdf_download", url=url) as download, observe_stage("pdf_download"):
+        try:
+            try:
+                async with get_http_client().stream("GET", url) as response:
+                    if response.status_code != 200:
+                        raise DownloadError(
+                            f"Failed to download PDF: {response.status_code}", response.status_code)
+                    declared = response.headers.get("content-length")
+                    if declared and declared.isdigit() and int(declared) > max_bytes:
+                        raise DownloadError(f"PDF exceeds {max_bytes} byte limit", 413)
+                    async for block in response.aiter_bytes():
+                        size += len(block)
+                        if size > max_bytes:
+                            raise DownloadError(f"PDF exceeds {max_bytes} byte limit", 413)
+                        digest.update(block)
+                        blocks.append(block)
+                        buffered += len(block)
+                        # Past the memory cap, buffered blocks go to disk in one batch
+                        # off the event loop
+                        if buffered > PDF_SPOOL_MAX_MEMORY:
+                            handle = await worker_pool.run_io(_spool, handle, blocks)
+                            blocks = []
+                            buffered = 0
+            except httpx.HTTPError as e:
+                raise DownloadError(f"Failed to download PDF: {e}") from e
+        except BaseException:
+            if handle is not None:
+                handle.close()
+                os.unlink(handle.name)
+            raise
+        download.set_attribute("bytes", size)
+    if handle is not None:
+        await worker_pool.run_io(_finish_spool, handle, blocks)
+        return PdfDownload(None, handle.name, digest.hexdigest(), size)
+    return PdfDownload(b"".join(blocks), None, digest.hexdigest(), size)
+
+
+async def download_pdf_bytes(url: str, max_bytes: int = PDF_MAX_DOWNLOAD_BYTES) -> bytes:
+    """Download a PDF and return its bytes (download_pdf avoids the copy for large files)"""
+    with await download_pdf(url, max_bytes) as download:
+        return await worker_pool.run_io(download.read)
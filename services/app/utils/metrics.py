@@ -0,0 +1,131 @@
+"""
+Prometheus metrics for the summarization pipeline
+Stage histograms (download, extraction, chunking, map and combine calls, JSON
+parsing) are labelled with the route, summary_type and method of the request
+that caused them. Those labels travel in a context variable that the HTTP
+middleware and routes set, so deep helpers need no extra arguments.
+Everything is a no-op when prometheus_client is not installed.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty
+directory so /metrics aggregates every worker.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+
+from app.config import METRICS_ENABLED
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+LABELS = ("route", "summary_type", "method")
+DEFAULT_LABELS = {"route": "none", "summary_type": "default", "method": "default"}
+# Chunking takes milliseconds, a map-reduce over a long PDF several minutes
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+_labels: ContextVar[Dict[str, str]] = ContextVar("metric_labels", default=DEFAULT_LABELS)
+
+ENABLED = PROMETHEUS_AVAILABLE and METRICS_ENABLED
+
+if ENABLED:
+    REQUEST_SECONDS = Histogram(
+        "ml_request_duration_seconds", "HTTP request latency",
+        ("route", "status"), buckets=STAGE_BUCKETS)
+    STAGE_SECONDS = Histogram(
+        "ml_stage_duration_seconds", "Time spent per pipeline stage",
+        ("stage",) + LABELS, buckets=STAGE_BUCKETS)
+    CHUNKS = Counter("ml_chunks_processed_total", "Chunks sent through the map phase", LABELS)
+    LLM_TOKENS = Counter("ml_llm_tokens_total", "LLM tokens per API key", ("key", "kind"))
+    CACHE_LOOKUPS = Counter("ml_cache_lookups_total", "Cache lookups by result", ("cache", "result"))
+    FALLBACKS = Counter("ml_fallback_responses_total", "Fallback and demo responses served",
+                        ("route", "kind"))
+
+
+def set_labels(**labels: str):
+    """Set labels for the rest of the current request (and work it starts)"""
+    _labels.set({**_labels.get(), **{name: str(value) for name, value in labels.items()}})
+
+
+def current_labels() -> Dict[str, str]:
+    return _labels.get()
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """Time the block into the stage histogram, errors included"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_seconds(stage, time.perf_counter() - started)
+
+
+def observe_seconds(stage: str, seconds: float):
+    """Record an already measured stage duration"""
+    if ENABLED:
+        STAGE_SECONDS.labels(stage=stage, **_labels.get()).observe(seconds)
+
+
+def observe_request(route: str, status: int, seconds: float):
+    if ENABLED:
+        REQUEST_SECONDS.labels(route, str(status)).observe(seconds)
+
+
+def record_chunks(count: int = 1):
+    if ENABLED:
+        CHUNKS.labels(**_labels.get()).inc(count)
+
+
+def record_llm_tokens(key: str, prompt_tokens: int, completion_tokens: int):
+    if ENABLED:
+        LLM_TOKENS.labels(key, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(key, "completion").inc(completion_tokens)
+
+
+def record_cache(cache: str, hit: bool):
+    if ENABLED:
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_fallback(kind: str = "demo"):
+    if ENABLED:
+        FALLBACKS.labels(_labels.get()["route"], kind).inc()
+
+
+def route_label(scope) -> str:
+    """Path template of the route that served a request ("unmatched" before routing)"""
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+async def label_route(request: Request):
+    """App-wide dependency: label metrics recorded for this request with its route"""
+    set_labels(route=route_label(request.scope))
+
+
+def render() -> Tuple[Optional[bytes], str]:
+    """Exposition text for /metrics; (None, reason) when metrics are unavailable"""
+    if not PROMETHEUS_AVAILABLE:
+        return None, "prometheus_client is not installed"
+    if not METRICS_ENABLED:
+        return None, "metrics are disabled (METRICS_ENABLED=false)"
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,202 @@
+"""
+Parsed PDF shared by every summarizer path handling the same upload
+Text is extracted at most once per content hash: the compare, section and
+advanced routes pass one ParsedDocument around instead of re-running pypdf,
+and concurrent readers of a document wait on the same extraction.
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from app.config import (
+    PARSED_DOCUMENT_CACHE_SIZE, PARSED_DOCUMENT_CACHE_MAX_BYTES, PDF_STREAM_MIN_BYTES,
+)
+from app.utils.pdf_reader import (
+    ExtractedPages, PdfSource, aextract_pages, extract_pages, source_size,
+)
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+from app.utils.sections import Section
+
+# Uploads larger than this are hashed on a worker thread instead of the event loop
+INLINE_HASH_BYTES = 1024 * 1024
+
+
+class ParsedDocument:
+    """PDF content hash plus lazily extracted text"""
+
+    def __init__(self, source: PdfSource, digest: Optional[str] = None):
+        # A path source (a large download kept on disk) comes with its digest
+        self.digest = digest or hashlib.sha256(source).hexdigest()
+        self.size = source_size(source)
+        self._source = source
+        self._text = None
+        self._sections: Dict[object, List[Section]] = {}
+        self.extraction_timing = None
+        self._extraction: Optional[Future] = None
+        self._extraction_task = None
+        self._lock = threading.Lock()
+
+    @property
+    def extracted(self) -> bool:
+        return self._text is not None
+
+    @property
+    def streamable(self) -> bool:
+        """True for large, not yet extracted documents better served page by page"""
+        return self._text is None and self.size >= PDF_STREAM_MIN_BYTES
+
+    def stream_source(self) -> Optional[PdfSource]:
+        """
+        The raw source when the document should be streamed, else None
+        Checked and read under the extraction lock, so a concurrent extraction
+        cannot release the source between the check and the read.
+        """
+        with self._lock:
+            return self._source if self.streamable else None
+
+    @property
+    def source(self) -> Optional[PdfSource]:
+        """Raw PDF bytes or file path; released once the text has been extracted"""
+        return self._source
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory held: raw bytes before extraction, text after"""
+        if self._text is not None:
+            return len(self._text)
+        return self.size if isinstance(self._source, bytes) else 0
+
+    @property
+    def text(self) -> str:
+        """Extracted text; the first access runs pypdf on the process pool"""
+        if self._text is None:
+            future, owner = self._claim()
+            if owner:
+                try:
+                    self._settle(future, extracted=extract_pages(self._source))
+                except BaseException as e:
+                    self._settle(future, error=e)
+            future.result()
+        return self._text
+
+    async def atext(self) -> str:
+        """Async variant of text for callers on the event loop"""
+        if self._text is None:
+            future, owner = self._claim()
+            if owner:
+                # A task of its own, so a cancelled caller does not fail the other readers
+                task = self._extraction_task = asyncio.ensure_future(aextract_pages(self._source))
+                task.add_done_callback(lambda done: self._settle_task(future, done))
+            await asyncio.shield(asyncio.wrap_future(future))
+        return self._text
+
+    def _claim(self):
+        """The shared extraction future, and whether this caller has to run it"""
+        with self._lock:
+            if self._extraction is None:
+                self._extraction = Future()
+                return self._extraction, True
+            return self._extraction, False
+
+    def _settle_task(self, future: Future, task: asyncio.Task):
+        self._extraction_task = None
+        if task.cancelled():
+            self._settle(future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._settle(future, error=task.exception())
+        else:
+            self._settle(future, extracted=task.result())
+
+    def _settle(self, future: Future, extracted: Optional[ExtractedPages] = None,
+                error: Optional[BaseException] = None):
+        with self._lock:
+            if error is None:
+                self._set_text(extracted)
+            else:
+                # A failed extraction may be retried by the next reader
+                self._extraction = None
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+    def _set_text(self, extracted: ExtractedPages):
+        text = extracted.text
+        self._text = text
+        self.extraction_timing = extracted.timing()
+        # The raw bytes are only needed for extraction
+        self._source = None
+        logger.info(f"Extracted {len(text)} characters from document {self.digest[:12]}")
+
+    def sections(self, detector) -> List[Section]:
+        """Section offsets into text, computed once per document and detector"""
+        sections = self._sections.get(detector)
+        if sections is None:
+            sections = self._sections[detector] = detector.find_sections(self.text)
+        return sections
+
+
+class ParsedDocumentCache:
+    """
+    Small thread-safe LRU of ParsedDocuments keyed by content hash
+    Entries are evicted past `max_entries` or once their raw bytes and text
+    together exceed `max_bytes`; a document larger than that is not kept.
+    """
+
+    def __init__(self, max_entries: int = PARSED_DOCUMENT_CACHE_SIZE,
+                 max_bytes: int = PARSED_DOCUMENT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, file_bytes: bytes, digest: Optional[str] = None) -> ParsedDocument:
+        digest = digest or hashlib.sha256(file_bytes).hexdigest()
+        with self._lock:
+            document = self._documents.get(digest)
+            if document is not None:
+                self._documents.move_to_end(digest)
+                return document
+            document = ParsedDocument(file_bytes, digest)
+            if self.max_entries > 0:
+                self._documents[digest] = document
+                self._evict()
+            return document
+
+    def _evict(self):
+        # Sizes change as documents are extracted, so they are summed each time
+        total = sum(document.memory_bytes for document in self._documents.values())
+        while self._documents and (len(self._documents) > self.max_entries
+                                   or total > self.max_bytes):
+            _, evicted = self._documents.popitem(last=False)
+            total -= evicted.memory_bytes
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+
+# Create global instance
+parsed_documents = ParsedDocumentCache()
+
+
+def parse_document(file_bytes: bytes) -> ParsedDocument:
+    """Return the shared ParsedDocument for these bytes (text extracted lazily)"""
+    return parsed_documents.get_or_create(file_bytes)
+
+
+def _digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+async def aparse_document(file_bytes: bytes) -> ParsedDocument:
+    """parse_document for callers on the event loop"""
+    digest = None
+    if len(file_bytes) > INLINE_HASH_BYTES:
+        digest = await worker_pool.run_io(_digest, file_bytes)
+    return parsed_documents.get_or_create(file_bytes, digest)
@@ -1,11 +1,207 @@
 from pypdf import PdfReader
 import io
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple, Union
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    reader = PdfReader(io.BytesIO(file_bytes))
-    text = ""
-    for page in reader.pages:
-        content = page.extract_text()
-        if content:
-            text += content
-    return text
+from app.config import PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+from app.utils.metrics import observe_seconds
+from app.utils.tracing import current_span, span
+
+
+class ExtractedPages:
+    """Per-page text and extraction time for one PDF (no text when it was streamed)"""
+
+    def __init__(self, pages: List[str], page_seconds: List[float], strategy: str, elapsed: float):
+        self.pages = pages
+        self.page_seconds = page_seconds
+        self.strategy = strategy
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return "".join(self.pages)
+
+    def timing(self) -> dict:
+        slowest = max(range(len(self.page_seconds)), key=self.page_seconds.__getitem__, default=None)
+        return {
+            "strategy": self.strategy,
+            "pages": len(self.page_seconds),
+            "elapsed_seconds": round(self.elapsed, 4),
+            "page_seconds_total": round(sum(self.page_seconds), 4),
+            "slowest_page": slowest,
+            "slowest_page_seconds": round(self.page_seconds[slowest], 4) if slowest is not None else 0.0
+        }
+
+
+class ExtractionStats:
+    """Extraction totals plus the timing of the most recent documents, for /health"""
+
+    def __init__(self, recent: int = 20):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self.documents = 0
+        self.pages = 0
+        self.seconds = 0.0
+        self.page_seconds = 0.0
+
+    def record(self, timing: Dict):
+        with self._lock:
+            self.documents += 1
+            self.pages += timing["pages"]
+            self.seconds += timing["elapsed_seconds"]
+            self.page_seconds += timing["page_seconds_total"]
+            self._recent.append(timing)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "pages": self.pages,
+                "elapsed_seconds": round(self.seconds, 4),
+                # pypdf time only, without process pool overhead
+                "seconds_per_page": round(self.page_seconds / self.pages, 5) if self.pages else 0.0,
+                "recent": list(self._recent)
+            }
+
+
+# Create global instance
+extraction_stats = ExtractionStats()
+
+
+# PDF bytes, or the path of a PDF file (large downloads stay on disk)
+PdfSource = Union[bytes, str]
+
+
+def _open_reader(source: PdfSource) -> PdfReader:
+    # Page-range workers receive a temp file path instead of a copy of the bytes
+    return PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+
+
+def _page_count(source: PdfSource) -> int:
+    return len(_open_reader(source).pages)
+
+
+def _extract_page_range(source: PdfSource, start: int = 0,
+                        stop: int = None) -> List[Tuple[str, float]]:
+    """Extract pages[start:stop] returning (text, seconds) per page"""
+    reader = _open_reader(source)
+    stop = len(reader.pages) if stop is None else stop
+    pages = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        content = reader.pages[index].extract_text() or ""
+        pages.append((content, time.perf_counter() - started))
+    return pages
+
+
+def plan_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Pick the extraction strategy: one range for small documents, else a split"""
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        return [(0, page_count)]
+    # Two ranges per worker keeps processes busy when page costs are uneven
+    size = max(PDF_PAGES_PER_TASK, math.ceil(page_count / (workers * 2)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _collect(results: List[List[Tuple[str, float]]], strategy: str, started: float) -> ExtractedPages:
+    pages = []
+    page_seconds = []
+    for page_range in results:
+        for content, seconds in page_range:
+            pages.append(content)
+            page_seconds.append(seconds)
+    extracted = ExtractedPages(pages, page_seconds, strategy, time.perf_counter() - started)
+    record_extraction(extracted)
+    return extracted
+
+
+def record_extraction(extracted: ExtractedPages):
+    """Report one finished extraction to metrics, /health, the current span and the log"""
+    observe_seconds("text_extraction", extracted.elapsed)
+    timing = extracted.timing()
+    extraction_stats.record(timing)
+    for key in ("strategy", "pages", "slowest_page", "slowest_page_seconds"):
+        current_span().set_attribute(key, timing[key])
+    logger.info(f"Extracted {timing['pages']} pages ({extracted.strategy}) in "
+                f"{extracted.elapsed:.2f}s", extra=timing)
+
+
+def source_size(source: PdfSource) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+
+def _spill(source: PdfSource) -> str:
+    """A file path page-range workers can open; bytes are written to a temp file"""
+    if isinstance(source, str):
+        return source
+    handle = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    with handle:
+        handle.write(source)
+    return handle.name
+
+
+def _unspill(path: str, source: PdfSource):
+    if path is not source:
+        os.unlink(path)
+
+
+def extract_pages(source: PdfSource) -> ExtractedPages:
+    """Extract every page, in parallel page ranges when the document is large"""
+    with span("pdf_extract", bytes=source_size(source)):
+        return _extract_pages(source)
+
+
+def _extract_pages(source: PdfSource) -> ExtractedPages:
+    started = time.perf_counter()
+    if worker_pool.cpu_inline:
+        return _collect([_extract_page_range(source)], "inline", started)
+    ranges = plan_page_ranges(_page_count(source), worker_pool.processes)
+    if len(ranges) == 1:
+        return _collect([worker_pool.cpu_call(_extract_page_range, source)], "serial", started)
+    path = _spill(source)
+    try:
+        results = worker_pool.map_cpu(
+            _extract_page_range, [(path, start, stop) for start, stop in ranges])
+    finally:
+        _unspill(path, source)
+    return _collect(results, f"parallel:{len(ranges)}", started)
+
+
+async def aextract_pages(source: PdfSource) -> ExtractedPages:
+    """Async variant of extract_pages"""
+    with span("pdf_extract", bytes=source_size(source)):
+        return await _aextract_pages(source)
+
+
+async def _aextract_pages(source: PdfSource) -> ExtractedPages:
+    started = time.perf_counter()
+    if worker_pool.cpu_inline:
+        return await worker_pool.run_io(_extract_pages, source)
+    page_count = await worker_pool.run_io(_page_count, source)
+    ranges = plan_page_ranges(page_count, worker_pool.processes)
+    if len(ranges) == 1:
+        result = await worker_pool.run_cpu(_extract_page_range, source)
+        return _collect([result], "serial", started)
+    path = await worker_pool.run_io(_spill, source)
+    try:
+        results = await worker_pool.amap_cpu(
+            _extract_page_range, [(path, start, stop) for start, stop in ranges])
+    finally:
+        _unspill(path, source)
+    return _collect(results, f"parallel:{len(ranges)}", started)
+
+
+def extract_text_from_pdf(source: PdfSource) -> str:
+    # Parsing is CPU-bound, so it runs on the shared process pool
+    return extract_pages(source).text
+
+
+async def aextract_text_from_pdf(source: PdfSource) -> str:
+    return (await aextract_pages(source)).text
@@ -0,0 +1,83 @@
+"""
+Single-pass section detection for legal documents
+Each line is first checked against cheap layout heuristics (short, no trailing
+sentence punctuation, numbered / ALL CAPS / Title Case). Only those heading
+candidates are matched, once, against a compiled alternation of every section
+keyword. Sections are returned as offsets into the text, not copied strings.
+"""
+
+import re
+from typing import Dict, List, NamedTuple
+
+# "III.", "2.1", "A)" and similar heading numbers
+_NUMBERING = re.compile(r"^(?:[IVXLCivxlc]+|\d+(?:\.\d+)*|[A-Za-z])[.)]\s+")
+
+
+class Section(NamedTuple):
+    """A section of a text: its type and [start, end) character offsets"""
+    name: str
+    start: int
+    end: int
+
+
+class SectionDetector:
+    """Finds section headings with one compiled keyword alternation"""
+
+    def __init__(self, section_patterns: Dict[str, List[str]], max_heading_chars: int = 80,
+                 max_heading_words: int = 10, default_section: str = 'general'):
+        self.max_heading_chars = max_heading_chars
+        self.max_heading_words = max_heading_words
+        self.default_section = default_section
+        # One named group per section type; the leftmost keyword on a heading wins
+        groups = "|".join(f"(?P<{name}>{'|'.join(patterns)})"
+                          for name, patterns in section_patterns.items())
+        self._keywords = re.compile(rf"\b(?:{groups})\b", re.IGNORECASE)
+
+    def is_heading(self, line: str) -> bool:
+        """Layout check: could this line be a section heading?"""
+        stripped = line.strip()
+        if not stripped or len(stripped) > self.max_heading_chars:
+            return False
+        words = stripped.split()
+        if len(words) > self.max_heading_words or stripped[-1] in ',;':
+            return False
+        if stripped.isupper():
+            return True
+        if stripped[-1] == '.':
+            return False
+        if _NUMBERING.match(stripped) or stripped[-1] == ':':
+            return True
+        # Title Case: every word longer than a short function word is capitalized
+        return all(word[0].isupper() for word in words if len(word) > 3)
+
+    def find_sections(self, text: str) -> List[Section]:
+        """Sections in document order; text before the first heading is the default section"""
+        headings = []
+        offset = 0
+        for line in text.split('\n'):
+            if self.is_heading(line):
+                match = self._keywords.search(line)
+                if match:
+                    headings.append((offset, match.lastgroup))
+            offset += len(line) + 1
+
+        sections = []
+        first = headings[0][0] if headings else len(text)
+        if text[:first].strip():
+            sections.append(Section(self.default_section, 0, max(0, first - 1)))
+        for index, (start, name) in enumerate(headings):
+            end = headings[index + 1][0] - 1 if index + 1 < len(headings) else len(text)
+            sections.append(Section(name, start, end))
+        # As before: a preamble plus one heading type is two sections; anything
+        # less is not worth splitting and the whole text is the default section
+        if len({section.name for section in sections}) <= 1:
+            return [Section(self.default_section, 0, len(text))]
+        return sections
+
+
+def section_texts(text: str, sections: List[Section]) -> Dict[str, str]:
+    """Slice sections out of text, joining sections of the same type in document order"""
+    parts = {}
+    for section in sections:
+        parts.setdefault(section.name, []).append(text[section.start:section.end])
+    return {name: '\n'.join(chunks) for name, chunks in parts.items()}
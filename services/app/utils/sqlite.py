@@ -0,0 +1,22 @@
+"""
+Short-lived SQLite connections for the on-disk stores
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect(path: str, timeout: float = 30):
+    """
+    A connection that commits the block (or rolls it back) and is then closed
+
+    sqlite3's own context manager only ends the transaction; the connection
+    stays open until it is garbage collected.
+    """
+    conn = sqlite3.connect(path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
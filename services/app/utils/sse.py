@@ -0,0 +1,61 @@
+"""
+Server-Sent Events helpers for streaming summarization routes
+"""
+
+import json
+from typing import AsyncIterator, Dict
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.utils.executor import worker_pool, WorkerPoolSaturated
+from app.utils.logger import logger
+from app.utils.token_usage import request_usage
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode one SSE frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """Holds a worker slot for exactly as long as the response is being sent"""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            worker_pool.acquire()
+        except WorkerPoolSaturated as e:
+            # Nothing has been sent yet, so the client still gets a plain 503
+            rejected = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await rejected(scope, receive, send)
+            return
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            worker_pool.release()
+
+
+def sse_response(events: AsyncIterator[Dict]) -> StreamingResponse:
+    """
+    Stream event dicts ({'event': name, ...}) to the client as SSE
+
+    The response takes a worker slot before the first byte, so a saturated
+    worker still answers 503, and gives it back however sending ends, even
+    if the body is never iterated. Failures after the first byte become an
+    'error' event; the 'done' event also carries the request's token usage.
+    """
+
+    async def stream():
+        try:
+            async for event in events:
+                name = event.pop('event')
+                if name == 'done':
+                    event['token_usage'] = request_usage()
+                yield format_sse(name, event)
+        except Exception as e:
+            logger.error(f"Streaming summarization failed: {e}")
+            yield format_sse('error', {'detail': str(e)})
+
+    return _SlotStreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
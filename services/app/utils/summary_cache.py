@@ -0,0 +1,257 @@
+"""
+Content-addressed summary cache
+Entries are keyed on the SHA-256 of the PDF bytes plus summary level, method,
+model name and prompt version, so repeated uploads skip extraction and the LLM.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from app.config import (
+    GROQ_MODEL_NAME,
+    REDIS_URL,
+    SUMMARY_CACHE_BACKEND,
+    SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_PATH,
+    SUMMARY_CACHE_TTL,
+    SUMMARY_PROMPT_VERSION,
+)
+from app.utils.executor import worker_pool
+from app.utils.logger import logger
+from app.utils.metrics import record_cache
+from app.utils.sqlite import connect
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        expires_at = time.time() + ttl if ttl else 0
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """On-disk cache shared by every worker on the same host"""
+
+    # Expired rows are swept, and the oldest rows beyond max_entries evicted,
+    # once every this many writes
+    SWEEP_EVERY = 64
+
+    def __init__(self, path: str, max_entries: int = 512):
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return connect(self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at and expires_at < time.time():
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        expires_at = time.time() + ttl if ttl else 0
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def sweep(self):
+        """Drop expired rows, then the oldest rows beyond max_entries"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE expires_at > 0 AND expires_at < ?",
+                         (time.time(),))
+            # INSERT OR REPLACE gives a rewritten key a new rowid, so rowid order is write order
+            conn.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY rowid DESC "
+                "LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class RedisCacheBackend:
+    """Redis cache shared across hosts"""
+
+    def __init__(self, url: str, prefix: str = "summary:"):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int):
+        if ttl:
+            self.client.setex(self.prefix + key, ttl, value)
+        else:
+            self.client.set(self.prefix + key, value)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class SummaryCache:
+    """JSON-serializing front end over a pluggable backend"""
+
+    def __init__(self, backend=None, ttl: int = SUMMARY_CACHE_TTL, name: str = "summary"):
+        self.backend = backend
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"{self.name} cache read failed: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+            record_cache(self.name, False)
+            return None
+        self.hits += 1
+        record_cache(self.name, True)
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps(value), self.ttl)
+        except Exception as e:
+            logger.warning(f"{self.name} cache write failed: {e}")
+
+    @property
+    def blocking(self) -> bool:
+        """True when the backend does disk or network I/O"""
+        return self.enabled and not isinstance(self.backend, MemoryCacheBackend)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get for callers on the event loop; SQLite and Redis reads run on the I/O pool"""
+        if not self.blocking:
+            return self.get(key)
+        return await worker_pool.run_io(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        """Async variant of set"""
+        if not self.blocking:
+            self.set(key, value)
+            return
+        await worker_pool.run_io(self.set, key, value)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl": self.ttl
+        }
+
+
+def make_summary_key(content: Union[bytes, str], summary_type: str, method: str,
+                     model_name: str = GROQ_MODEL_NAME,
+                     prompt_version: str = SUMMARY_PROMPT_VERSION) -> str:
+    """Build the cache key for a summary of PDF bytes or their sha256 hex digest"""
+    digest = content if isinstance(content, str) else hashlib.sha256(content).hexdigest()
+    return f"{digest}:{summary_type}:{method}:{model_name}:v{prompt_version}"
+
+
+def create_cache_backend(name: str = SUMMARY_CACHE_BACKEND, path: str = SUMMARY_CACHE_PATH,
+                         max_entries: int = SUMMARY_CACHE_MAX_ENTRIES, prefix: str = "summary:"):
+    """Instantiate the configured backend, falling back to memory"""
+    if name == "none":
+        return None
+    if name == "sqlite":
+        return SQLiteCacheBackend(path, max_entries)
+    if name == "redis":
+        if REDIS_AVAILABLE:
+            return RedisCacheBackend(REDIS_URL, prefix)
+        logger.warning(f"Redis not available, using in-memory {prefix.rstrip(':')} cache")
+    return MemoryCacheBackend(max_entries)
+
+
+# Create global instance
+summary_cache = SummaryCache(create_cache_backend())
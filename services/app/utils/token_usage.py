@@ -0,0 +1,292 @@
+"""
+Token accounting for LLM calls
+Every completion is recorded with its prompt and completion tokens, taken from
+the response usage when Groq reports it and estimated locally otherwise.
+Totals for the current request accumulate in a context variable (shared by the
+tasks and threads the request starts) so routes can return them, and each call
+is stored in SQLite with its key, route, category, summary type and stage so
+GET /usage can aggregate consumption and peak tokens per minute. Rows are
+buffered and written in batches from a background thread, so the event loop
+never waits on the database.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from app.config import (
+    TOKEN_USAGE_ENABLED,
+    TOKEN_USAGE_STORE_PATH,
+    TOKEN_USAGE_RETENTION_DAYS,
+    GROQ_INPUT_PRICE_PER_MTOK,
+    GROQ_OUTPUT_PRICE_PER_MTOK,
+)
+from app.utils.logger import logger
+from app.utils.metrics import current_labels
+from app.utils.sqlite import connect
+
+# Columns GET /usage may group by
+GROUP_COLUMNS = ("key", "route", "category", "summary_type", "method", "stage", "model")
+# Buffered calls are written at least once a second, sooner once this many wait
+FLUSH_BATCH = 256
+FLUSH_INTERVAL = 1.0
+# Rows past the retention window are deleted at most once an hour
+PRUNE_INTERVAL = 3600
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """USD for the given tokens at the configured Groq prices"""
+    return round((prompt_tokens * GROQ_INPUT_PRICE_PER_MTOK
+                  + completion_tokens * GROQ_OUTPUT_PRICE_PER_MTOK) / 1e6, 6)
+
+
+class UsageTotals:
+    """Running token totals for one request or job"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.estimated_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, estimated: bool):
+        with self._lock:
+            self.calls += 1
+            self.estimated_calls += int(estimated)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def as_dict(self) -> Dict:
+        return {
+            "llm_calls": self.calls,
+            "estimated_calls": self.estimated_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "estimated_cost_usd": estimate_cost(self.prompt_tokens, self.completion_tokens)
+        }
+
+
+_totals: ContextVar[Optional[UsageTotals]] = ContextVar("usage_totals", default=None)
+_category: ContextVar[Optional[str]] = ContextVar("usage_category", default=None)
+_stage: ContextVar[str] = ContextVar("usage_stage", default="call")
+
+
+def start_totals() -> UsageTotals:
+    """Begin counting tokens for the current request (or background job)"""
+    totals = UsageTotals()
+    _totals.set(totals)
+    return totals
+
+
+def request_usage() -> Dict:
+    """Token totals of the current request so far, for response metadata"""
+    totals = _totals.get()
+    return (totals or UsageTotals()).as_dict()
+
+
+def set_category(category: str):
+    _category.set(category)
+
+
+@contextmanager
+def usage_stage(stage: str):
+    """Attribute LLM calls made in the block to a stage such as map_call"""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        try:
+            _stage.reset(token)
+        except ValueError:
+            # Async generators may resume in another context than they started in
+            pass
+
+
+class UsageStore:
+    """SQLite log of LLM calls, shared by every worker process on the host"""
+
+    def __init__(self, path: str = TOKEN_USAGE_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_usage ("
+                "ts REAL NOT NULL, key TEXT, route TEXT, category TEXT, summary_type TEXT, "
+                "method TEXT, stage TEXT, model TEXT, prompt_tokens INTEGER, "
+                "completion_tokens INTEGER, estimated INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_usage_ts ON llm_usage (ts)")
+
+    def _connect(self):
+        return connect(self.path)
+
+    def add_many(self, rows: List[Dict]):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO llm_usage (ts, key, route, category, summary_type, method, stage, "
+                "model, prompt_tokens, completion_tokens, estimated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(row["ts"], row["key"], row["route"], row["category"], row["summary_type"],
+                  row["method"], row["stage"], row["model"], row["prompt_tokens"],
+                  row["completion_tokens"], int(row["estimated"])) for row in rows]
+            )
+
+    def prune(self, before: float) -> int:
+        """Delete calls recorded before `before`; returns how many"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM llm_usage WHERE ts < ?", (before,)).rowcount
+
+    def summary(self, group_by: List[str], since: Optional[float] = None,
+                until: Optional[float] = None,
+                filters: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """
+        Aggregate calls per group, busiest groups first
+
+        peak_tpm is the most tokens any one group consumed in a calendar
+        minute, which is what Groq's per-key TPM limit is measured against.
+        """
+        unknown = [column for column in list(group_by) + list(filters or {})
+                   if column not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown usage column(s): {', '.join(unknown)}")
+        where = ["ts >= ?", "ts < ?"]
+        params = [since or 0, until or time.time() + 1]
+        for column, value in (filters or {}).items():
+            where.append(f"{column} = ?")
+            params.append(value)
+        columns = ", ".join(group_by)
+        select = f"{columns}, " if group_by else ""
+        query = (
+            f"SELECT {select}SUM(calls), SUM(estimated), SUM(prompt), SUM(completion), "
+            f"MAX(prompt + completion), MIN(first_ts), MAX(last_ts) FROM ("
+            f"SELECT {select}COUNT(*) AS calls, SUM(estimated) AS estimated, "
+            f"SUM(prompt_tokens) AS prompt, SUM(completion_tokens) AS completion, "
+            f"MIN(ts) AS first_ts, MAX(ts) AS last_ts "
+            f"FROM llm_usage WHERE {' AND '.join(where)} "
+            f"GROUP BY {select}CAST(ts / 60 AS INTEGER)) "
+            + (f"GROUP BY {columns} " if group_by else "")
+            + "ORDER BY SUM(prompt) + SUM(completion) DESC"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        results = []
+        for row in rows:
+            calls, estimated, prompt, completion, peak, first, last = row[len(group_by):]
+            if not calls:
+                continue
+            results.append({
+                **dict(zip(group_by, row[:len(group_by)])),
+                "llm_calls": calls,
+                "estimated_calls": estimated,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+                "avg_tokens_per_call": round((prompt + completion) / calls, 1),
+                "peak_tpm": peak,
+                "estimated_cost_usd": estimate_cost(prompt, completion),
+                "first_call": first,
+                "last_call": last
+            })
+        return results
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_usage")
+
+
+class UsageRecorder:
+    """Adds each LLM call to the request totals and, from a background thread, the usage store"""
+
+    def __init__(self, store: Optional[UsageStore] = None, enabled: bool = TOKEN_USAGE_ENABLED,
+                 retention_days: float = TOKEN_USAGE_RETENTION_DAYS):
+        self._store = store
+        self.enabled = enabled
+        self.retention_days = retention_days
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pruned_at = 0.0
+        self.dropped = 0
+
+    @property
+    def store(self) -> UsageStore:
+        if self._store is None:
+            self._store = UsageStore()
+        return self._store
+
+    def record(self, key: str, model: str, prompt_tokens: int, completion_tokens: int,
+               estimated: bool):
+        totals = _totals.get()
+        if totals is not None:
+            totals.add(prompt_tokens, completion_tokens, estimated)
+        if not self.enabled:
+            return
+        labels = current_labels()
+        row = {
+            "ts": time.time(), "key": key, "route": labels["route"],
+            "category": _category.get(), "summary_type": labels["summary_type"],
+            "method": labels["method"], "stage": _stage.get(), "model": model,
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "estimated": estimated
+        }
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= FLUSH_BATCH
+        if self._thread is None:
+            self._start()
+        if full:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="usage-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+            if self._stopping:
+                return
+
+    def flush(self):
+        """Write the buffered calls now (GET /usage does, so it sees the latest ones)"""
+        with self._write_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            try:
+                if rows:
+                    self.store.add_many(rows)
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                logger.warning(f"Could not record token usage for {len(rows)} calls: {e}")
+            if self.retention_days > 0 and time.time() - self._pruned_at >= PRUNE_INTERVAL:
+                self._pruned_at = time.time()
+                try:
+                    self.store.prune(self._pruned_at - self.retention_days * 86400)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not prune token usage: {e}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Write what is still buffered; called when the app stops"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Create global instance
+usage_recorder = UsageRecorder()
@@ -0,0 +1,273 @@
+"""
+Request tracing for the summarization pipeline
+A small W3C trace-context tracer: the HTTP middleware continues the trace in
+an incoming `traceparent` header (or starts one), and `span()` blocks around
+downloads, extraction, LLM calls and the final summary record child spans.
+The current span travels in a context variable, which asyncio tasks and the
+worker pool's I/O threads inherit, so deep helpers need no extra arguments.
+
+Finished spans are exported from a background thread as JSON lines and/or as
+OTLP/HTTP JSON to a collector such as the OpenTelemetry Collector or Jaeger.
+Everything is a no-op unless TRACING_ENABLED is set.
+"""
+
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    TRACING_ENABLED,
+    TRACE_EXPORT_PATH,
+    TRACE_COLLECTOR_URL,
+    TRACE_SAMPLE_RATIO,
+    TRACE_SERVICE_NAME,
+)
+from app.utils.logger import logger
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# Spans are written in batches of up to this many, at least once a second
+EXPORT_BATCH = 512
+EXPORT_INTERVAL = 1.0
+
+
+class Span:
+    """One timed operation; `parent_id` links it to the span that started it"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "kind",
+                 "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool,
+                 kind: str = "internal", attributes: Optional[Dict] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _random_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def as_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off, so callers need no checks"""
+
+    trace_id = span_id = parent_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _random_hex(size: int) -> str:
+    value = random.getrandbits(size * 8)
+    # All-zero ids are invalid in W3C trace context
+    return f"{value or 1:0{size * 2}x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a traceparent header, None if invalid"""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, remote_parent: Optional[str] = None, kind: str = "internal", **attributes):
+    """
+    Record the block as a child of the current span
+
+    `remote_parent` is an incoming traceparent header; a span without either
+    parent starts a new trace, sampled at TRACE_SAMPLE_RATIO.
+    """
+    if not TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+    parent = _current.get()
+    remote = parse_traceparent(remote_parent) if parent is None else None
+    if parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    elif remote is not None:
+        trace_id, parent_id, sampled = remote
+    else:
+        trace_id, parent_id, sampled = _random_hex(16), None, random.random() < TRACE_SAMPLE_RATIO
+    current = Span(name, trace_id, parent_id, sampled, kind, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Async generators may resume in another context than they started in
+            _current.set(parent)
+        if sampled:
+            exporter.export(current)
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict:
+    """OTLP/HTTP JSON payload for a batch of spans"""
+    kinds = {"internal": 1, "server": 2, "client": 3}
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": kinds.get(s.kind, 1),
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)}
+                               for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1}
+            } for s in spans]
+        }]
+    }]}
+
+
+class TraceExporter:
+    """Writes finished spans from a background thread so requests never wait on it"""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH, collector_url: str = TRACE_COLLECTOR_URL):
+        self.path = path
+        self.collector_url = collector_url
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.failed = 0
+
+    def export(self, finished: Span):
+        if self._thread is None:
+            self._start()
+        self._queue.put(finished)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch, stopping = [], False
+            try:
+                item = self._queue.get(timeout=EXPORT_INTERVAL)
+                while True:
+                    # None is the shutdown sentinel
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= EXPORT_BATCH:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: List[Span]):
+        try:
+            if self.path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                lines = "".join(json.dumps(s.as_dict()) + "\n" for s in batch)
+                # One append per batch keeps lines from several workers intact
+                with open(self.path, "a") as handle:
+                    handle.write(lines)
+            if self.collector_url:
+                request = urllib.request.Request(
+                    self.collector_url, data=json.dumps(to_otlp(batch)).encode("utf-8"),
+                    headers={"Content-Type": "application/json"}, method="POST")
+                urllib.request.urlopen(request, timeout=5).close()
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.warning(f"Could not export {len(batch)} spans: {e}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Flush queued spans; called when the app stops"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": TRACING_ENABLED,
+            "path": self.path or None,
+            "collector_url": self.collector_url or None,
+            "exported": self.exported,
+            "failed": self.failed
+        }
+
+
+# Create global instance
+exporter = TraceExporter()
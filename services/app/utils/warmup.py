@@ -0,0 +1,71 @@
+"""
+Background warm-up for lazily imported services
+Routers import their summarizers (LangChain, langchain_groq, pypdf, ...) on
+first use so the app starts serving quickly. Right after startup the same
+modules are imported on a worker thread, so the first request normally finds
+them loaded already.
+"""
+
+import asyncio
+import importlib
+import time
+from typing import Dict, List, Optional
+
+from app.config import WARM_UP_ON_STARTUP
+from app.utils.logger import logger
+
+# Modules behind the mounted routers, heaviest first
+WARM_UP_MODULES = [
+    "app.services.lightweight_enhanced_summarizer",
+    "app.services.summarizer",
+    "app.services.general_overall_summarizer",
+    "app.services.category_summarizer",
+    "app.services.category_pipeline",
+]
+
+
+class WarmUp:
+    """Imports a list of modules off the event loop and records how long each took"""
+
+    def __init__(self, modules: List[str], enabled: bool = WARM_UP_ON_STARTUP):
+        self.modules = list(modules)
+        self.enabled = enabled
+        self.timings = {}
+        self.failed = {}
+        self.seconds = None
+        self._task = None
+
+    def _run(self):
+        started = time.perf_counter()
+        for name in self.modules:
+            module_started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                # The route importing it will surface the error on first use
+                self.failed[name] = str(e)
+                logger.warning(f"Warm-up import of {name} failed: {e}")
+                continue
+            self.timings[name] = round(time.perf_counter() - module_started, 3)
+        self.seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Warm-up imported {len(self.timings)} modules in {self.seconds}s")
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Schedule the warm-up; called from the app lifespan"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(asyncio.to_thread(self._run))
+        return self._task
+
+    def stats(self) -> Dict:
+        if not self.enabled:
+            state = "disabled"
+        elif self.seconds is not None:
+            state = "done"
+        else:
+            state = "running" if self._task else "pending"
+        return {"state": state, "seconds": self.seconds, "modules": dict(self.timings),
+                "failed": dict(self.failed)}
+
+
+# Create global instance
+warm_up = WarmUp(WARM_UP_MODULES)
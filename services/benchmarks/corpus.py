@@ -0,0 +1,166 @@
+"""
+Synthetic legal PDF corpus for the benchmarks
+Documents are generated locally and deterministically (seeded): numbered
+section headings, numbered paragraphs, parties, statutes and case citations,
+laid out as text PDFs that pypdf extracts like a real judgment. Generated
+files are cached under benchmarks/.corpus so repeated runs reuse them.
+
+Usage (from services/):
+    python -m benchmarks.corpus --pages 10 100 500 2000
+"""
+
+import argparse
+import os
+import random
+from typing import Iterator, List
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".corpus")
+DEFAULT_PAGES = [10, 100, 500, 2000]
+
+LINES_PER_PAGE = 46
+LINE_CHARS = 92
+
+HEADINGS = [
+    "INTRODUCTION", "STATEMENT OF FACTS", "Procedural History", "QUESTIONS PRESENTED",
+    "Standard of Review", "DISCUSSION", "The Parties' Arguments", "Legal Analysis",
+    "CONCLUSION", "ORDER",
+]
+PARTIES = ["Appellant", "Respondent", "the Plaintiff", "the Defendant", "the Trustee",
+           "the Commissioner", "the Insurer", "the Contractor"]
+SUBJECTS = ["the lease agreement", "the insurance policy", "the supply contract",
+            "the arbitration clause", "the employment agreement", "the indemnity provision",
+            "the notice of termination", "the settlement deed"]
+VERBS = ["held", "found", "concluded", "ruled", "determined", "observed", "noted", "decided"]
+OUTCOMES = ["was void for lack of consideration", "was validly terminated",
+            "did not extend to consequential loss", "was enforceable against the guarantor",
+            "had been waived by subsequent conduct", "was a condition precedent to liability",
+            "could not be relied upon after the limitation period",
+            "required strict compliance with the statutory notice"]
+COURTS = ["the trial court", "the Court of Appeal", "this Court", "the High Court",
+          "the tribunal", "the district judge"]
+STATUTES = ["Section 73 of the Contract Act", "Rule 12(b)(6)", "Section 9 of the Arbitration Act",
+            "Article 226 of the Constitution", "Order XXXIX Rule 1", "Section 34 of the Limitation Act"]
+CASES = ["Hadley v. Baxendale", "Carlill v. Carbolic Smoke Ball Co.", "Donoghue v. Stevenson",
+         "Smith v. Hughes", "Photo Production Ltd v. Securicor", "Balfour v. Balfour"]
+
+
+def _sentence(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.35:
+        return (f"{rng.choice(COURTS).capitalize()} {rng.choice(VERBS)} that "
+                f"{rng.choice(SUBJECTS)} {rng.choice(OUTCOMES)}.")
+    if kind < 0.55:
+        return (f"Relying on {rng.choice(CASES)}, {rng.choice(PARTIES)} contends that "
+                f"{rng.choice(SUBJECTS)} {rng.choice(OUTCOMES)} under {rng.choice(STATUTES)}.")
+    if kind < 0.75:
+        return (f"The evidence showed that {rng.choice(PARTIES)} delivered notice on "
+                f"{rng.randint(1, 28)} {rng.choice(['March', 'June', 'October'])} "
+                f"{rng.randint(1995, 2023)}, and the testimony was not contradicted.")
+    if kind < 0.9:
+        return (f"We are unable to accept the submission that {rng.choice(SUBJECTS)} "
+                f"{rng.choice(OUTCOMES)}; the damages claimed were {rng.randint(2, 900)},000.")
+    return f"See {rng.choice(CASES)} at para {rng.randint(3, 80)}."
+
+
+def _wrap(paragraph: str) -> Iterator[str]:
+    line = ""
+    for word in paragraph.split():
+        if line and len(line) + 1 + len(word) > LINE_CHARS:
+            yield line
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        yield line
+
+
+def document_lines(pages: int, seed: int = 0) -> List[List[str]]:
+    """Page-by-page text lines of one synthetic judgment"""
+    rng = random.Random(seed * 100003 + pages)
+    total_lines = pages * LINES_PER_PAGE
+    # Spread the headings evenly, with a caption on the first page
+    heading_every = max(LINES_PER_PAGE, total_lines // len(HEADINGS))
+    lines = [f"IN THE HIGH COURT OF EXAMPLE - CIVIL APPEAL NO. {rng.randint(100, 999)} OF 2024", ""]
+    heading_index = 0
+    paragraph = 1
+    while len(lines) < total_lines:
+        # Pages are joined without a newline, so keep headings off the first line of a page
+        if (len(lines) >= heading_index * heading_every and heading_index < len(HEADINGS)
+                and 0 < len(lines) % LINES_PER_PAGE < LINES_PER_PAGE - 3):
+            numeral = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"][heading_index]
+            lines.extend(["", f"{numeral}. {HEADINGS[heading_index]}", ""])
+            heading_index += 1
+        text = " ".join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+        lines.extend(_wrap(f"{paragraph}. {text}"))
+        paragraph += 1
+    lines = lines[:total_lines]
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, total_lines, LINES_PER_PAGE)]
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(page_lines: List[List[str]]) -> bytes:
+    """Minimal text PDF (Helvetica, one content stream per page)"""
+    page_count = len(page_lines)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(page_count))}] "
+         f"/Count {page_count} >>").encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(page_lines):
+        body = "BT /F1 10 Tf 40 770 Td 16 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+             f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode()
+    return bytes(out)
+
+
+def make_legal_pdf(pages: int, seed: int = 0) -> bytes:
+    return render_pdf(document_lines(pages, seed))
+
+
+def corpus_path(pages: int, seed: int = 0) -> str:
+    return os.path.join(CORPUS_DIR, f"legal_{pages:05d}p_s{seed}.pdf")
+
+
+def load_pdf(pages: int, seed: int = 0) -> bytes:
+    """Generated PDF for this page count, built once and cached on disk"""
+    path = corpus_path(pages, seed)
+    if not os.path.exists(path):
+        os.makedirs(CORPUS_DIR, exist_ok=True)
+        data = make_legal_pdf(pages, seed)
+        with open(f"{path}.tmp", "wb") as handle:
+            handle.write(data)
+        os.replace(f"{path}.tmp", path)
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for pages in args.pages:
+        size = len(load_pdf(pages, args.seed))
+        print(f"{corpus_path(pages, args.seed)}  {pages} pages  {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Local Groq / OpenAI-compatible stand-in for offline load testing
+Serves /openai/v1/chat/completions (plain and streamed) with configurable
+latency distributions, per-key RPM/TPM limits answered with 429 and
+Retry-After, injected 429/5xx errors and deterministic canned completions
+(the same prompt always gets the same text). Point the service at it with
+GROQ_BASE_URL and any number of placeholder keys:
+
+    python -m benchmarks.fake_groq --port 8090 --latency lognormal:0.8,0.5 --rpm 30 --error-5xx 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8090 GROQ_API_KEY_1=fake-1 GROQ_API_KEY_2=fake-2 ./run.sh
+
+GET /stats reports what the service sent; PATCH /admin/behaviour changes the
+behaviour of a running server (e.g. {"error_5xx": 1.0} to simulate an outage).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WINDOW_SECONDS = 60.0
+_VOCABULARY = ("the court held that the appellant failed to establish a breach of the agreement "
+               "and the respondent was entitled to damages under the statute while the notice of "
+               "appeal was dismissed because the evidence did not support the claim for relief "
+               "and the judgment of the trial court was affirmed with costs").split()
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    """'fixed:0.5', 'uniform:0.2,1.0', 'normal:mean,stddev' or 'lognormal:median,sigma'"""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",")] if params else []
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    return kind, values
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class Behaviour:
+    """How the stand-in responds; every field can be changed while it runs"""
+
+    FIELDS = ("latency", "token_rate", "rpm", "tpm", "error_429", "error_5xx",
+              "reply_tokens", "seed")
+    _INTS = ("rpm", "tpm", "reply_tokens", "seed")
+    _SHARES = ("error_429", "error_5xx")
+
+    def __init__(self, latency: str = "fixed:0.3", token_rate: float = 0.0, rpm: int = 0,
+                 tpm: int = 0, error_429: float = 0.0, error_5xx: float = 0.0,
+                 reply_tokens: int = 200, seed: int = 0):
+        self.update(latency=latency, token_rate=token_rate, rpm=rpm, tpm=tpm,
+                    error_429=error_429, error_5xx=error_5xx, reply_tokens=reply_tokens,
+                    seed=seed)
+
+    @classmethod
+    def _coerce(cls, name: str, value):
+        """The validated value for one field; ValueError if it does not fit"""
+        if name == "latency":
+            if not isinstance(value, str):
+                raise ValueError(f"latency must be a string, got {value!r}")
+            parse_latency(value)
+            return value
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        if name in cls._INTS:
+            if not number.is_integer():
+                raise ValueError(f"{name} must be an integer, got {value!r}")
+            number = int(number)
+        if name != "seed" and not number >= 0:
+            raise ValueError(f"{name} must not be negative, got {value!r}")
+        if name in cls._SHARES and number > 1:
+            raise ValueError(f"{name} is a share between 0 and 1, got {value!r}")
+        return number
+
+    def update(self, **changes):
+        """Apply the changes, or none of them if any field is invalid"""
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown behaviour fields: {sorted(unknown)}")
+        values = {name: self._coerce(name, value) for name, value in changes.items()}
+        if "latency" in values:
+            self._latency = parse_latency(values["latency"])
+        for name, value in values.items():
+            setattr(self, name, value)
+        if "seed" in values:
+            self.rng = random.Random(self.seed)
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def sample_latency(self) -> float:
+        """Time to first token, drawn from the configured distribution"""
+        kind, values = self._latency
+        if kind == "fixed":
+            return values[0]
+        if kind == "uniform":
+            return self.rng.uniform(*values)
+        if kind == "normal":
+            return max(0.0, self.rng.gauss(*values))
+        median, sigma = values
+        return self.rng.lognormvariate(0.0, sigma) * median
+
+    def generation_seconds(self, tokens: int) -> float:
+        return tokens / self.token_rate if self.token_rate > 0 else 0.0
+
+
+class RateWindow:
+    """Per-key sliding one-minute window of requests and tokens"""
+
+    def __init__(self):
+        self.events = deque()
+
+    def _expire(self, now: float):
+        while self.events and self.events[0][0] <= now - WINDOW_SECONDS:
+            self.events.popleft()
+
+    def admit(self, tokens: int, rpm: int, tpm: int, now: float) -> Optional[float]:
+        """Record the request, or return seconds until it would fit"""
+        self._expire(now)
+        used = sum(n for _, n in self.events)
+        if (rpm and len(self.events) >= rpm) or (tpm and self.events and used + tokens > tpm):
+            return max(0.1, self.events[0][0] + WINDOW_SECONDS - now)
+        self.events.append((now, tokens))
+        return None
+
+
+class FakeGroq:
+    """State of one stand-in server: behaviour, rate windows and counters"""
+
+    def __init__(self, behaviour: Behaviour):
+        self.behaviour = behaviour
+        self.windows: Dict[str, RateWindow] = {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.statuses = Counter()
+        self.per_key = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def reply(self, model: str, prompt: str) -> str:
+        """Deterministic completion: a pseudo-random passage seeded by the prompt"""
+        digest = hashlib.sha256(f"{self.behaviour.seed}\0{model}\0{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        # Draw words until the text reaches reply_tokens by estimate_tokens' measure
+        words, length = [], -1
+        while length // 4 < self.behaviour.reply_tokens:
+            words.append(rng.choice(_VOCABULARY))
+            length += len(words[-1]) + 1
+        sentences = [" ".join(words[i:i + 15]).capitalize() + "."
+                     for i in range(0, len(words), 15)]
+        return " ".join(sentences)
+
+    def check(self, key: str, tokens: int) -> Optional[JSONResponse]:
+        """An error response for this request (rate limit or injected failure), if any"""
+        behaviour = self.behaviour
+        with self.lock:
+            self.per_key[key] += 1
+            wait = self.windows.setdefault(key, RateWindow()).admit(
+                tokens, behaviour.rpm, behaviour.tpm, time.monotonic())
+            roll = behaviour.rng.random()
+        if wait is not None:
+            return _error(429, "rate_limit_exceeded",
+                          f"Rate limit reached for key {key[:8]}; retry in {wait:.1f}s",
+                          retry_after=wait)
+        if roll < behaviour.error_429:
+            return _error(429, "rate_limit_exceeded", "Injected rate limit", retry_after=1.0)
+        if roll < behaviour.error_429 + behaviour.error_5xx:
+            status = behaviour.rng.choice([500, 502, 503])
+            return _error(status, "server_error", f"Injected {status}")
+        return None
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "requests": sum(self.statuses.values()),
+                "statuses": dict(self.statuses),
+                "per_key": dict(self.per_key),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "behaviour": self.behaviour.as_dict()
+            }
+
+
+def _error(status: int, code: str, message: str,
+           retry_after: Optional[float] = None) -> JSONResponse:
+    headers = {"retry-after": f"{retry_after:.1f}"} if retry_after is not None else None
+    body = {"error": {"message": message, "type": "invalid_request_error" if status == 429
+                      else "server_error", "code": code}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def _prompt_text(messages: List[Dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(f"{message.get('role', 'user')}: {content}")
+    return "\n".join(parts)
+
+
+def create_app(behaviour: Optional[Behaviour] = None) -> FastAPI:
+    fake = FakeGroq(behaviour or Behaviour())
+    app = FastAPI(title="Fake Groq")
+    app.state.fake = fake
+
+    @app.get("/openai/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "llama3-8b-8192", "object": "model"}]}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        key = request.headers.get("authorization", "").removeprefix("Bearer ").strip() or "anonymous"
+        model = body.get("model", "llama3-8b-8192")
+        prompt = _prompt_text(body.get("messages", []))
+        prompt_tokens = estimate_tokens(prompt)
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 0
+        text = fake.reply(model, prompt)
+        completion_tokens = estimate_tokens(text)
+
+        error = fake.check(key, prompt_tokens + (max_tokens or completion_tokens))
+        latency = fake.behaviour.sample_latency()
+        with fake.lock:
+            fake.in_flight += 1
+            fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+        if error is not None:
+            try:
+                # Errors come back quickly, as they do from the real API
+                await asyncio.sleep(min(latency, 0.05))
+            finally:
+                with fake.lock:
+                    fake.in_flight -= 1
+                    fake.statuses[error.status_code] += 1
+            return error
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+
+        def finish():
+            with fake.lock:
+                fake.in_flight -= 1
+                fake.statuses[200] += 1
+                fake.prompt_tokens += prompt_tokens
+                fake.completion_tokens += completion_tokens
+
+        if not body.get("stream"):
+            try:
+                await asyncio.sleep(latency + fake.behaviour.generation_seconds(completion_tokens))
+            finally:
+                finish()
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None, **extra) -> str:
+            payload = {"id": completion_id, "object": "chat.completion.chunk",
+                       "created": created, "model": model,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                       **extra}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            try:
+                await asyncio.sleep(latency)
+                yield chunk({"role": "assistant", "content": ""})
+                words = text.split(" ")
+                for start in range(0, len(words), 4):
+                    piece = " ".join(words[start:start + 4])
+                    piece = piece if start == 0 else " " + piece
+                    await asyncio.sleep(fake.behaviour.generation_seconds(estimate_tokens(piece)))
+                    yield chunk({"content": piece})
+                yield chunk({}, "stop", x_groq={"usage": usage}, usage=usage)
+                yield "data: [DONE]\n\n"
+            finally:
+                finish()
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return fake.stats()
+
+    @app.patch("/admin/behaviour")
+    async def update_behaviour(request: Request):
+        try:
+            fake.behaviour.update(**await request.json())
+        except (TypeError, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return fake.behaviour.as_dict()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="fixed:0.3",
+                        help="fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="completion tokens generated per second (0 = instant)")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute per key (0 = off)")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per minute per key (0 = off)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="share of injected 429s")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="share of injected 5xx")
+    parser.add_argument("--reply-tokens", type=int, default=200, help="approximate completion tokens per reply")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    behaviour = Behaviour(latency=args.latency, token_rate=args.token_rate, rpm=args.rpm,
+                          tpm=args.tpm, error_429=args.error_429, error_5xx=args.error_5xx,
+                          reply_tokens=args.reply_tokens, seed=args.seed)
+    import uvicorn
+    uvicorn.run(create_app(behaviour), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
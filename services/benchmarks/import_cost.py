@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark: import cost of the FastAPI app, per module
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter (best
+of --runs), reports the slowest modules and fails when the startup import
+exceeds the budget or pulls in a module that must stay lazy. Modules loaded
+by the background warm-up are timed separately for reference.
+
+Usage (from services/):
+    python -m benchmarks.import_cost [--budget-ms 1500] [--runs 3] [--top 15] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Heavy dependencies that must load on first use or in the warm-up, never at startup
+LAZY_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langchain_groq",
+    "groq",
+    "pypdf",
+    "nltk",
+    "sklearn",
+    "numpy",
+    "transformers",
+]
+
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+
+def measure_imports(statement: str) -> Dict[str, Dict[str, float]]:
+    """Self and cumulative import time (ms) of every module imported by statement"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = {
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        }
+    return modules
+
+
+def best_of(statement: str, runs: int) -> Dict[str, Dict[str, float]]:
+    """Keep the fastest run so a cold disk cache does not dominate"""
+    samples = [measure_imports(statement) for _ in range(runs)]
+    return min(samples, key=lambda modules: _total_ms(modules, statement))
+
+
+def _total_ms(modules: Dict[str, Dict[str, float]], statement: str) -> float:
+    root = statement.split()[-1]
+    return modules.get(root, {}).get("cumulative_ms", 0.0)
+
+
+def top_modules(modules: Dict[str, Dict[str, float]], count: int) -> List[Dict]:
+    ranked = sorted(modules.items(), key=lambda item: item[1]["self_ms"], reverse=True)
+    return [{"module": name, **timing} for name, timing in ranked[:count]]
+
+
+def run(budget_ms: float = DEFAULT_BUDGET_MS, runs: int = 3, top: int = 15) -> Dict:
+    startup = best_of("import app.main", runs)
+    total_ms = _total_ms(startup, "import app.main")
+    # Modules the bare interpreter already loads (site, sitecustomize) are not ours
+    baseline = measure_imports("pass")
+    loaded = {name.split(".")[0] for name in startup if name not in baseline}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+
+    # Deferred cost, paid by the warm-up thread instead of the first request
+    from app.utils.warmup import WARM_UP_MODULES
+    deferred = {}
+    for module in WARM_UP_MODULES:
+        try:
+            timings = measure_imports(f"import {module}")
+        except RuntimeError:
+            deferred[module] = None
+            continue
+        deferred[module] = round(timings.get(module, {}).get("cumulative_ms", 0.0), 1)
+
+    return {
+        "startup_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "within_budget": total_ms <= budget_ms,
+        "eager_heavy_modules": eager,
+        "top_modules": top_modules(startup, top),
+        "app_modules": {
+            name: round(timing["cumulative_ms"], 1)
+            for name, timing in sorted(startup.items()) if name.startswith("app.")
+        },
+        "warm_up_ms": deferred,
+        "passed": total_ms <= budget_ms and not eager
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.budget_ms, args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import app.main: {report['startup_ms']:.1f} ms (budget {report['budget_ms']:.0f} ms)")
+        print(f"\n{'self ms':>9} {'cum ms':>9}  module")
+        for row in report["top_modules"]:
+            print(f"{row['self_ms']:9.1f} {row['cumulative_ms']:9.1f}  {row['module']}")
+        print("\nWarm-up (background, after startup):")
+        for module, ms in report["warm_up_ms"].items():
+            print(f"{ms:9.1f} ms  {module}" if ms is not None else f"{'failed':>12}  {module}")
+        if report["eager_heavy_modules"]:
+            print(f"\nFAIL: imported at startup: {', '.join(report['eager_heavy_modules'])}")
+        if not report["within_budget"]:
+            print(f"\nFAIL: startup import over budget by "
+                  f"{report['startup_ms'] - report['budget_ms']:.1f} ms")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+End-to-end load test of the summarization routes against a stand-in LLM
+Starts the fake Groq server and the service (uvicorn, N workers) locally,
+serves the synthetic PDF corpus over HTTP for /summarize_from_urls, then
+drives each endpoint with 10, 50 and 200 concurrent clients (closed loop:
+every client sends its next request as soon as the previous one returns).
+Reports throughput, latency percentiles, error and 503 rates, peak memory
+per service process, and the highest sustainable RPS per endpoint. A 200
+that lists failed documents counts as an error ("partial").
+
+Usage (from services/):
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --concurrency 10 50 --duration 20 --workers 2
+    python -m benchmarks.loadtest --endpoints summarize compare_summaries --llm-latency lognormal:0.8,0.4
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000 --pid 1234   # an already running service
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import CORPUS_DIR, corpus_path, load_pdf
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "loadtest.json")
+# Small and medium documents; large ones are covered by benchmarks.suite
+DEFAULT_CORPUS_PAGES = [2, 10, 30]
+DEFAULT_CONCURRENCY = [10, 50, 200]
+FAKE_KEYS = 4
+
+
+def _post_file(path: str, **params):
+    def build(pdf_name: str, pdf: bytes, urls: List[str]) -> Dict:
+        return {"url": path, "params": params or None,
+                "files": {"file": (pdf_name, pdf, "application/pdf")}}
+    return build
+
+
+def _post_urls(path: str, per_request: int = 2):
+    def build(pdf_name: str, pdf: bytes, urls: List[str]) -> Dict:
+        return {"url": path, "json": {"urls": random.sample(urls, min(per_request, len(urls)))}}
+    return build
+
+
+ENDPOINTS = {
+    "summarize": _post_file("/summarize"),
+    "advanced_summarize": _post_file("/advanced_summarize", summary_type="detailed",
+                                     method="abstractive"),
+    "compare_summaries": _post_file("/compare_summaries", summary_type="detailed"),
+    "summarize_from_urls": _post_urls("/summarize_from_urls"),
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+# ---------------------------------------------------------------------------
+# Memory sampling (Linux /proc; reported as unavailable elsewhere)
+# ---------------------------------------------------------------------------
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as handle:
+                children.extend(int(child) for child in handle.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def process_tree(pid: int, parent: Optional[int] = None) -> Dict[int, Optional[int]]:
+    """Every process under pid (itself included), mapped to its parent pid"""
+    tree = {pid: parent}
+    for child in _children(pid):
+        tree.update(process_tree(child, pid))
+    return tree
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _role(pid: int, parent: Optional[int], root_pid: int, workers: int) -> str:
+    """
+    What a service process is, from its place in the tree
+
+    uvicorn starts its workers with multiprocessing spawn too, so the command
+    line alone cannot tell them from the worker pool's processes: with several
+    workers the root's direct children are uvicorn workers, otherwise the root
+    serves requests itself and everything below it belongs to the pool.
+    """
+    if pid == root_pid:
+        return "uvicorn" if workers <= 1 else "uvicorn supervisor"
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as handle:
+            cmdline = handle.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        cmdline = ""
+    if "resource_tracker" in cmdline:
+        return "multiprocessing"
+    if parent == root_pid and workers > 1:
+        return "uvicorn worker"
+    return "pool worker"
+
+
+class MemorySampler:
+    """Peak RSS of every process under a root pid, sampled in a background thread"""
+
+    def __init__(self, root_pid: Optional[int], workers: int = 1, interval: float = 0.5):
+        self.root_pid = root_pid
+        self.workers = workers
+        self.interval = interval
+        self.peaks: Dict[int, int] = {}
+        self.parents: Dict[int, Optional[int]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        for pid, parent in process_tree(self.root_pid).items():
+            rss = rss_bytes(pid)
+            if rss is not None:
+                self.peaks[pid] = max(self.peaks.get(pid, 0), rss)
+                self.parents[pid] = parent
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.peaks, self.parents = {}, {}
+        if self.root_pid and os.path.exists(f"/proc/{self.root_pid}"):
+            self.sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._stop.clear()
+
+    def report(self) -> Optional[List[Dict]]:
+        if not self.peaks:
+            return None
+        return [{"pid": pid,
+                 "role": _role(pid, self.parents.get(pid), self.root_pid, self.workers),
+                 "peak_rss_mb": round(peak / 2 ** 20, 1)}
+                for pid, peak in sorted(self.peaks.items())]
+
+
+# ---------------------------------------------------------------------------
+# Local processes: fake Groq, the service and a static server for the corpus
+# ---------------------------------------------------------------------------
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_corpus(port: int) -> ThreadingHTTPServer:
+    handler = functools.partial(_QuietHandler, directory=CORPUS_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _wait_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=2.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready in {timeout:.0f}s")
+
+
+def start_fake_groq(args) -> subprocess.Popen:
+    command = [sys.executable, "-m", "benchmarks.fake_groq", "--port", str(args.llm_port),
+               "--latency", args.llm_latency, "--token-rate", str(args.llm_token_rate),
+               "--error-429", str(args.llm_error_429), "--error-5xx", str(args.llm_error_5xx)]
+    process = subprocess.Popen(command)
+    _wait_ready(f"http://127.0.0.1:{args.llm_port}/stats", process)
+    return process
+
+
+def start_service(args, data_dir: str, log_file) -> subprocess.Popen:
+    env = dict(os.environ)
+    # Placeholder keys; any real key would only ever be sent to the local stand-in
+    for name in [name for name in env if name.startswith("GROQ_API_KEY")]:
+        del env[name]
+    env.update({f"GROQ_API_KEY_{i + 1}": f"loadtest-{i + 1}" for i in range(FAKE_KEYS)})
+    env.update({
+        "GROQ_BASE_URL": f"http://127.0.0.1:{args.llm_port}",
+        # Lets the service share key budgets between its workers
+        "WEB_CONCURRENCY": str(args.workers),
+        "ML_DATA_DIR": data_dir,
+        # Every request should do the full work; the stand-in has no real quotas
+        "SUMMARY_CACHE_BACKEND": "none",
+        "LLM_CACHE_BACKEND": "none",
+        "GROQ_RPM_LIMIT": str(10 ** 6),
+        "GROQ_TPM_LIMIT": str(10 ** 9),
+    })
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+               "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    _wait_ready(f"http://127.0.0.1:{args.port}/health", process)
+    return process
+
+
+def _stop(process: Optional[subprocess.Popen]):
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+def outcome(response: httpx.Response) -> str:
+    """The response's status, or "partial" for a 200 that lists failed documents"""
+    if response.status_code != 200:
+        return str(response.status_code)
+    try:
+        body = response.json()
+    except ValueError:
+        return "200"
+    return "partial" if isinstance(body, dict) and body.get("failures") else "200"
+
+
+async def run_phase(base_url: str, endpoint: str, concurrency: int, duration: float,
+                    corpus: List[tuple], urls: List[str], timeout: float) -> Dict:
+    """Closed-loop load on one endpoint; only requests started in the window count"""
+    build = ENDPOINTS[endpoint]
+    latencies = []
+    statuses = {}
+    errors = {}
+    documents = itertools.cycle(corpus)
+    deadline = time.monotonic() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while time.monotonic() < deadline:
+                pdf_name, pdf = next(documents)
+                request = build(pdf_name, pdf, urls)
+                started = time.perf_counter()
+                try:
+                    response = await client.post(**request)
+                    status = outcome(response)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == "200":
+                    latencies.append(elapsed)
+                else:
+                    errors[status] = errors.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "error_rate": round((total - len(latencies)) / total, 4) if total else 0.0,
+        "rejected_503": statuses.get("503", 0),
+        "partial": statuses.get("partial", 0),
+        "statuses": statuses,
+        "latency_s": {name: (round(value, 4) if value is not None else None) for name, value in {
+            "p50": percentile(latencies, 0.50), "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None}.items()}
+    }
+
+
+def sustainable(results: List[Dict], max_error_rate: float, slo_p99: float) -> Dict:
+    """Highest throughput per endpoint among levels within the error rate and p99 SLO"""
+    best = {}
+    for result in results:
+        p99 = result["latency_s"]["p99"]
+        if result["error_rate"] > max_error_rate or p99 is None or p99 > slo_p99:
+            continue
+        current = best.get(result["endpoint"])
+        if current is None or result["throughput_rps"] > current["throughput_rps"]:
+            best[result["endpoint"]] = {"throughput_rps": result["throughput_rps"],
+                                        "concurrency": result["concurrency"], "p99_s": p99}
+    return best
+
+
+def print_table(results: List[Dict]):
+    print(f"\n{'endpoint':22} {'conc':>5} {'reqs':>6} {'rps':>8} {'err%':>6} {'503':>5} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  peak RSS (MB)")
+    for r in results:
+        lat = r["latency_s"]
+        cells = " ".join(f"{lat[k]:8.3f}" if lat[k] is not None else f"{'-':>8}"
+                         for k in ("p50", "p90", "p99", "max"))
+        memory = ", ".join(f"{m['role']} {m['peak_rss_mb']:.0f}" for m in r.get("memory") or [])
+        print(f"{r['endpoint']:22} {r['concurrency']:5} {r['requests']:6} "
+              f"{r['throughput_rps']:8.2f} {r['error_rate'] * 100:6.1f} {r['rejected_503']:5} "
+              f"{cells}  {memory or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per phase")
+    parser.add_argument("--corpus-pages", type=int, nargs="+", default=DEFAULT_CORPUS_PAGES)
+    parser.add_argument("--request-timeout", type=float, default=600.0)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn worker processes (of --target too, to label memory)")
+    parser.add_argument("--port", type=int, default=8077)
+    parser.add_argument("--corpus-port", type=int, default=8078)
+    parser.add_argument("--target", help="load an already running service instead of starting one")
+    parser.add_argument("--pid", type=int, help="root pid of --target, for memory sampling")
+    parser.add_argument("--llm-port", type=int, default=8090)
+    parser.add_argument("--llm-latency", default="lognormal:0.6,0.4",
+                        help="latency spec passed to benchmarks.fake_groq")
+    parser.add_argument("--llm-token-rate", type=float, default=800.0)
+    parser.add_argument("--llm-error-429", type=float, default=0.0)
+    parser.add_argument("--llm-error-5xx", type=float, default=0.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--slo-p99", type=float, default=60.0, help="seconds")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    corpus = [(os.path.basename(corpus_path(pages)), load_pdf(pages)) for pages in args.corpus_pages]
+    corpus_server = serve_corpus(args.corpus_port)
+    urls = [f"http://127.0.0.1:{args.corpus_port}/{name}" for name, _ in corpus]
+
+    fake_groq = service = None
+    data_dir = tempfile.mkdtemp(prefix="loadtest-")
+    log_path = os.path.join(data_dir, "service.log")
+    results = []
+    try:
+        with open(log_path, "w") as log_file:
+            if args.target:
+                base_url, root_pid = args.target.rstrip("/"), args.pid
+            else:
+                fake_groq = start_fake_groq(args)
+                service = start_service(args, data_dir, log_file)
+                base_url, root_pid = f"http://127.0.0.1:{args.port}", service.pid
+            print(f"Service {base_url}, corpus {args.corpus_pages} pages, log {log_path}")
+
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    with MemorySampler(root_pid, args.workers) as memory:
+                        result = asyncio.run(run_phase(base_url, endpoint, concurrency,
+                                                       args.duration, corpus, urls,
+                                                       args.request_timeout))
+                    result["memory"] = memory.report()
+                    results.append(result)
+                    print(f"  {endpoint} x{concurrency}: {result['throughput_rps']:.2f} rps, "
+                          f"p99 {result['latency_s']['p99']}, errors {result['error_rate']:.1%}")
+            health = httpx.get(f"{base_url}/health", timeout=10).json()
+            llm_stats = (httpx.get(f"http://127.0.0.1:{args.llm_port}/stats", timeout=10).json()
+                         if fake_groq else None)
+    finally:
+        _stop(service)
+        _stop(fake_groq)
+        corpus_server.shutdown()
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "cpu_count": os.cpu_count(),
+            "workers": None if args.target else args.workers,
+            "duration_s": args.duration,
+            "corpus_pages": args.corpus_pages,
+            "llm": {"latency": args.llm_latency, "token_rate": args.llm_token_rate,
+                    "error_429": args.llm_error_429, "error_5xx": args.llm_error_5xx},
+            "slo_p99_s": args.slo_p99,
+            "max_error_rate": args.max_error_rate
+        },
+        "results": results,
+        "max_sustainable": sustainable(results, args.max_error_rate, args.slo_p99),
+        "service_health": health,
+        "llm_stand_in": llm_stats
+    }
+    print_table(results)
+    print("\nMax sustainable RPS (error rate <= "
+          f"{args.max_error_rate:.0%}, p99 <= {args.slo_p99:.0f}s):")
+    for endpoint in args.endpoints:
+        best = report["max_sustainable"].get(endpoint)
+        print(f"  {endpoint:22} " + (f"{best['throughput_rps']:.2f} rps at {best['concurrency']} clients"
+                                     if best else "none of the levels met the target"))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
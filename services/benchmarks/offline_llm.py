@@ -0,0 +1,77 @@
+"""
+Offline stand-in for Groq so orchestration can be benchmarked without a network
+Only the client is replaced: calls still go through the key scheduler, the
+resilience policy and the map-reduce engine. Every completion takes a fixed
+latency and returns a deterministic summary-sized reply. Completion and
+summary caches are disabled so repeated runs do the same work.
+"""
+
+import asyncio
+import hashlib
+import time
+from contextlib import contextmanager
+
+from app.services import llm
+from app.services.key_scheduler import key_scheduler, MemoryKeyStateStore
+from app.utils.summary_cache import summary_cache
+
+REPLY_WORDS = 120
+_FILLER = ("the court held that the agreement was enforceable and the appeal was dismissed "
+           "with costs because the notice complied with the statute").split()
+
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+        self.usage_metadata = None
+
+
+class OfflineChat:
+    """Implements the invoke / ainvoke / astream calls the llm helpers use"""
+
+    def __init__(self, latency: float = 0.05, reply_words: int = REPLY_WORDS):
+        self.latency = latency
+        self.reply_words = reply_words
+        self.calls = 0
+
+    def _reply(self, prompt: str) -> str:
+        self.calls += 1
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        return " ".join(_FILLER[(seed + i) % len(_FILLER)] for i in range(self.reply_words))
+
+    def invoke(self, prompt: str) -> _Message:
+        time.sleep(self.latency)
+        return _Message(self._reply(prompt))
+
+    async def ainvoke(self, prompt: str) -> _Message:
+        await asyncio.sleep(self.latency)
+        return _Message(self._reply(prompt))
+
+    async def astream(self, prompt: str):
+        await asyncio.sleep(self.latency)
+        for word in self._reply(prompt).split():
+            yield _Message(word + " ")
+
+
+@contextmanager
+def offline_llm(latency: float = 0.05, keys: int = 4):
+    """Route every LLM call in the block to an OfflineChat; yields the chat"""
+    chat = OfflineChat(latency)
+    saved = (llm.create_llm, key_scheduler.keys, key_scheduler._ids, key_scheduler.store,
+             key_scheduler.rpm, key_scheduler.tpm, llm.completion_cache.backend,
+             summary_cache.backend)
+    fake_keys = [f"offline-{i}" for i in range(keys)]
+    llm.create_llm = lambda api_key=None, model_name=None, temperature=None: chat
+    key_scheduler.keys = fake_keys
+    key_scheduler._ids = {key: key for key in fake_keys}
+    key_scheduler.store = MemoryKeyStateStore()
+    # Rate limits are not what is being measured
+    key_scheduler.rpm = key_scheduler.tpm = 10 ** 9
+    llm.completion_cache.backend = None
+    summary_cache.backend = None
+    try:
+        yield chat
+    finally:
+        (llm.create_llm, key_scheduler.keys, key_scheduler._ids, key_scheduler.store,
+         key_scheduler.rpm, key_scheduler.tpm, llm.completion_cache.backend,
+         summary_cache.backend) = saved
@@ -0,0 +1,261 @@
+"""
+Offline benchmark suite for the summarization pipeline
+Times each stage of pdf_reader, the chunker, extractive scoring, section
+detection and map-reduce orchestration (against an offline LLM with fixed
+latency) over synthetic legal PDFs of 10 to 2,000 pages. Results are written
+as JSON; with --baseline the run is compared stage by stage and exits
+non-zero when a stage got slower than the tolerance allows.
+
+Usage (from services/):
+    python -m benchmarks.suite                                  # all stages, default sizes
+    python -m benchmarks.suite --pages 10 100 --stages sections extractive.lightweight
+    python -m benchmarks.suite --save-baseline                  # record benchmarks/results/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import DEFAULT_PAGES, load_pdf
+from benchmarks.offline_llm import offline_llm
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "latest.json")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+# A stage regresses when its median is this much slower than the baseline ...
+DEFAULT_TOLERANCE = 0.25
+# ... and by more than this many seconds, so sub-millisecond stages do not flap
+MIN_REGRESSION_SECONDS = 0.005
+
+
+class Case:
+    """One corpus document, with the text and chunks later stages start from"""
+
+    def __init__(self, pages: int, pdf: bytes):
+        from app.services.summarizer import _split_chunks
+        from app.utils.pdf_reader import extract_pages
+
+        self.pages = pages
+        self.pdf = pdf
+        self.text = extract_pages(pdf).text
+        self.chunks = _split_chunks(self.text)
+
+
+def _extract_pages(case: Case) -> Dict:
+    from app.utils.pdf_reader import extract_pages
+    extracted = extract_pages(case.pdf)
+    return {"strategy": extracted.strategy, "chars": len(extracted.text)}
+
+
+def _page_pipeline(case: Case) -> Dict:
+    from app.services.map_reduce import run_sync
+    from app.services.page_pipeline import aiter_pages
+
+    async def consume():
+        count = 0
+        async for _ in aiter_pages(case.pdf):
+            count += 1
+        return count
+
+    return {"pages": run_sync(consume())}
+
+
+def _chunk(case: Case) -> Dict:
+    from app.services.summarizer import _split_chunks
+    return {"chunks": len(_split_chunks(case.text))}
+
+
+def _tokenize(case: Case) -> Dict:
+    from app.utils.extractive import extractive_engine
+    return {"sentences": len(extractive_engine.tokenize(case.text).sentences)}
+
+
+def _extractive_lightweight(case: Case) -> Dict:
+    from app.services.lightweight_enhanced_summarizer import LightweightExtractiveSummarizer
+    result = LightweightExtractiveSummarizer().create_extractive_summary(case.text, 'detailed')
+    return {"sentences": len(result['key_sentences'])}
+
+
+def _extractive_advanced(case: Case) -> Dict:
+    from app.services.advanced_summarizer import _extractive_summarize
+    return {"sentences": _extractive_summarize(case.text, 'detailed')['sentences_selected']}
+
+
+def _sections(case: Case) -> Dict:
+    from app.services.lightweight_enhanced_summarizer import LightweightSectionDetector
+    return {"sections": len(LightweightSectionDetector().find_sections(case.text))}
+
+
+def _map_reduce(case: Case, latency: float) -> Dict:
+    from app.services.map_reduce import map_reduce
+    from app.services.summarizer import map_prompt, combine_prompt
+    with offline_llm(latency) as chat:
+        map_reduce(case.chunks, map_prompt, combine_prompt)
+    return {"llm_calls": chat.calls, "chunks": len(case.chunks)}
+
+
+def _summarize_document(case: Case, latency: float) -> Dict:
+    from app.services.summarizer import summarize_document
+    from app.utils.parsed_document import ParsedDocument
+    with offline_llm(latency) as chat:
+        # A fresh document each run so extraction is part of the measurement
+        document = ParsedDocument(case.pdf)
+        summarize_document(document)
+    return {"llm_calls": chat.calls, "streamed": document.streamable}
+
+
+def _lightweight_document(method: str):
+    def run(case: Case, latency: float) -> Dict:
+        from app.services.lightweight_enhanced_summarizer import lightweight_advanced_summarizer
+        from app.utils.parsed_document import ParsedDocument
+        with offline_llm(latency) as chat:
+            lightweight_advanced_summarizer.summarize_document(
+                ParsedDocument(case.pdf), 'detailed', method)
+        return {"llm_calls": chat.calls}
+    return run
+
+
+# name -> (function, needs the offline LLM)
+STAGES: Dict[str, tuple] = {
+    "pdf_reader.extract_pages": (_extract_pages, False),
+    "pdf_reader.page_pipeline": (_page_pipeline, False),
+    "chunker.chunk_for_prompt": (_chunk, False),
+    "extractive.tokenize": (_tokenize, False),
+    "extractive.lightweight": (_extractive_lightweight, False),
+    "extractive.advanced": (_extractive_advanced, False),
+    "sections.find_sections": (_sections, False),
+    "summarizer.map_reduce": (_map_reduce, True),
+    "summarizer.summarize_document": (_summarize_document, True),
+    "lightweight.extractive": (_lightweight_document('extractive'), True),
+    "lightweight.abstractive": (_lightweight_document('abstractive'), True),
+}
+
+
+def time_stage(func: Callable, case: Case, repeat: int) -> Dict:
+    # One untimed run so lazy imports and first-use caches are not measured
+    info = func(case)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        info = func(case)
+        samples.append(time.perf_counter() - started)
+    return {
+        "runs": repeat,
+        "min_s": round(min(samples), 6),
+        "median_s": round(statistics.median(samples), 6),
+        "max_s": round(max(samples), 6),
+        "info": info
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(pages: List[int], stages: List[str], repeat: int, latency: float,
+              progress: Callable[[str], None] = print) -> Dict:
+    from app.utils.executor import worker_pool
+
+    results = []
+    for page_count in pages:
+        case = Case(page_count, load_pdf(page_count))
+        progress(f"{page_count} pages: {len(case.text) / 1e6:.1f}M chars, {len(case.chunks)} chunks")
+        for name in stages:
+            func, needs_llm = STAGES[name]
+            run = (lambda c, f=func: f(c, latency)) if needs_llm else func
+            result = {"stage": name, "pages": page_count, **time_stage(run, case, repeat)}
+            results.append(result)
+            progress(f"  {name:34} median {result['median_s']:9.4f}s  {result['info']}")
+    worker_pool.shutdown()
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "worker_processes": worker_pool.processes,
+            "repeat": repeat,
+            "llm_latency_s": latency
+        },
+        "results": results
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """Per-stage median change against a baseline report; regressions are flagged"""
+    previous = {(r["stage"], r["pages"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in report["results"]:
+        before = previous.get((result["stage"], result["pages"]))
+        if before is None:
+            continue
+        delta = result["median_s"] - before["median_s"]
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else None
+        rows.append({
+            "stage": result["stage"],
+            "pages": result["pages"],
+            "baseline_s": before["median_s"],
+            "median_s": result["median_s"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regression": delta > MIN_REGRESSION_SECONDS and delta > before["median_s"] * tolerance
+        })
+    return rows
+
+
+def _write(path: str, data: Dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(data, handle, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05,
+                        help="seconds per offline LLM call")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also write the results to {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    report = run_suite(args.pages, args.stages, args.repeat, args.llm_latency)
+    _write(args.output, report)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        _write(DEFAULT_BASELINE, report)
+        print(f"Baseline written to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            rows = compare(report, json.load(handle), args.tolerance)
+        print(f"\n{'stage':34} {'pages':>6} {'baseline':>10} {'now':>10} {'ratio':>7}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:34} {row['pages']:6} {row['baseline_s']:10.4f} "
+                  f"{row['median_s']:10.4f} {row['ratio'] or 0:7.2f}{flag}")
+        regressions = [row for row in rows if row["regression"]]
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than "
+                  f"{args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
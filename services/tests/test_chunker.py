@@ -0,0 +1,57 @@
+import asyncio
+import random
+
+from app.utils.chunker import achunk_for_prompt, chunk_for_prompt, chunk_text, estimate_tokens
+
+
+def _sentences(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(f"word{rng.randint(0, 99)}" for _ in range(rng.randint(3, 40))).capitalize() + "."
+            for _ in range(count)]
+
+
+def test_chunks_stay_within_budget_with_overlap():
+    text = " ".join(_sentences(80))
+    for max_tokens, overlap in ((100, 30), (200, 80), (60, 50)):
+        chunks = chunk_text(text, max_tokens, overlap)
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= max_tokens for chunk in chunks)
+
+
+def test_oversized_sentence_is_split():
+    chunks = chunk_text(" ".join(["word"] * 500) + ".", 50, 0)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_consecutive_chunks_overlap():
+    sentences = [f"Sentence number {i} states a short fact." for i in range(40)]
+    chunks = chunk_text(" ".join(sentences), 60, 15)
+    for previous, following in zip(chunks, chunks[1:]):
+        last_sentence = previous.split(". ")[-1]
+        assert following.startswith(last_sentence.rstrip("."))
+
+
+def test_no_overlap_when_disabled():
+    sentences = [f"Sentence number {i} states a short fact." for i in range(40)]
+    chunks = chunk_text(" ".join(sentences), 60, 0)
+    assert " ".join(chunks) == " ".join(sentences)
+
+
+def test_heading_starts_new_chunk_once_half_full():
+    body = " ".join(f"Fact {i} was found." for i in range(12))
+    text = f"{body}\n\nDISCUSSION\n{body}"
+    chunks = chunk_text(text, 120, 0)
+    assert chunks[1].startswith("DISCUSSION")
+
+
+def test_heading_kept_in_chunk_below_half_full():
+    text = "A short preamble.\n\nDISCUSSION\nThe court held the clause void."
+    assert chunk_text(text, 120, 0) == [
+        "A short preamble.\n\nDISCUSSION\nThe court held the clause void."]
+
+
+def test_async_chunking_matches_sync():
+    text = " ".join(_sentences(300))
+    prompt = "Summarize:\n{text}"
+    assert asyncio.run(achunk_for_prompt(text, prompt)) == chunk_for_prompt(text, prompt)
@@ -0,0 +1,71 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+
+import pytest
+
+from app.utils.executor import BackgroundLoop, WorkerPool
+
+
+def _pool_probe():
+    from app.utils.executor import worker_pool
+    return os.getpid(), worker_pool.cpu_inline
+
+
+def _run_in_spawned_parent(queue):
+    # Stands in for a uvicorn --reload / --workers server process
+    pool = WorkerPool(threads=1, processes=1)
+    try:
+        worker_pid, worker_inline = pool.cpu_call(_pool_probe)
+        queue.put((pool.cpu_inline, worker_pid != os.getpid(), worker_inline))
+    finally:
+        # Wait for the worker so the child can exit promptly
+        pool.process_pool.shutdown(wait=True)
+        pool.shutdown()
+
+
+def test_process_pool_used_from_spawned_server_process():
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_in_spawned_parent, args=(queue,))
+    process.start()
+    try:
+        parent_inline, ran_elsewhere, worker_inline = queue.get(timeout=120)
+    finally:
+        process.join(120)
+    assert not parent_inline
+    assert ran_elsewhere
+    # Pool workers run nested CPU work inline instead of starting their own pool
+    assert worker_inline
+
+
+def test_cpu_work_runs_inline_without_processes():
+    pool = WorkerPool(threads=1, processes=0)
+    try:
+        assert pool.cpu_inline
+        assert pool.cpu_call(os.getpid) == os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_background_loop_reuses_one_loop_and_carries_context():
+    label = contextvars.ContextVar("label", default=None)
+    background = BackgroundLoop()
+
+    async def current():
+        return asyncio.get_running_loop(), label.get()
+
+    async def fail():
+        raise ValueError("boom")
+
+    try:
+        label.set("request")
+        first_loop, first_label = background.run(current())
+        second_loop, _ = background.run(current())
+        assert first_loop is second_loop
+        assert first_label == "request"
+        with pytest.raises(ValueError):
+            background.run(fail())
+    finally:
+        background.shutdown()
@@ -0,0 +1,37 @@
+from collections import Counter
+
+from app.utils.extractive import WORD, ExtractiveEngine
+
+TEXT = ("The court held that the Plaintiff's claim was barred!  Short bit.\n"
+        "Why did the defendant appeal the ruling of the court? Dismissed.   "
+        "The court found no evidence, and the appeal failed. ok")
+
+
+def _tokens_by_sentence(document):
+    by_sentence = [[] for _ in document.sentences]
+    for sentence, token_id in zip(document.sentence_index, document.token_ids):
+        by_sentence[sentence].append(document.vocab[token_id])
+    return by_sentence
+
+
+def test_tokenize_matches_per_piece_split():
+    engine = ExtractiveEngine()
+    document = engine.tokenize(TEXT)
+    pieces = TEXT.replace('!', '.').replace('?', '.').split('.')
+    kept = [piece for piece in pieces if len(piece.strip()) >= engine.min_sentence_chars]
+    assert document.sentences == [piece.strip() for piece in kept]
+    assert _tokens_by_sentence(document) == [piece.lower().split() for piece in kept]
+
+
+def test_word_frequencies_cover_short_pieces_in_first_occurrence_order():
+    engine = ExtractiveEngine()
+    words = [word for word in WORD.findall(TEXT.lower()) if engine._counted(word)]
+    word_freq = engine.tokenize(TEXT).word_freq
+    assert list(word_freq.items()) == list(Counter(words).items())
+    assert word_freq['dismissed'] == 1
+
+
+def test_tokenize_without_sentences():
+    document = ExtractiveEngine().tokenize("too short. also short")
+    assert document.sentences == [] and len(document.token_ids) == 0
+    assert ExtractiveEngine().score_sentences(document).shape == (0,)
@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks.fake_groq import Behaviour, FakeGroq, create_app, estimate_tokens
+
+
+@pytest.mark.parametrize("changes", [
+    {"rpm": "x"},
+    {"rpm": 1.5},
+    {"rpm": True},
+    {"tpm": -1},
+    {"error_5xx": 2},
+    {"token_rate": None},
+    {"latency": 0.5},
+    {"latency": "fixed:a"},
+    {"colour": "red"},
+])
+def test_invalid_updates_are_rejected_whole(changes):
+    behaviour = Behaviour(rpm=10)
+    with pytest.raises(ValueError):
+        behaviour.update(seed=5, **changes)
+    assert behaviour.rpm == 10 and behaviour.seed == 0
+
+
+def test_numeric_strings_are_coerced():
+    behaviour = Behaviour()
+    behaviour.update(rpm="30", error_429="0.25")
+    assert behaviour.rpm == 30 and isinstance(behaviour.rpm, int)
+    assert behaviour.error_429 == 0.25
+
+
+@pytest.mark.parametrize("reply_tokens", [1, 50, 200, 1000])
+def test_reply_length_is_counted_in_tokens(reply_tokens):
+    fake = FakeGroq(Behaviour(reply_tokens=reply_tokens))
+    tokens = estimate_tokens(fake.reply("model", "prompt"))
+    assert reply_tokens <= tokens <= reply_tokens * 1.1 + 5
+
+
+def test_admin_endpoint_returns_400_for_bad_types():
+    from fastapi.testclient import TestClient
+    client = TestClient(create_app())
+    response = client.patch("/admin/behaviour", json={"rpm": "x"})
+    assert response.status_code == 400
+    assert client.get("/stats").json()["behaviour"]["rpm"] == 0
+    assert client.patch("/admin/behaviour", json={"rpm": 30}).json()["rpm"] == 30
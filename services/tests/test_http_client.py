@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+import os
+import threading
+
+import httpx
+import pytest
+
+from app.utils import http_client
+
+BODY = os.urandom(300_000)
+
+
+def _serve(monkeypatch, body=BODY):
+    def handler(request):
+        return httpx.Response(200, content=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "_client", client)
+    return client
+
+
+def test_large_download_spools_to_disk_off_the_loop(monkeypatch):
+    _serve(monkeypatch)
+    monkeypatch.setattr(http_client, "PDF_SPOOL_MAX_MEMORY", 64 * 1024)
+    writers = []
+    spool = http_client._spool
+
+    def recording_spool(handle, blocks):
+        writers.append(threading.current_thread())
+        return spool(handle, blocks)
+
+    monkeypatch.setattr(http_client, "_spool", recording_spool)
+
+    async def run():
+        return await http_client.download_pdf("http://test/doc.pdf"), threading.current_thread()
+
+    download, loop_thread = asyncio.run(run())
+    with download:
+        assert download.path is not None and download.data is None
+        assert download.read() == BODY
+        assert download.digest == hashlib.sha256(BODY).hexdigest()
+        path = download.path
+    assert not os.path.exists(path)
+    assert writers and loop_thread not in writers
+
+
+def test_small_download_stays_in_memory(monkeypatch):
+    _serve(monkeypatch)
+    download = asyncio.run(http_client.download_pdf("http://test/doc.pdf"))
+    assert download.path is None and download.source == BODY
+
+
+def test_download_over_limit(monkeypatch):
+    _serve(monkeypatch)
+    with pytest.raises(http_client.DownloadError) as raised:
+        asyncio.run(http_client.download_pdf("http://test/doc.pdf", max_bytes=1000))
+    assert raised.value.status_code == 413
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+from app.services import key_scheduler
+from app.services.key_scheduler import KeyScheduler, MemoryKeyStateStore, SQLiteKeyStateStore
+from app.utils.logger import logger
+
+
+def test_stats_do_not_write(tmp_path):
+    store = SQLiteKeyStateStore(str(tmp_path / "keys.sqlite3"))
+    scheduler = KeyScheduler(["a", "b"], store, rpm=60, tpm=1000)
+    scheduler.reserve(100)
+    before = store.read(list(scheduler._ids.values()))
+    stats = scheduler.stats()
+    assert [row["key"] for row in stats] == [scheduler.key_label("a"), scheduler.key_label("b")]
+    assert store.read(list(scheduler._ids.values())) == before
+
+
+def test_sqlite_reservations_run_off_the_loop(tmp_path):
+    store = SQLiteKeyStateStore(str(tmp_path / "keys.sqlite3"))
+    scheduler = KeyScheduler(["a"], store, rpm=60, tpm=1000)
+    threads = []
+    transaction = store.transaction
+
+    def recording_transaction(key_ids, update):
+        threads.append(threading.current_thread())
+        return transaction(key_ids, update)
+
+    store.transaction = recording_transaction
+
+    async def call():
+        key = await scheduler.aacquire(100)
+        await scheduler.areport_success(key, 100, 50)
+        return key
+
+    assert asyncio.run(call()) == "a"
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+
+def test_memory_store_is_default():
+    assert isinstance(KeyScheduler(["a"]).store, MemoryKeyStateStore)
+    assert not KeyScheduler(["a"]).blocking
+
+
+def test_memory_store_warns_in_a_uvicorn_worker(monkeypatch, caplog):
+    scheduler = KeyScheduler(["k1"], MemoryKeyStateStore())
+    monkeypatch.setattr(key_scheduler.multiprocessing, "parent_process", lambda: None)
+    scheduler.warn_if_unshared()
+    monkeypatch.setattr(key_scheduler.multiprocessing, "parent_process", lambda: object())
+    with caplog.at_level("WARNING", logger=logger.name):
+        scheduler.warn_if_unshared()
+    assert [record.levelname for record in caplog.records] == ["WARNING"]
+
+
+def test_several_workers_default_to_the_sqlite_store(tmp_path):
+    env = dict(os.environ, WEB_CONCURRENCY="4", ML_DATA_DIR=str(tmp_path))
+    env.pop("KEY_SCHEDULER_BACKEND", None)
+    script = "from app.services.key_scheduler import key_scheduler; print(key_scheduler.blocking)"
+    services_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    done = subprocess.run([sys.executable, "-c", script], cwd=services_dir, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert done.stdout.split()[-1] == "True", done.stderr[-2000:]
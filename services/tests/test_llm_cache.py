@@ -0,0 +1,55 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+
+from benchmarks.fake_groq import Behaviour, create_app
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = (
+    "from app.services.summarizer import summarize_text\n"
+    "print(summarize_text(' '.join(f'Sentence number {i} of the judgment.' for i in range(3000))))"
+)
+
+
+@pytest.fixture
+def fake_groq():
+    import uvicorn
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    app = create_app(Behaviour(latency="fixed:0"))
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join()
+
+
+def test_rerun_with_default_settings_makes_no_llm_calls(fake_groq, tmp_path):
+    # Default settings apart from the stand-in's address and a fresh data directory
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(("GROQ_", "LLM_", "MAP_REDUCE_"))}
+    env.update(GROQ_API_KEY_1="fake-1", GROQ_BASE_URL=fake_groq, ML_DATA_DIR=str(tmp_path),
+               PYTHONPATH=os.pathsep.join(filter(None, [SERVICES_DIR, env.get("PYTHONPATH")])))
+
+    def run() -> str:
+        done = subprocess.run([sys.executable, "-c", SCRIPT], cwd=SERVICES_DIR, env=env,
+                              capture_output=True, text=True, timeout=120)
+        assert done.returncode == 0, done.stderr[-2000:]
+        return done.stdout
+
+    first = run()
+    calls = httpx.get(f"{fake_groq}/stats").json()["requests"]
+    assert calls > 1
+    # A new process, so only the on-disk cache can answer
+    assert run() == first
+    assert httpx.get(f"{fake_groq}/stats").json()["requests"] == calls
@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+from benchmarks.corpus import make_legal_pdf
+from app.services import page_pipeline
+from app.utils.pdf_reader import extract_pages
+
+
+def test_streamed_pages_are_recorded_as_extraction(monkeypatch):
+    pdf = make_legal_pdf(7)
+    recorded = []
+    monkeypatch.setattr(page_pipeline, "record_extraction", recorded.append)
+
+    async def consume():
+        pages = []
+        async for page in page_pipeline.aiter_pages(pdf, window=2, pages_per_task=3):
+            pages.append(page)
+            await asyncio.sleep(0.1)
+        return pages
+
+    started = time.perf_counter()
+    pages = asyncio.run(consume())
+    wall = time.perf_counter() - started
+    assert pages == extract_pages(pdf).pages
+    [extracted] = recorded
+    timing = extracted.timing()
+    assert (timing["strategy"], timing["pages"]) == ("stream", 7)
+    # The 0.7s the consumer spent on the pages is not extraction time
+    assert extracted.elapsed <= wall - 0.7
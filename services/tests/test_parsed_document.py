@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.corpus import make_legal_pdf
+from app.utils import parsed_document
+from app.utils.parsed_document import ParsedDocument, ParsedDocumentCache
+from app.utils.pdf_reader import ExtractedPages
+
+
+class _Detector:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def find_sections(self, text):
+        self.calls += 1
+        return [self.name]
+
+
+def test_cache_bounded_by_bytes():
+    cache = ParsedDocumentCache(max_entries=8, max_bytes=100)
+    first = cache.get_or_create(b"a" * 60)
+    assert cache.get_or_create(b"a" * 60) is first
+    cache.get_or_create(b"b" * 60)
+    # Both documents together hold 120 raw bytes, so the older one goes
+    assert cache.get_or_create(b"a" * 60) is not first
+
+
+def test_oversized_document_is_not_kept():
+    cache = ParsedDocumentCache(max_entries=8, max_bytes=100)
+    big = cache.get_or_create(b"c" * 200)
+    assert cache.get_or_create(b"c" * 200) is not big
+
+
+def test_sections_memoised_per_detector():
+    cache = ParsedDocumentCache(max_entries=1, max_bytes=10 * 1024 * 1024)
+    document = cache.get_or_create(make_legal_pdf(1))
+    first, second = _Detector("first"), _Detector("second")
+    assert document.sections(first) == ["first"]
+    assert document.sections(second) == ["second"]
+    assert document.sections(first) == ["first"]
+    assert (first.calls, second.calls) == (1, 1)
+    # Extraction released the raw bytes; only the text is held now
+    assert document.source is None
+    assert document.memory_bytes == len(document.text)
+
+
+def test_stream_source_only_before_extraction(monkeypatch):
+    monkeypatch.setattr(parsed_document, "PDF_STREAM_MIN_BYTES", 0)
+    content = make_legal_pdf(1)
+    document = ParsedDocument(content)
+    assert document.stream_source() is content
+    document.text
+    # Once extracted the text is reused instead of streaming the PDF again
+    assert document.stream_source() is None
+
+
+def test_concurrent_readers_share_one_extraction(monkeypatch):
+    calls = []
+    extract = parsed_document.aextract_pages
+
+    async def counting(source):
+        calls.append(source)
+        return await extract(source)
+
+    monkeypatch.setattr(parsed_document, "aextract_pages", counting)
+    content = make_legal_pdf(2)
+    document = ParsedDocument(content)
+
+    async def read_concurrently():
+        return await asyncio.gather(*(document.atext() for _ in range(4)))
+
+    texts = asyncio.run(read_concurrently())
+    assert len(calls) == 1
+    assert len(set(texts)) == 1 and texts[0]
+    assert document.text == texts[0]
+
+
+def test_failed_extraction_is_retried(monkeypatch):
+    document = ParsedDocument(b"not a pdf")
+    with pytest.raises(Exception):
+        document.text
+    monkeypatch.setattr(parsed_document, "extract_pages",
+                        lambda source: ExtractedPages(["ok"], [0.0], "test", 0.0))
+    assert document.text == "ok"
+
+
+def test_large_uploads_hashed_off_loop(monkeypatch):
+    hashed = []
+    monkeypatch.setattr(parsed_document, "INLINE_HASH_BYTES", 10)
+    monkeypatch.setattr(parsed_document, "_digest",
+                        lambda data: hashed.append(threading.get_ident()) or "d" * 64)
+    monkeypatch.setattr(parsed_document, "parsed_documents", ParsedDocumentCache())
+    document = asyncio.run(parsed_document.aparse_document(b"x" * 100))
+    assert document.digest == "d" * 64
+    assert hashed and hashed[0] != threading.get_ident()
@@ -0,0 +1,52 @@
+import time
+
+from app.services.resilience import LatencyTracker, ResiliencePolicy
+
+
+def _policy(hedge_delay=0.05):
+    tracker = LatencyTracker()
+    tracker.hedge_delay = lambda: hedge_delay
+    return ResiliencePolicy(retries=0, attempt_timeout=5, deadline=5, tracker=tracker)
+
+
+def test_latency_measured_from_key_acquisition():
+    policy = _policy()
+
+    def attempt(context):
+        time.sleep(0.2)  # waiting on the key scheduler
+        context.start("a")
+        return "ok"
+
+    assert policy.call(attempt) == "ok"
+    assert policy.tracker.percentile(0.5) < 0.1
+
+
+def test_hedge_skipped_without_spare_capacity():
+    policy = _policy()
+    keys = []
+
+    def attempt(context):
+        keys.append(context.in_flight.copy())
+        context.start("a")
+        time.sleep(0.2)
+        return "ok"
+
+    assert policy.call(attempt, hedge=True, can_hedge=lambda in_flight: False) == "ok"
+    assert len(keys) == 1
+    assert (policy.hedges, policy.hedges_skipped) == (0, 1)
+
+
+def test_hedge_sent_to_another_key():
+    policy = _policy()
+    seen = []
+
+    def attempt(context):
+        seen.append(set(context.in_flight))
+        key = "b" if context.in_flight else "a"
+        context.start(key)
+        time.sleep(0.3 if key == "a" else 0.0)
+        return key
+
+    assert policy.call(attempt, hedge=True, can_hedge=lambda in_flight: True) == "b"
+    assert seen == [set(), {"a"}]
+    assert (policy.hedges, policy.hedge_wins) == (1, 1)
@@ -0,0 +1,76 @@
+import pytest
+
+from app.utils.sections import Section, SectionDetector, section_texts
+
+PATTERNS = {
+    'facts': [r'facts', r'procedural history'],
+    'analysis': [r'analysis', r'discussion'],
+    'disposition': [r'disposition', r'order'],
+}
+
+
+@pytest.fixture
+def detector():
+    return SectionDetector(PATTERNS)
+
+
+@pytest.mark.parametrize("line", [
+    "STATEMENT OF FACTS",
+    "III. Discussion",
+    "2.1 Procedural History",
+    "Analysis:",
+    "Legal Analysis of the Claim",
+])
+def test_heading_layouts(detector, line):
+    assert detector.is_heading(line)
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    "The trial court entered an order dismissing the claim.",
+    "the parties agree on the facts",
+    "Discussion of the facts,",
+    "This Heading Is Far Too Long To Be A Heading Because It Has Many Many Words",
+])
+def test_body_lines_are_not_headings(detector, line):
+    assert not detector.is_heading(line)
+
+
+def test_body_text_keywords_do_not_start_sections(detector):
+    text = ("FACTS\nThe trial court entered an order in the border dispute.\n"
+            "DISCUSSION\nThe order was void.")
+    names = [section.name for section in detector.find_sections(text)]
+    assert names == ['facts', 'analysis']
+
+
+def test_sections_are_offsets_into_text(detector):
+    text = "Preamble line.\nFACTS\nSome facts.\nDISCUSSION\nReasoning."
+    sections = detector.find_sections(text)
+    assert sections == [
+        Section('general', 0, 14),
+        Section('facts', 15, 32),
+        Section('analysis', 33, len(text)),
+    ]
+    assert section_texts(text, sections)['facts'] == "FACTS\nSome facts."
+
+
+def test_preamble_and_one_heading_type_stay_split(detector):
+    text = "In the matter of Smith v Jones.\nDISCUSSION\nThe clause is void."
+    names = [section.name for section in detector.find_sections(text)]
+    assert names == ['general', 'analysis']
+
+
+def test_single_heading_type_without_preamble_collapses(detector):
+    text = "DISCUSSION\nFirst point.\nANALYSIS\nSecond point."
+    assert detector.find_sections(text) == [Section('general', 0, len(text))]
+
+
+def test_no_headings_is_one_general_section(detector):
+    text = "Just a paragraph of text without any headings."
+    assert detector.find_sections(text) == [Section('general', 0, len(text))]
+
+
+def test_repeated_sections_are_joined(detector):
+    text = "FACTS\nOne.\nDISCUSSION\nTwo.\nFACTS\nThree."
+    parts = section_texts(text, detector.find_sections(text))
+    assert parts['facts'] == "FACTS\nOne.\nFACTS\nThree."
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.utils.executor import worker_pool
+from app.utils.sse import sse_response
+
+
+async def _events():
+    yield {'event': 'progress', 'stage': 'extract'}
+    yield {'event': 'done', 'summary': 'ok'}
+
+
+def _send_response(response):
+    sent = []
+
+    async def receive():
+        # The client never disconnects
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    asyncio.run(response(scope, receive, send))
+    return sent
+
+
+def test_slot_released_after_stream():
+    before = worker_pool.inflight
+    sent = _send_response(sse_response(_events()))
+    assert sent[0]["status"] == 200
+    assert b"event: done" in b"".join(m.get("body", b"") for m in sent)
+    assert worker_pool.inflight == before
+
+
+def test_unsent_response_holds_no_slot():
+    before = worker_pool.inflight
+    sse_response(_events())
+    assert worker_pool.inflight == before
+
+
+def test_saturated_pool_answers_503():
+    saved = worker_pool.inflight
+    worker_pool.inflight = worker_pool.max_inflight
+    try:
+        sent = _send_response(sse_response(_events()))
+    finally:
+        worker_pool.inflight = saved
+    assert sent[0]["status"] == 503
+    assert worker_pool.inflight == saved
@@ -0,0 +1,64 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from app.utils.summary_cache import MemoryCacheBackend, SQLiteCacheBackend, SummaryCache
+
+
+def _keys(backend):
+    conn = sqlite3.connect(backend.path)
+    try:
+        return [row[0] for row in conn.execute("SELECT key FROM cache ORDER BY rowid")]
+    finally:
+        conn.close()
+
+
+def test_sqlite_sweep_keeps_newest_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=3)
+    for i in range(5):
+        backend.set(f"k{i}", "v", 0)
+    backend.sweep()
+    assert _keys(backend) == ["k2", "k3", "k4"]
+    assert backend.get("k0") is None
+    assert backend.get("k4") == "v"
+
+
+def test_sqlite_sweep_drops_expired_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=10)
+    backend.set("short", "v", 1)
+    backend.set("forever", "v", 0)
+    time.sleep(1.1)
+    backend.sweep()
+    assert _keys(backend) == ["forever"]
+
+
+def test_sqlite_set_sweeps_periodically(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=4)
+    for i in range(SQLiteCacheBackend.SWEEP_EVERY):
+        backend.set(f"k{i}", "v", 0)
+    assert len(_keys(backend)) == 4
+
+
+def test_async_access_runs_sqlite_off_the_loop(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    threads = []
+    get = backend.get
+
+    def recording_get(key):
+        threads.append(threading.current_thread())
+        return get(key)
+
+    backend.get = recording_get
+    cache = SummaryCache(backend, ttl=0, name="test")
+
+    async def roundtrip():
+        await cache.aset("k", {"summary": "v"})
+        return await cache.aget("k")
+
+    assert asyncio.run(roundtrip()) == {"summary": "v"}
+    assert threads and threading.main_thread() not in threads
+
+
+def test_memory_backend_is_not_blocking():
+    assert not SummaryCache(MemoryCacheBackend(), name="test").blocking
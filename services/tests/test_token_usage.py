@@ -0,0 +1,69 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.utils.sqlite import connect
+from app.utils.token_usage import UsageRecorder, UsageStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UsageStore(str(tmp_path / "usage.sqlite3"))
+
+
+def _row(ts, tokens=10):
+    return {"ts": ts, "key": "k1", "route": "/summarize", "category": None,
+            "summary_type": "detailed", "method": "abstractive", "stage": "map_call",
+            "model": "m", "prompt_tokens": tokens, "completion_tokens": tokens,
+            "estimated": False}
+
+
+def test_record_buffers_until_flush(store, monkeypatch):
+    recorder = UsageRecorder(store, enabled=True)
+    monkeypatch.setattr(recorder, "_start", lambda: None)
+    recorder.record("k1", "m", 100, 20, False)
+    recorder.record("k2", "m", 50, 10, True)
+    assert store.summary([]) == []
+    recorder.flush()
+    [totals] = store.summary([])
+    assert (totals["llm_calls"], totals["prompt_tokens"], totals["estimated_calls"]) == (2, 150, 1)
+
+
+def test_background_thread_writes_and_shutdown_flushes(store):
+    recorder = UsageRecorder(store, enabled=True)
+    recorder.record("k1", "m", 100, 20, False)
+    recorder.shutdown()
+    assert store.summary([])[0]["llm_calls"] == 1
+
+
+def test_rows_past_retention_are_pruned(store):
+    now = time.time()
+    store.add_many([_row(now - 3 * 86400), _row(now - 86400), _row(now)])
+    recorder = UsageRecorder(store, enabled=True, retention_days=2)
+    recorder.flush()
+    assert store.summary([])[0]["llm_calls"] == 2
+    # The next prune waits for PRUNE_INTERVAL
+    store.add_many([_row(now - 5 * 86400)])
+    recorder.flush()
+    assert store.summary([])[0]["llm_calls"] == 3
+
+
+def test_write_errors_drop_the_batch(store, monkeypatch):
+    recorder = UsageRecorder(store, enabled=True, retention_days=0)
+    monkeypatch.setattr(recorder, "_start", lambda: None)
+
+    def broken(rows):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "add_many", broken)
+    recorder.record("k1", "m", 1, 1, False)
+    recorder.flush()
+    assert recorder.dropped == 1
+
+
+def test_connect_closes_the_connection(tmp_path):
+    with connect(str(tmp_path / "db.sqlite3")) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")